@@ -0,0 +1 @@
+"""Data, caching and statistics helpers used by the Streamlit dashboard."""
@@ -0,0 +1,361 @@
+"""Process-wide loader for the pre-computed chart artifacts in ``data/``.
+
+Every chart in ``main.py`` reads its data through ``load_artifact(name)``.
+The store keeps one copy of each artifact per server process, so Streamlit
+reruns (widget changes, new sessions) are served from memory. A file is
+re-read only when its modification time changes, or, with
+``validate="hash"``, when its content hash changes as well.
+
+Artifacts are stored as uncompressed Arrow IPC files (``<name>.arrow``).
+They are memory-mapped on read and only the requested columns are
+materialized. Dimension columns are dictionary-encoded and numeric columns
+narrowed when written (``analytics.schema``). Legacy pandas pickles
+(``<name>.pkl``) are still read when no Arrow file exists;
+``python -m analytics.convert`` migrates them.
+
+Frames returned by the store are shared between sessions and must be
+treated as read-only. When ``data/`` has a manifest, new artifact versions
+are swapped in as a whole without restarting the server; see
+``ArtifactStore``.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+import pandas as pd
+import pyarrow as pa
+
+from analytics.schema import compact
+
+DATA_DIR = "data"
+ARROW_SUFFIX = ".arrow"
+PICKLE_SUFFIX = ".pkl"
+MANIFEST_FILE = "manifest.json"
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """Returns the sha1 hex digest of a file's content."""
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def to_arrow_table(frame):
+    """Converts a frame to an Arrow table with portable column types.
+
+    BigQuery ``dbdate`` columns are turned into ``datetime64[ns]`` so that
+    reading the artifact back does not depend on the ``db-dtypes`` package.
+    """
+    frame = frame.copy()
+    for col in frame.columns:
+        if str(frame[col].dtype) == "dbdate":
+            frame[col] = pd.to_datetime(frame[col])
+    return pa.Table.from_pandas(frame)
+
+
+def write_artifact(frame, path):
+    """Writes a frame as an uncompressed Arrow IPC file.
+
+    Column types are compacted first (see ``analytics.schema``). The file is
+    written next to its destination and renamed into place, so readers
+    never see a partially written artifact.
+    """
+    table = to_arrow_table(compact(frame))
+    tmp_path = f"{path}.tmp"
+    with pa.OSFile(tmp_path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+    return table
+
+
+def read_table(path):
+    """Memory-maps an Arrow artifact.
+
+    The table stays readable after the file is replaced, since the mapping
+    keeps the old file's content alive.
+    """
+    with pa.memory_map(path, "r") as source:
+        return pa.ipc.open_file(source).read_all()
+
+
+def table_frame(table, columns=None):
+    """Materializes a table, optionally only a subset of its columns."""
+    if columns is not None:
+        table = table.select(list(columns) + _index_columns(table))
+    return table.to_pandas()
+
+
+def read_artifact(path, columns=None):
+    """Reads an artifact file, optionally only a subset of its columns."""
+    if path.endswith(PICKLE_SUFFIX):
+        frame = pd.read_pickle(path)
+        return frame if columns is None else frame[list(columns)]
+    return table_frame(read_table(path), columns)
+
+
+def read_manifest(data_dir=DATA_DIR):
+    """Returns the artifact manifest of ``data_dir``, or None if it has none."""
+    try:
+        with open(os.path.join(data_dir, MANIFEST_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _index_columns(table):
+    metadata = table.schema.pandas_metadata or {}
+    return [col for col in metadata.get("index_columns", []) if isinstance(col, str)]
+
+
+class Snapshot:
+    """The artifact versions of one manifest generation."""
+
+    def __init__(self, version, entries):
+        self.version = version
+        self.entries = entries
+
+
+def _entry(path, digest, mtime=None):
+    return {
+        "frames": {},
+        "table": None,
+        "path": path,
+        "mtime": mtime,
+        "digest": digest,
+        "checked": time.monotonic(),
+        "loaded_at": time.time(),
+    }
+
+
+class ArtifactStore:
+    """Caches artifacts by name and invalidates them when the file changes.
+
+    With a manifest in ``data_dir`` (see ``analytics.manifest``), the
+    artifacts it lists are served from a ``Snapshot``: every Arrow file is
+    memory-mapped when the manifest generation is loaded, and a new
+    manifest is swapped in as a whole, reusing the entries whose content
+    hash did not change. A script run that calls ``pin()`` first reads
+    every artifact from the snapshot current at that moment, even if the
+    files are replaced and a newer snapshot is swapped in meanwhile; the
+    next run picks up the new one. ``start_watcher()`` polls the manifest
+    in a background thread, so swaps (and re-materializing the columns
+    that were in use) happen outside reruns.
+
+    Artifacts without a manifest entry are checked one by one: a file is
+    re-read only when its modification time changes, or, with
+    ``validate="hash"``, when its content hash changes as well.
+
+    ``check_interval`` is the number of seconds during which a cached
+    artifact (or the manifest) is returned without even calling
+    ``os.stat`` on its file, so that consecutive reruns do no disk access
+    at all.
+    """
+
+    def __init__(self, data_dir=DATA_DIR, check_interval=5.0, validate="mtime"):
+        if validate not in ("mtime", "hash"):
+            raise ValueError(f"validate must be 'mtime' or 'hash', not {validate!r}")
+        self.data_dir = data_dir
+        self.check_interval = check_interval
+        self.validate = validate
+        self._entries = {}
+        self._snapshot = None
+        self._manifest_mtime = None
+        self._manifest_checked = None
+        self._local = threading.local()
+        self._watcher = None
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self.swaps = 0
+
+    def path(self, name):
+        """Returns the artifact's file, preferring Arrow over a legacy pickle."""
+        arrow_path = os.path.join(self.data_dir, name + ARROW_SUFFIX)
+        if os.path.exists(arrow_path):
+            return arrow_path
+        return os.path.join(self.data_dir, name + PICKLE_SUFFIX)
+
+    def exists(self, name):
+        snapshot = self._pinned()
+        if snapshot is not None and name in snapshot.entries:
+            return True
+        return os.path.exists(self.path(name))
+
+    def load(self, name, columns=None):
+        key = None if columns is None else tuple(columns)
+        with self._lock:
+            entry = self._current_entry(name)
+            frames = entry["frames"]
+            if key in frames:
+                self.hits += 1
+                return frames[key]
+
+            self.misses += 1
+            frames[key] = self._materialize(entry, key)
+            return frames[key]
+
+    def _materialize(self, entry, key):
+        frames = entry["frames"]
+        if None in frames:
+            return frames[None][list(key)]
+        if entry["table"] is not None:
+            return table_frame(entry["table"], key)
+        return read_artifact(entry["path"], key)
+
+    def snapshot(self):
+        """Returns the current manifest snapshot, or None without a manifest."""
+        with self._lock:
+            now = time.monotonic()
+            if (
+                self._manifest_checked is not None
+                and now - self._manifest_checked < self.check_interval
+            ):
+                return self._snapshot
+            self._manifest_checked = now
+            try:
+                mtime = os.stat(os.path.join(self.data_dir, MANIFEST_FILE)).st_mtime_ns
+            except FileNotFoundError:
+                self._snapshot = self._manifest_mtime = None
+                return None
+            if self._snapshot is None or mtime != self._manifest_mtime:
+                manifest = read_manifest(self.data_dir)
+                if manifest is not None:
+                    self._swap(manifest)
+                    self._manifest_mtime = mtime
+            return self._snapshot
+
+    def _swap(self, manifest):
+        previous = self._snapshot.entries if self._snapshot is not None else {}
+        entries = {}
+        for name, info in manifest["artifacts"].items():
+            old = previous.get(name)
+            if old is not None and old["digest"] == info["sha1"]:
+                entries[name] = old
+                continue
+            path = os.path.join(self.data_dir, info["file"])
+            try:
+                entry = _entry(path, info["sha1"])
+                if path.endswith(ARROW_SUFFIX):
+                    entry["table"] = read_table(path)
+            except FileNotFoundError:
+                continue
+            if old is not None:
+                # Warm the column sets the running app asked for.
+                for key in old["frames"]:
+                    entry["frames"][key] = self._materialize(entry, key)
+                self.reloads += 1
+            entries[name] = entry
+        if self._snapshot is not None:
+            self.swaps += 1
+        self._snapshot = Snapshot(manifest.get("generated_at"), entries)
+
+    def pin(self, snapshot=None):
+        """Pins ``snapshot`` (the current one by default) to the calling thread.
+
+        Loads on the thread then resolve through it until the next ``pin``.
+        """
+        self._local.snapshot = None
+        self._local.snapshot = snapshot if snapshot is not None else self.snapshot()
+        return self._local.snapshot
+
+    def _pinned(self):
+        snapshot = getattr(self._local, "snapshot", None)
+        return snapshot if snapshot is not None else self.snapshot()
+
+    def start_watcher(self, interval=None):
+        """Polls the manifest every ``interval`` seconds in a daemon thread."""
+        with self._lock:
+            if self._watcher is not None:
+                return self._watcher
+            interval = self.check_interval if interval is None else interval
+
+            def watch():
+                while True:
+                    time.sleep(interval)
+                    try:
+                        self.snapshot()
+                    except Exception:
+                        # A half-written data directory; retry next time.
+                        pass
+
+            self._watcher = threading.Thread(
+                target=watch, name="artifact-watcher", daemon=True
+            )
+            self._watcher.start()
+            return self._watcher
+
+    def _current_entry(self, name):
+        snapshot = self._pinned()
+        if snapshot is not None and name in snapshot.entries:
+            return snapshot.entries[name]
+
+        entry = self._entries.get(name)
+        now = time.monotonic()
+        if entry is not None and now - entry["checked"] < self.check_interval:
+            return entry
+
+        path = self.path(name)
+        mtime = os.stat(path).st_mtime_ns
+        if entry is not None and self._unchanged(entry, path, mtime):
+            entry["checked"] = now
+            entry["mtime"] = mtime
+            return entry
+
+        if entry is not None:
+            self.reloads += 1
+        entry = _entry(path, file_digest(path), mtime)
+        self._entries[name] = entry
+        return entry
+
+    def _unchanged(self, entry, path, mtime):
+        if entry["path"] != path:
+            return False
+        if entry["mtime"] == mtime:
+            return True
+        if self.validate == "hash":
+            return entry["digest"] == file_digest(path)
+        return False
+
+    def digest(self, name):
+        """Returns the content hash of an artifact's current file."""
+        with self._lock:
+            return self._current_entry(name)["digest"]
+
+    def invalidate(self, name=None):
+        with self._lock:
+            if name is None:
+                self._entries.clear()
+                self._snapshot = None
+                self._manifest_checked = None
+            else:
+                self._entries.pop(name, None)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            snapshot = self._snapshot
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "reloads": self.reloads,
+                "swaps": self.swaps,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "manifest": None if snapshot is None else snapshot.version,
+                "artifacts": sorted(
+                    set(self._entries) | set(snapshot.entries if snapshot else ())
+                ),
+            }
+
+
+store = ArtifactStore()
+
+
+def load_artifact(name, columns=None):
+    return store.load(name, columns)
@@ -0,0 +1,182 @@
+"""Bayesian versions of the Part II A/B tests, from the ``ab_moments`` artifact.
+
+Each group's metric gets a conjugate posterior from the same count, mean
+and variance the z-tests and t-tests use (``analytics.abtest``):
+
+* every test's metric, counts included: the Normal-Inverse-Gamma model
+  with the reference prior, whose posterior of the mean is a Student t
+  with ``n - 1`` degrees of freedom, centered on the sample mean with
+  scale ``s / sqrt(n)``. The counts (sessions, transactions, daily
+  sessions) are far too overdispersed for a Poisson model, whose
+  posterior ignores the observed variance and would claim near certainty
+  where the z-test finds no difference;
+* conversions (the share of active users who paid): the Beta-Binomial
+  model, a Beta(``BETA_PRIOR[0] + successes``, ``BETA_PRIOR[1] +
+  failures``) posterior.
+
+``compare`` returns the probability that B's parameter is higher than A's
+and the expected loss of choosing either group, E[max(other - chosen, 0)],
+in the metric's units. When both posteriors are close to normal (every
+degrees of freedom or shape parameter at least ``NORMAL_SHAPE``) both are closed-form, a few
+microseconds per metric; otherwise they are estimated from ``DRAWS``
+vectorized posterior draws.
+"""
+
+import math
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from analytics import abtest, artifacts
+
+# Enough for a standard error of P(B > A) below 0.004.
+DRAWS = 20_000
+SEED = 17
+NORMAL_SHAPE = 30
+BETA_PRIOR = (1.0, 1.0)
+
+# Conversions as (title, test counting the successes, test counting the
+# trials): the paying users (test 5's users) among the active ones (test 1's).
+CONVERSIONS = (("Paying Users", 5, 1),)
+
+MODELS = {
+    "t": "Normal-Inverse-Gamma",
+    "beta": "Beta-Binomial",
+}
+
+Posterior = namedtuple("Posterior", ["family", "params"])
+Comparison = namedtuple(
+    "Comparison", ["prob_b_better", "loss_a", "loss_b", "closed_form"]
+)
+
+
+def mean_posterior(count, mean, variance):
+    """The Normal-Inverse-Gamma posterior of a mean, as a Student t."""
+    return Posterior("t", (count - 1, mean, math.sqrt(variance / count)))
+
+
+def conversion_posterior(successes, trials, prior=BETA_PRIOR):
+    """The Beta posterior of a conversion rate."""
+    return Posterior("beta", (prior[0] + successes, prior[1] + trials - successes))
+
+
+def _mean_variance(posterior):
+    if posterior.family == "t":
+        df, loc, scale = posterior.params
+        return loc, scale**2 * df / (df - 2) if df > 2 else math.inf
+    a, b = posterior.params
+    return a / (a + b), a * b / ((a + b) ** 2 * (a + b + 1))
+
+
+def _near_normal(posterior):
+    # The degrees of freedom of a t, both shapes of a Beta.
+    if posterior.family == "beta":
+        return min(posterior.params) >= NORMAL_SHAPE
+    return posterior.params[0] >= NORMAL_SHAPE
+
+
+def _draw(posterior, rng, size):
+    if posterior.family == "t":
+        df, loc, scale = posterior.params
+        return loc + scale * rng.standard_t(df, size)
+    return rng.beta(*posterior.params, size)
+
+
+def _phi(x):
+    return math.exp(-x * x / 2) / math.sqrt(2 * math.pi)
+
+
+def _cdf(x):
+    return math.erfc(-x / math.sqrt(2)) / 2
+
+
+def compare(a, b, draws=DRAWS, seed=SEED):
+    """Returns the ``Comparison`` of the posteriors ``a`` and ``b``."""
+    if _near_normal(a) and _near_normal(b):
+        # B - A is normal: P(B > A) = Phi(d / s) and the expected losses
+        # are E[max(-D, 0)] and E[max(D, 0)] of D ~ N(d, s^2).
+        mean_a, var_a = _mean_variance(a)
+        mean_b, var_b = _mean_variance(b)
+        d = mean_b - mean_a
+        s = math.sqrt(var_a + var_b)
+        if s == 0:
+            return Comparison(float(d > 0), max(d, 0.0), max(-d, 0.0), True)
+        z = d / s
+        return Comparison(
+            _cdf(z), s * _phi(z) + d * _cdf(z), s * _phi(z) - d * _cdf(-z), True
+        )
+    rng = np.random.default_rng(seed)
+    difference = _draw(b, rng, draws) - _draw(a, rng, draws)
+    return Comparison(
+        float(np.mean(difference > 0)),
+        float(np.mean(np.maximum(difference, 0))),
+        float(np.mean(np.maximum(-difference, 0))),
+        False,
+    )
+
+
+def bayesian_tests(frame, segment=None, draws=DRAWS, seed=SEED, tests=abtest.TESTS):
+    """Compares A and B for ``tests`` and ``CONVERSIONS`` from ``ab_moments``.
+
+    Returns a frame with a row per metric, or with a ``segment``, per
+    metric and segment value.
+    """
+    moments = abtest.group_moments(frame, segment)
+    cells = [None] if segment is None else sorted({value for value, _ in moments})
+
+    def lookup(value, number):
+        return moments.get(number if segment is None else (value, number))
+
+    rows = []
+
+    def add(value, number, title, a, b):
+        rows.append(
+            {
+                "test": number,
+                "value": value,
+                "metric": title,
+                "model": MODELS[a.family],
+                "mean_a": _mean_variance(a)[0],
+                "mean_b": _mean_variance(b)[0],
+                **compare(a, b, draws, seed)._asdict(),
+            }
+        )
+
+    for value in cells:
+        for test in tests:
+            found = lookup(value, test.number)
+            if found is not None and min(found[0][0], found[1][0]) >= 2:
+                a, b = mean_posterior(*found[0]), mean_posterior(*found[1])
+                add(value, test.number, test.title, a, b)
+        for title, successes, trials in CONVERSIONS:
+            success, trial = lookup(value, successes), lookup(value, trials)
+            if success is not None and trial is not None:
+                a, b = (
+                    conversion_posterior(min(s[0], t[0]), t[0])
+                    for s, t in zip(success[:2], trial[:2])
+                )
+                add(value, None, title, a, b)
+
+    columns = ["test", "value", "metric", "model", "mean_a", "mean_b"]
+    table = pd.DataFrame(rows, columns=columns + list(Comparison._fields))
+    table = table.astype({"test": "Int64"})
+    if segment is None:
+        return table.drop(columns="value").set_index("metric")
+    return table.set_index(["metric", "value"])
+
+
+def load_bayesian(segment=None, store=None):
+    """Returns ``bayesian_tests`` on the stored ``ab_moments``, or None.
+
+    Cached like ``abtest.load_results`` until ``ab_moments`` changes.
+    """
+    store = artifacts.store if store is None else store
+    if not store.exists(abtest.MOMENTS):
+        return None
+    return abtest._cached(
+        ("bayes", segment),
+        (abtest.MOMENTS,),
+        store,
+        lambda frames: bayesian_tests(frames[abtest.MOMENTS], segment),
+    )
@@ -0,0 +1,1725 @@
+"""Plotly figure builders for the dashboard's charts.
+
+Each builder takes the chart's artifact frame(s), plus the widget selection
+for interactive charts, and returns a new figure.
+"""
+
+import plotly.colors as colors
+import plotly.express as px
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+from analytics.abtest import (
+    ALPHA,
+    TESTS,
+    confidence_interval,
+    group_moments,
+    test_result,
+)
+from analytics.retention import retention_matrix
+
+
+def _period(dates):
+    # "for May 2021" within one month, the first and last day otherwise.
+    if len(dates) == 0:
+        return ""
+    first, last = dates.min(), dates.max()
+    if (first.year, first.month) == (last.year, last.month):
+        return f"for {first:%B %Y}"
+    return f"from {first:%b %d, %Y} to {last:%b %d, %Y}"
+
+
+def retention_heatmap(df, platform=None):
+    """Graph 1: daily retention rate (%) of each cohort, for one platform or all."""
+    if platform is None:
+        df = df[df["platform"].isna()]
+    else:
+        df = df[df["platform"] == platform]
+    retention = retention_matrix(df)
+    cohort_days = retention.index.strftime("%b %d")
+    period = _period(retention.index)
+
+    fig = go.Figure(
+        go.Heatmap(
+            z=retention.values,
+            x=retention.columns,
+            y=cohort_days,
+            colorscale="YlGnBu",
+            zmin=0.0,
+            zmax=60.0,
+            text=retention.values,
+            texttemplate="%{text:.2f}",
+            textfont=dict(size=10),
+            colorbar=dict(title="Percentage"),
+            hovertemplate="Cohort %{y}, day %{x}: %{z:.1f}%<extra></extra>",
+        )
+    )
+
+    fig.update_layout(
+        title=f"Daily Retention Rate(%) {period}",
+        title_font=dict(size=30, family="Arial, sans-serif"),
+        xaxis_title="Cohort Index",
+        yaxis_title="Cohort Days",
+        xaxis=dict(dtick=1, side="top"),
+        yaxis=dict(autorange="reversed"),
+        paper_bgcolor="white",
+        plot_bgcolor="white",
+        height=max(900, 29 * len(retention)),
+        margin=dict(l=40, r=40, t=120, b=40),
+    )
+    return fig
+
+
+def age_distribution(df, country):
+    """Graph 2: age histogram of the players of one country."""
+    df_age = df[df["country"] == country]
+
+    fig = go.Figure()
+
+    fig.add_trace(
+        go.Histogram(
+            x=df_age["age"].astype(float),
+            nbinsx=10,
+            histfunc="count",
+            marker_color="skyblue",
+            opacity=0.75,
+            name="Age Distribution",
+        )
+    )
+
+    fig.update_layout(
+        title=f"Age Distribution Histogram for {country}",
+        xaxis_title="Age",
+        yaxis_title="Frequency",
+        template="plotly_white",
+    )
+
+    fig.update_traces(marker=dict(line=dict(width=1, color="black")))
+    return fig
+
+
+def daily_hours(df3):
+    """Graph 3: average daily hours spent per user on weekdays and weekends."""
+    grouped = (
+        df3.groupby(["group_type", "group_id"])
+        .agg({"avg_hours_spent_per_user": "mean"})
+        .reset_index()
+    )
+    grouped["group_label"] = grouped.groupby("group_type").cumcount() + 1
+    grouped["group_label"] = (
+        grouped["group_type"] + " " + grouped["group_label"].astype(str)
+    )
+
+    fig = go.Figure()
+    weekday_data = df3[df3["is_weekend"] == 0]
+    fig.add_trace(
+        go.Scatter(
+            x=weekday_data["event_date"],
+            y=weekday_data["avg_hours_spent_per_user"],
+            mode="markers+lines",
+            marker=dict(
+                size=10, symbol="x", color="blue", line=dict(width=2, color="black")
+            ),
+            text=weekday_data["avg_hours_spent_per_user"],
+            textposition="top center",
+            name="Weekday",
+        )
+    )
+
+    weekend_data = df3[df3["is_weekend"] == 1]
+    fig.add_trace(
+        go.Scatter(
+            x=weekend_data["event_date"],
+            y=weekend_data["avg_hours_spent_per_user"],
+            mode="markers+lines",
+            marker=dict(
+                size=10, symbol="x", color="red", line=dict(width=2, color="black")
+            ),
+            text=weekend_data["avg_hours_spent_per_user"],
+            textposition="top center",
+            name="Weekend",
+        )
+    )
+
+    fig.update_xaxes(tickformat="%b %d", dtick="D1", tickangle=45)
+
+    fig.update_layout(
+        title="Average hours spent per user in weekends and weekdays "
+        f"{_period(df3['event_date'])}",
+        title_font=dict(size=15, family="Arial, sans-serif"),
+        xaxis_title="Date",
+        yaxis_title="Average Hours Spent Per User",
+        xaxis_title_font=dict(size=20, family="Arial, sans-serif"),
+        yaxis_title_font=dict(size=20, family="Arial, sans-serif"),
+        xaxis=dict(showgrid=False, gridcolor="white"),
+        yaxis=dict(showgrid=False, gridcolor="white"),
+        paper_bgcolor="white",
+        plot_bgcolor="white",
+        title_x=0.05,
+        margin=dict(l=40, r=40, t=40, b=40),
+    )
+
+    for _, row in grouped.iterrows():
+        fig.add_annotation(
+            x=df3[df3["group_id"] == row["group_id"]]["event_date"].mean(),
+            y=row["avg_hours_spent_per_user"],
+            text=row["group_label"],
+            showarrow=True,
+            arrowhead=2,
+            ax=0,
+            ay=-40,
+        )
+    return fig
+
+
+def time_spent_by_age(df_age_stat):
+    """Graph 4: total time spent by age group."""
+    fig = go.Figure()
+    fig.add_trace(
+        go.Bar(
+            x=df_age_stat["age_bins"],
+            y=df_age_stat["time_spend"],
+            marker=dict(color="orange"),
+            text=df_age_stat["time_spend"].round(),
+            textposition="inside",
+            textfont=dict(size=20, color="white"),
+            name="Time Spent",
+            width=0.3,
+        )
+    )
+
+    fig.update_layout(
+        title="Time Spent by Age Group",
+        title_font=dict(size=15, family="Arial, sans-serif"),
+        xaxis_title="Age Group",
+        yaxis_title="Time Spent",
+        xaxis_title_font=dict(size=20, family="Arial, sans-serif"),
+        yaxis_title_font=dict(size=20, family="Arial, sans-serif"),
+        xaxis=dict(showgrid=False),
+        yaxis=dict(showgrid=False, range=[0, 7650]),
+        paper_bgcolor="white",
+        plot_bgcolor="white",
+        margin=dict(l=40, r=40, t=40, b=40),
+    )
+    return fig
+
+
+def time_spent_by_level(df_level_time):
+    """Graph 5: average time spent per user by level group."""
+    fig = go.Figure(
+        data=[
+            go.Bar(
+                x=df_level_time["level_group"],
+                y=df_level_time["avg_time_per_user"],
+                marker=dict(color="royalblue"),
+                text=df_level_time["avg_time_per_user"].round(1),
+                textposition="auto",
+            )
+        ]
+    )
+
+    fig.update_layout(
+        title="Average Time Spent per User by Level Group",
+        title_font=dict(size=15, family="Arial, sans-serif"),
+        xaxis_title="Level Group",
+        yaxis_title="Average Time Spent per User (seconds)",
+        xaxis_title_font=dict(size=20, family="Arial, sans-serif"),
+        yaxis_title_font=dict(size=20, family="Arial, sans-serif"),
+        xaxis=dict(showgrid=False, gridcolor="white"),
+        yaxis=dict(showgrid=True, gridcolor="lightgrey"),
+        paper_bgcolor="white",
+        plot_bgcolor="white",
+        title_x=0.01,
+        margin=dict(l=40, r=40, t=40, b=40),
+        bargap=0.15,
+        bargroupgap=0.1,
+    )
+    return fig
+
+
+def level_outcomes(df_level_status):
+    """Graph 6: average wins, quits and fails per user by level group."""
+    trace1 = go.Bar(
+        x=df_level_status["level_group"],
+        y=df_level_status["avg_wins_per_user"],
+        name="Wins",
+        marker=dict(color="limegreen", opacity=0.7),
+    )
+
+    trace2 = go.Bar(
+        x=df_level_status["level_group"],
+        y=df_level_status["avg_quits_per_user"],
+        name="Quits",
+        marker=dict(color="orange", opacity=0.7),
+        yaxis="y2",
+    )
+
+    trace3 = go.Bar(
+        x=df_level_status["level_group"],
+        y=df_level_status["avg_fails_per_user"],
+        name="Fails",
+        marker=dict(color="darkblue", opacity=0.7),
+    )
+
+    layout = go.Layout(
+        title="Average Wins, Quits, and Fails per User by Level Group",
+        title_font=dict(size=15, family="Arial, sans-serif"),
+        xaxis=dict(
+            title="Level Group",
+            title_font=dict(size=18, family="Arial, sans-serif"),
+            showgrid=False,
+        ),
+        yaxis=dict(
+            title="Avg Wins/Fails per User",
+            title_font=dict(size=18, family="Arial, sans-serif"),
+            showgrid=False,
+        ),
+        yaxis2=dict(
+            title="Avg Quits per User",
+            title_font=dict(size=18, family="Arial, sans-serif"),
+            overlaying="y",
+            side="right",
+            showgrid=False,
+            rangemode="tozero",
+        ),
+        paper_bgcolor="white",
+        plot_bgcolor="white",
+        barmode="group",
+        showlegend=True,
+        legend=dict(x=0.8, y=1.1, orientation="h"),
+        margin=dict(l=50, r=50, t=50, b=50),
+    )
+    fig = go.Figure(data=[trace1, trace2, trace3], layout=layout)
+    return fig
+
+
+def moves_by_level(df_level_status):
+    """Graph 7: average moves made and moves left per user by level group."""
+    trace1 = go.Scatter(
+        x=df_level_status["level_group"],
+        y=df_level_status["avg_movesmade_per_user"],
+        mode="lines+markers",
+        name="Moves Made",
+        line=dict(color="blue", width=3),
+        marker=dict(size=8, symbol="circle", color="blue"),
+        yaxis="y1",
+    )
+
+    trace2 = go.Bar(
+        x=df_level_status["level_group"],
+        y=df_level_status["avg_movesleft_per_user"],
+        name="Moves Left",
+        marker=dict(color="orange"),
+        yaxis="y2",
+        opacity=0.7,
+    )
+
+    layout = go.Layout(
+        title="Average Moves Made vs. Moves Left per User by Level Group",
+        title_font=dict(size=15, family="Arial, sans-serif"),
+        xaxis=dict(
+            title="Level Group",
+            title_font=dict(size=18, family="Arial, sans-serif"),
+            showgrid=False,
+        ),
+        yaxis=dict(
+            title="Avg Moves Made per User",
+            title_font=dict(size=18, family="Arial, sans-serif"),
+            showgrid=False,
+        ),
+        yaxis2=dict(
+            title="Avg Moves Left per User",
+            title_font=dict(size=18, family="Arial, sans-serif"),
+            overlaying="y",
+            side="right",
+            showgrid=False,
+        ),
+        paper_bgcolor="white",
+        plot_bgcolor="white",
+        showlegend=True,
+        legend=dict(x=0.7, y=1.1, orientation="h"),
+        margin=dict(l=50, r=50, t=50, b=50),
+    )
+    fig = go.Figure(data=[trace1, trace2], layout=layout)
+    return fig
+
+
+def coin_spend_by_age(df_age_stat):
+    """Graph 8: average coin spend by age group."""
+    fig = go.Figure()
+    fig.add_trace(
+        go.Scatter(
+            x=df_age_stat["age_bins"],
+            y=df_age_stat["coin_spend"],
+            mode="markers+lines",
+            marker=dict(size=12, color="royalblue", line=dict(width=2, color="black")),
+            line=dict(width=2, color="royalblue"),
+            text=df_age_stat["coin_spend"],
+            textposition="top center",
+            name="Coin Spend",
+        )
+    )
+
+    fig.update_layout(
+        title="Coin Spend by Age Group",
+        title_font=dict(size=15, family="Arial, sans-serif"),
+        xaxis_title="Age Group",
+        yaxis_title="Coin Spend",
+        xaxis_title_font=dict(size=20, family="Arial, sans-serif"),
+        yaxis_title_font=dict(size=20, family="Arial, sans-serif"),
+        xaxis=dict(showgrid=False),
+        yaxis=dict(showgrid=False, range=[15000, 21500]),
+        paper_bgcolor="white",
+        plot_bgcolor="white",
+        margin=dict(l=40, r=40, t=40, b=40),
+    )
+    return fig
+
+
+def booster_spend_by_age(df_age_stat):
+    """Graph 9: average booster spend by age group."""
+    fig = go.Figure()
+    fig.add_trace(
+        go.Scatter(
+            x=df_age_stat["age_bins"],
+            y=df_age_stat["booster_spend"],
+            mode="markers+lines",
+            marker=dict(size=12, color="royalblue", line=dict(width=2, color="black")),
+            line=dict(width=2, color="royalblue"),
+            text=df_age_stat["booster_spend"],
+            textposition="top center",
+            name="Booster Spend",
+        )
+    )
+
+    fig.update_layout(
+        title="Booster Spend by Age Group",
+        title_font=dict(size=15, family="Arial, sans-serif"),
+        xaxis_title="Age Group",
+        yaxis_title="Booster Spend",
+        xaxis_title_font=dict(size=20, family="Arial, sans-serif"),
+        yaxis_title_font=dict(size=20, family="Arial, sans-serif"),
+        xaxis=dict(showgrid=False),
+        yaxis=dict(showgrid=False, range=[10, 22]),
+        paper_bgcolor="white",
+        plot_bgcolor="white",
+        margin=dict(l=40, r=40, t=40, b=40),
+    )
+    return fig
+
+
+def users_by_country(df2_2):
+    """Graph 10: share of users by country."""
+    fig = go.Figure(
+        data=[
+            go.Pie(
+                labels=df2_2["country"],
+                values=df2_2["num_users"],
+                textinfo="label+percent",
+                hoverinfo="label+value+percent",
+                marker=dict(
+                    colors=colors.qualitative.Pastel, line=dict(color="white", width=2)
+                ),
+            )
+        ]
+    )
+
+    fig.update_layout(
+        title="User Distribution by Country",
+        title_font=dict(size=15, family="Arial, sans-serif"),
+        paper_bgcolor="white",
+        plot_bgcolor="white",
+        width=1000,
+        height=800,
+    )
+    return fig
+
+
+def revenue_by_country(df2_2):
+    """Graph 11: share of revenue by country."""
+    fig = go.Figure(
+        data=[
+            go.Pie(
+                labels=df2_2["country"],
+                values=df2_2["sum_revenue"],
+                textinfo="label+percent",
+                hoverinfo="label+value+percent",
+                marker=dict(
+                    colors=colors.qualitative.Pastel, line=dict(color="white", width=2)
+                ),
+            )
+        ]
+    )
+
+    fig.update_layout(
+        title="Revenue Distribution by Country",
+        title_font=dict(size=15, family="Arial, sans-serif"),
+        paper_bgcolor="white",
+        plot_bgcolor="white",
+        width=1000,
+        height=800,
+    )
+    return fig
+
+
+def event_revenue(df12):
+    """Graph 12: average revenue by event participation."""
+    fig = go.Figure(
+        data=[
+            go.Pie(
+                labels=df12["event_participate"],
+                values=df12["avg_rev"],
+                textinfo="label+percent",
+                insidetextorientation="radial",
+                hole=0.3,
+                marker=dict(colors=["darkblue", "orange"]),
+            )
+        ]
+    )
+
+    fig.update_layout(
+        title="Average Revenue by Event Participation",
+        title_font=dict(size=15, family="Arial, sans-serif"),
+        paper_bgcolor="white",
+        plot_bgcolor="white",
+        margin=dict(l=40, r=40, t=40, b=40),
+    )
+    return fig
+
+
+def event_time_spent(df12):
+    """Graph 12: average time spent by event participation."""
+    fig = go.Figure(
+        data=[
+            go.Pie(
+                labels=df12["event_participate"],
+                values=df12["avg_time_spend"],
+                textinfo="label+percent",
+                insidetextorientation="radial",
+                hole=0.3,
+                marker=dict(colors=["darkblue"]),
+            )
+        ]
+    )
+
+    fig.update_layout(
+        title="Average Time Spent by Event Participation",
+        title_font=dict(size=15, family="Arial, sans-serif"),
+        paper_bgcolor="white",
+        plot_bgcolor="white",
+        margin=dict(l=40, r=40, t=40, b=40),
+    )
+    return fig
+
+
+def installs_by_network(df13):
+    """Graph 13: number of installs by network."""
+    fig = px.bar(
+        df13.sort_values(by="total_installments", ascending=False),
+        x="total_installments",
+        y="network",
+        orientation="h",  # Horizontal
+        color="network",
+        color_discrete_sequence=px.colors.qualitative.Pastel,
+        title="Number of Installs by Network",
+    )
+
+    fig.update_layout(
+        title_font=dict(size=15, family="Arial, sans-serif"),
+        paper_bgcolor="white",
+        plot_bgcolor="white",
+        xaxis_title="Number of Installs",
+        yaxis_title="Network",
+        margin=dict(l=100, r=40, t=40, b=40),
+    )
+
+    fig.update_traces(texttemplate="%{x}", textposition="outside")
+    return fig
+
+
+def cost_by_network(df13):
+    """Graph 14: total marketing cost by network."""
+    fig = px.bar(
+        df13.sort_values(by="total_cost", ascending=False),
+        x="total_cost",
+        y="network",
+        orientation="h",
+        color="network",
+        color_discrete_sequence=px.colors.qualitative.Pastel,
+        title="Total cost by network",
+    )
+
+    fig.update_layout(
+        title_font=dict(size=15, family="Arial, sans-serif"),
+        paper_bgcolor="white",
+        plot_bgcolor="white",
+        xaxis_title="Total Cost",
+        yaxis_title="Network",
+        margin=dict(l=100, r=40, t=40, b=40),
+    )
+
+    fig.update_traces(texttemplate="%{x}", textposition="outside")
+    return fig
+
+
+def installs_per_dollar_by_network(df13):
+    """Graph 15: number of installs per $ by network."""
+    fig = px.bar(
+        df13,
+        x="installs_per_cost_unit",
+        y="network",
+        orientation="h",
+        color="network",
+        color_discrete_sequence=px.colors.qualitative.Pastel,
+        title="Number of Installation per $ by Network",
+    )
+
+    fig.update_layout(
+        title_font=dict(size=15, family="Arial, sans-serif"),
+        paper_bgcolor="white",
+        plot_bgcolor="white",
+        xaxis_title="Number of Installation per $",
+        yaxis_title="Network",
+        margin=dict(l=100, r=40, t=40, b=40),
+    )
+
+    fig.update_traces(texttemplate="%{x}", textposition="outside")
+    return fig
+
+
+def installs_by_country(df16):
+    """Graph 16: number of installs by country."""
+    fig = px.bar(
+        df16.sort_values(by="total_installments", ascending=False),
+        x="total_installments",
+        y="country",
+        orientation="h",
+        color="country",
+        color_discrete_sequence=px.colors.qualitative.Pastel,
+        title="Number of Installs by Country",
+    )
+
+    fig.update_layout(
+        title_font=dict(size=15, family="Arial, sans-serif"),
+        paper_bgcolor="white",
+        plot_bgcolor="white",
+        xaxis_title="Number of Installs",
+        yaxis_title="Country",
+        margin=dict(l=100, r=40, t=40, b=40),
+    )
+
+    fig.update_traces(texttemplate="%{x}", textposition="outside")
+    return fig
+
+
+def cost_by_country(df16):
+    """Graph 17: total marketing cost by country."""
+    fig = px.bar(
+        df16.sort_values(by="total_cost", ascending=False),
+        x="total_cost",
+        y="country",
+        orientation="h",
+        color="country",
+        color_discrete_sequence=px.colors.qualitative.Pastel,
+        title="Total cost by country",
+    )
+
+    fig.update_layout(
+        title_font=dict(size=15, family="Arial, sans-serif"),
+        paper_bgcolor="white",
+        plot_bgcolor="white",
+        xaxis_title="Total Cost",
+        yaxis_title="Country",
+        margin=dict(l=100, r=40, t=40, b=40),
+    )
+
+    fig.update_traces(texttemplate="%{x}", textposition="outside")
+    return fig
+
+
+def installs_per_dollar_by_country(df16):
+    """Graph 18: number of installs per $ by country."""
+    fig = px.bar(
+        df16,
+        x="installs_per_cost_unit",
+        y="country",
+        orientation="h",
+        color="country",
+        color_discrete_sequence=px.colors.qualitative.Pastel,
+        title="Number of Installation per $ by Country",
+    )
+
+    fig.update_layout(
+        title_font=dict(size=15, family="Arial, sans-serif"),
+        paper_bgcolor="white",
+        plot_bgcolor="white",
+        xaxis_title="Number of Installation per $",
+        yaxis_title="Country",
+        margin=dict(l=100, r=40, t=40, b=40),
+    )
+
+    fig.update_traces(texttemplate="%{x}", textposition="outside")
+    return fig
+
+
+def revenue_per_user_by_country(df19):
+    """Graph 19: revenue per user by country."""
+    fig = px.bar(
+        df19,
+        x="total_rev_per_user",
+        y="country",
+        orientation="h",
+        color="country",
+        color_discrete_sequence=px.colors.qualitative.Pastel,
+        title="Revenue per user by Country",
+    )
+
+    fig.update_layout(
+        title_font=dict(size=15, family="Arial, sans-serif"),
+        paper_bgcolor="white",
+        plot_bgcolor="white",
+        xaxis_title="Revenue per user",
+        yaxis_title="country",
+        margin=dict(l=100, r=40, t=40, b=40),
+    )
+
+    fig.update_traces(texttemplate="%{x}", textposition="outside")
+    return fig
+
+
+def platform_revenue_cost(df20):
+    """Graph 20: revenue, cost and revenue/cost by platform."""
+    trace1 = go.Bar(
+        x=df20["platform"],
+        y=df20["revenue"],
+        name="Revenue",
+        marker=dict(color="limegreen", opacity=0.7),
+        width=0.1,
+        offsetgroup=0,
+    )
+
+    trace2 = go.Bar(
+        x=df20["platform"],
+        y=df20["cost"],
+        name="Cost",
+        marker=dict(color="darkblue", opacity=0.7),
+        width=0.1,
+        offsetgroup=1,
+    )
+
+    trace3 = go.Bar(
+        x=df20["platform"],
+        y=df20["rev_to_cost"],
+        name="Rev to Cost",
+        marker=dict(color="orange", opacity=0.7),
+        yaxis="y2",
+        width=0.1,
+        offsetgroup=2,
+    )
+
+    layout = go.Layout(
+        title="Revenue, Cost and Revenue/Cost by Platform (Android & iOS)",
+        title_font=dict(size=15, family="Arial, sans-serif"),
+        xaxis=dict(
+            title="Platform",
+            title_font=dict(size=18, family="Arial, sans-serif"),
+            showgrid=False,
+        ),
+        yaxis=dict(
+            title="$",
+            title_font=dict(size=22, family="Arial, sans-serif"),
+            showgrid=False,
+        ),
+        yaxis2=dict(
+            title="Revenue to Cost",
+            title_font=dict(size=18, family="Arial, sans-serif"),
+            overlaying="y",
+            side="right",
+            showgrid=False,
+            rangemode="tozero",
+        ),
+        paper_bgcolor="white",
+        plot_bgcolor="white",
+        barmode="group",
+        showlegend=True,
+        legend=dict(x=0.8, y=1.1, orientation="h"),
+        margin=dict(l=50, r=50, t=50, b=50),
+    )
+
+    fig = go.Figure(data=[trace1, trace2, trace3], layout=layout)
+    return fig
+
+
+def platform_split(df21_1, df21_2):
+    """Graph 21: time spent and user share of Android vs iOS."""
+    fig = make_subplots(
+        rows=1,
+        cols=2,
+        subplot_titles=(
+            "Time Spent",
+            "User Distribution",
+        ),
+        specs=[[{"type": "domain"}, {"type": "domain"}]],
+    )
+
+    # (Average Time Spent per User by Platform)
+    fig.add_trace(
+        go.Pie(
+            labels=df21_1["platform"],
+            values=df21_1["avg_time_spent_per_user"],
+            textinfo="label+percent",
+            insidetextorientation="radial",
+            hole=0.3,
+            marker=dict(colors=["limegreen", "lightgrey"]),
+        ),
+        row=1,
+        col=1,
+    )
+
+    # (Number of Users by Platform)
+    fig.add_trace(
+        go.Pie(
+            labels=df21_2["platform"],
+            values=df21_2["user_count"],
+            textinfo="label+percent",
+            insidetextorientation="radial",
+            hole=0.3,
+            marker=dict(colors=["limegreen", "lightgrey"]),
+        ),
+        row=1,
+        col=2,
+    )
+
+    fig.update_layout(
+        paper_bgcolor="white",
+        plot_bgcolor="white",
+        margin=dict(l=40, r=40, t=40, b=40),
+    )
+    return fig
+
+
+def daily_roas(df22):
+    """Graph 22: daily ROAS."""
+    avg_roas = df22["ROAS"].mean()
+    fig = go.Figure()
+
+    fig.add_trace(
+        go.Scatter(
+            x=df22["date"],
+            y=df22["ROAS"],
+            mode="lines+markers",
+            name="ROAS",
+            line=dict(color="black"),
+            marker=dict(color="red"),
+        )
+    )
+
+    fig.update_layout(
+        title="Daily ROAS",
+        xaxis_title="Date",
+        yaxis_title="ROAS",
+        plot_bgcolor="white",
+        paper_bgcolor="white",
+        xaxis=dict(showgrid=False, showline=True),
+        yaxis=dict(showgrid=False, showline=True),
+    )
+
+    fig.add_annotation(
+        text=f"ROAS: {avg_roas:.2f}",
+        xref="paper",
+        yref="paper",
+        x=0.90,
+        y=1.1,
+        showarrow=False,
+        font=dict(size=12, color="darkblue"),
+        align="right",
+    )
+    return fig
+
+
+def daily_installs(df23):
+    """Graph 23: daily installs."""
+    avg_installs = df23["daily_installs"].mean()
+
+    fig = go.Figure()
+    fig.add_trace(
+        go.Scatter(
+            x=df23["install_date"],
+            y=df23["daily_installs"],
+            mode="lines+markers",
+            name="Daily Install",
+            line=dict(color="black"),
+            marker=dict(color="darkblue"),
+        )
+    )
+
+    fig.update_layout(
+        title="Daily Install",
+        xaxis_title="Install Date",
+        yaxis_title="Daily Install",
+        plot_bgcolor="white",
+        paper_bgcolor="white",
+        xaxis=dict(showgrid=False, showline=True),
+        yaxis=dict(showgrid=False, showline=True),
+    )
+
+    fig.add_annotation(
+        text=f"Average Daily Install: {avg_installs:.2f}",
+        xref="paper",
+        yref="paper",
+        x=0.95,
+        y=0.99,
+        showarrow=False,
+        font=dict(size=12, color="darkblue"),
+        align="right",
+    )
+    return fig
+
+
+def sessions_and_dau(df24):
+    """Graph 24: daily sessions and DAU."""
+    avg_dau = df24["DAU"].mean()
+    avg_daily_sessions = df24["daily_sessions"].mean()
+
+    fig = go.Figure()
+
+    fig.add_trace(
+        go.Scatter(
+            x=df24["event_date"],
+            y=df24["daily_sessions"],
+            mode="lines+markers",
+            name="Daily Sessions",
+            line=dict(color="black"),
+            marker=dict(color="black"),
+        )
+    )
+
+    fig.add_trace(
+        go.Scatter(
+            x=df24["event_date"],
+            y=df24["DAU"],
+            mode="lines+markers",
+            name="DAU",
+            line=dict(color="orange"),
+            marker=dict(color="orange"),
+            yaxis="y2",
+        )
+    )
+
+    fig.update_layout(
+        title="Daily Sessions and DAU",
+        xaxis_title="Event Date",
+        yaxis_title="Daily Sessions",
+        yaxis2=dict(
+            title="DAU", overlaying="y", side="right", showgrid=False, showline=True
+        ),
+        plot_bgcolor="white",
+        paper_bgcolor="white",
+        xaxis=dict(showgrid=False, showline=True),
+        yaxis=dict(showgrid=False, showline=True),
+    )
+
+    fig.add_annotation(
+        text=f"Average DAU: {avg_dau:.2f}",
+        xref="paper",
+        yref="paper",
+        x=0.95,
+        y=0.95,
+        showarrow=False,
+        font=dict(size=12, color="orange"),
+        align="right",
+    )
+
+    fig.add_annotation(
+        text=f"Average Daily Sessions: {avg_daily_sessions:.2f}",
+        xref="paper",
+        yref="paper",
+        x=0.95,
+        y=0.90,
+        showarrow=False,
+        font=dict(size=12, color="black"),
+        align="right",
+    )
+    return fig
+
+
+def sessions_per_dau(df24):
+    """Graph 25: daily sessions per DAU."""
+    avg_sessions_per_dau = df24["sessions_per_DAU"].mean()
+
+    fig = go.Figure()
+
+    fig.add_trace(
+        go.Scatter(
+            x=df24["event_date"],
+            y=df24["sessions_per_DAU"],
+            mode="lines+markers",
+            name="Sessions per DAU",
+            line=dict(color="black"),
+            marker=dict(color="darkorange"),
+        )
+    )
+
+    fig.update_layout(
+        title="Sessions per DAU",
+        xaxis_title="Event Date",
+        yaxis_title="Sessions per DAU",
+        plot_bgcolor="white",
+        paper_bgcolor="white",
+        xaxis=dict(showgrid=False, showline=True),
+        yaxis=dict(showgrid=False, showline=True),
+    )
+
+    fig.add_annotation(
+        text=f"Average Sessions per DAU: {avg_sessions_per_dau:.2f}",
+        xref="paper",
+        yref="paper",
+        x=0.95,
+        y=0.95,
+        showarrow=False,
+        font=dict(size=12, color="darkblue"),
+        align="right",
+    )
+    return fig
+
+
+def daily_arpdau(df28):
+    """Graph 28: daily ARPDAU."""
+    avg_arpdau = df28["ARPDAU"].mean()
+    fig = go.Figure()
+
+    fig.add_trace(
+        go.Scatter(
+            x=df28["date"],
+            y=df28["ARPDAU"],
+            mode="lines+markers",
+            name="ARPDAU",
+            line=dict(color="black"),
+            marker=dict(color="magenta"),
+        )
+    )
+
+    fig.update_layout(
+        title="ARPDAU",
+        xaxis_title="Date",
+        yaxis_title="ARPDAU",
+        plot_bgcolor="white",
+        paper_bgcolor="white",
+        xaxis=dict(showgrid=False, showline=True),
+        yaxis=dict(showgrid=False, showline=True),
+    )
+
+    fig.add_annotation(
+        text=f"Average ARPDAU: {avg_arpdau:.2f}",
+        xref="paper",
+        yref="paper",
+        x=0.95,
+        y=1.1,
+        showarrow=False,
+        font=dict(size=12, color="darkblue"),
+        align="right",
+    )
+    return fig
+
+
+def playtime(df29):
+    """Graph 29: daily playtime and PlaytimeDAU."""
+    avg_playtime_dau = df29["playtime_dau"].mean()
+    avg_total_timespent = df29["total_time_spent"].mean()
+
+    fig = go.Figure()
+
+    fig.add_trace(
+        go.Scatter(
+            x=df29["date"],
+            y=df29["total_time_spent"],
+            mode="lines+markers",
+            name="Playtime",
+            line=dict(color="black"),
+            marker=dict(color="black"),
+        )
+    )
+
+    fig.add_trace(
+        go.Scatter(
+            x=df29["date"],
+            y=df29["playtime_dau"],
+            mode="lines+markers",
+            name="PlaytimeDAU",
+            line=dict(color="orange"),
+            marker=dict(color="orange"),
+            yaxis="y2",
+        )
+    )
+
+    fig.update_layout(
+        title="Playtime & PlaytimeDAU",
+        xaxis_title="Date",
+        yaxis_title="Playtime",
+        yaxis2=dict(
+            title="PlaytimeDAU",
+            overlaying="y",
+            side="right",
+            showgrid=False,
+            showline=True,
+        ),
+        plot_bgcolor="white",
+        paper_bgcolor="white",
+        xaxis=dict(showgrid=False, showline=True),
+        yaxis=dict(showgrid=False, showline=True),
+    )
+
+    fig.add_annotation(
+        text=f"PlaytimeDAU: {avg_playtime_dau:.2f}",
+        xref="paper",
+        yref="paper",
+        x=0.95,
+        y=1.1,
+        showarrow=False,
+        font=dict(size=12, color="black"),
+        align="right",
+    )
+
+    fig.add_annotation(
+        text=f"Playtime: {avg_total_timespent:.2f}",
+        xref="paper",
+        yref="paper",
+        x=0.96,
+        y=1.2,
+        showarrow=False,
+        font=dict(size=12, color="black"),
+        align="right",
+    )
+    return fig
+
+
+def daily_arpinstall(df30):
+    """Graph 30: daily ARPInstall."""
+    avg_arpinstall = df30["arp_install"].mean()
+    fig = go.Figure()
+
+    fig.add_trace(
+        go.Scatter(
+            x=df30["date"],
+            y=df30["arp_install"],
+            mode="lines+markers",
+            name="ARPInstall",
+            line=dict(color="black"),
+            marker=dict(color="limegreen"),
+        )
+    )
+
+    fig.update_layout(
+        title="Daily ARPInstall",
+        xaxis_title="Date",
+        yaxis_title="ARPInstall",
+        plot_bgcolor="white",
+        paper_bgcolor="white",
+        xaxis=dict(showgrid=False, showline=True),
+        yaxis=dict(showgrid=False, showline=True),
+    )
+
+    fig.add_annotation(
+        text=f"ARPInstall: {avg_arpinstall:.2f}",
+        xref="paper",
+        yref="paper",
+        x=0.90,
+        y=0.99,
+        showarrow=False,
+        font=dict(size=12, color="darkblue"),
+        align="right",
+    )
+    return fig
+
+
+def daily_cpi(df31):
+    """Graph 31: daily CPI."""
+    avg_cpi = df31.cpi.mean()
+
+    fig = go.Figure()
+
+    fig.add_trace(
+        go.Scatter(
+            x=df31["date"],
+            y=df31["cpi"],
+            mode="lines+markers",
+            name="CPI",
+            line=dict(color="black"),
+            marker=dict(color="orange"),
+        )
+    )
+
+    fig.update_layout(
+        title="Daily CPI",
+        xaxis_title="Date",
+        yaxis_title="CPI",
+        plot_bgcolor="white",
+        paper_bgcolor="white",
+        xaxis=dict(showgrid=False, showline=True),
+        yaxis=dict(showgrid=False, showline=True),
+    )
+
+    fig.add_annotation(
+        text=f"CPI: {avg_cpi:.2f}",
+        xref="paper",
+        yref="paper",
+        x=0.90,
+        y=1.1,
+        showarrow=False,
+        font=dict(size=15, color="darkblue"),
+        align="right",
+    )
+    return fig
+
+
+def stickiness(df32):
+    """Graph 32: daily stickiness (DAU/MAU)."""
+    avg_stickiness = df32.stickiness.mean()
+
+    fig = go.Figure()
+
+    fig.add_trace(
+        go.Scatter(
+            x=df32["date"],
+            y=df32["stickiness"],
+            mode="lines+markers",
+            name="Stickiness",
+            line=dict(color="black"),
+            marker=dict(color="orange"),
+        )
+    )
+
+    fig.update_layout(
+        title="Daily Stickiness",
+        xaxis_title="Date",
+        yaxis_title="Stickiness",
+        plot_bgcolor="white",
+        paper_bgcolor="white",
+        xaxis=dict(showgrid=False, showline=True),
+        yaxis=dict(showgrid=False, showline=True),
+    )
+
+    fig.add_annotation(
+        text=f"Stickiness: {avg_stickiness:.2f}",
+        xref="paper",
+        yref="paper",
+        x=0.90,
+        y=1.1,
+        showarrow=False,
+        font=dict(size=15, color="darkblue"),
+        align="right",
+    )
+    return fig
+
+
+def pltv_segments(df33):
+    """Graph 33: payment, transactions, AOV and size of the PLTV segments."""
+    grouped_df = (
+        df33.groupby("segment", observed=False)
+        .agg({"total_payment": "sum", "total_transaction": "mean"})
+        .reset_index()
+    )
+
+    pie1 = go.Pie(
+        labels=grouped_df["segment"],
+        values=grouped_df["total_payment"],
+        textinfo="label+percent",
+        insidetextorientation="radial",
+        marker=dict(colors=colors.qualitative.Pastel),
+        hole=0.4,
+    )
+
+    pie2 = go.Pie(
+        labels=grouped_df["segment"],
+        values=grouped_df["total_transaction"],
+        textinfo="label+percent",
+        insidetextorientation="radial",
+        marker=dict(colors=colors.qualitative.Pastel),
+        hole=0.4,
+    )
+
+    grouped_df = (
+        df33.groupby("segment", observed=False)
+        .agg({"average_order_value": ["mean", "count"]})
+        .reset_index()
+    )
+
+    pie3 = go.Pie(
+        labels=grouped_df["segment"],
+        values=grouped_df.average_order_value["mean"],
+        textinfo="label+percent",
+        insidetextorientation="radial",
+        marker=dict(colors=colors.qualitative.Pastel),
+        hole=0.4,
+    )
+
+    pie4 = go.Pie(
+        labels=grouped_df["segment"],
+        values=grouped_df.average_order_value["count"],
+        textinfo="label+percent",
+        insidetextorientation="radial",
+        marker=dict(colors=colors.qualitative.Pastel),
+        hole=0.4,
+    )
+
+    fig = make_subplots(
+        rows=2,
+        cols=2,
+        specs=[
+            [{"type": "domain"}, {"type": "domain"}],
+            [{"type": "domain"}, {"type": "domain"}],
+        ],
+        subplot_titles=[
+            "Total Payment Sum by Segment",
+            "Average Transaction Count by Segment",
+            "Average Order Value by Segment",
+            "Distribution of Segments",
+        ],
+        horizontal_spacing=0,  # Yatay boşluk (default: 0.2)
+        vertical_spacing=0.1,
+    )
+
+    fig.add_trace(pie1, row=1, col=1)
+    fig.add_trace(pie2, row=1, col=2)
+    fig.add_trace(pie3, row=2, col=1)
+    fig.add_trace(pie4, row=2, col=2)
+
+    fig.update_layout(
+        paper_bgcolor="white",
+        plot_bgcolor="white",
+        showlegend=True,
+        margin=dict(l=20, r=20, t=50, b=50),
+        width=1000,
+        height=750,
+    )
+    return fig
+
+
+def segment_dau(df33_2):
+    """Graph 33.2: daily DAU of the paying users in each PLTV segment."""
+    fig = go.Figure()
+
+    fig.add_trace(
+        go.Scatter(
+            x=df33_2[df33_2["segment"] == "A"]["event_date"],
+            y=df33_2[df33_2["segment"] == "A"]["dau"],
+            mode="lines+markers",
+            name="A segment DAU",
+            line=dict(color="black"),
+            marker=dict(color="black"),
+        )
+    )
+
+    fig.add_trace(
+        go.Scatter(
+            x=df33_2[df33_2["segment"] == "B"]["event_date"],
+            y=df33_2[df33_2["segment"] == "B"]["dau"],
+            mode="lines+markers",
+            name="B segment DAU",
+            line=dict(color="orange"),
+            marker=dict(color="orange"),
+        )
+    )
+
+    fig.add_trace(
+        go.Scatter(
+            x=df33_2[df33_2["segment"] == "C"]["event_date"],
+            y=df33_2[df33_2["segment"] == "C"]["dau"],
+            mode="lines+markers",
+            name="C segment DAU",
+            line=dict(color="purple"),
+            marker=dict(color="purple"),
+        )
+    )
+
+    fig.add_trace(
+        go.Scatter(
+            x=df33_2[df33_2["segment"] == "D"]["event_date"],
+            y=df33_2[df33_2["segment"] == "D"]["dau"],
+            mode="lines+markers",
+            name="D segment DAU",
+            line=dict(color="darkblue"),
+            marker=dict(color="darkblue"),
+        )
+    )
+
+    fig.update_layout(
+        title="DAU by Segments",
+        xaxis_title="Date",
+        yaxis_title="DAU",
+        plot_bgcolor="white",
+        paper_bgcolor="white",
+        xaxis=dict(showgrid=False, showline=True),
+        yaxis=dict(showgrid=False, showline=True),
+    )
+    return fig
+
+
+def segment_payments(df33_2):
+    """Graph 33.3: daily total payment of each PLTV segment."""
+    fig = go.Figure()
+
+    fig.add_trace(
+        go.Scatter(
+            x=df33_2[df33_2["segment"] == "A"]["event_date"],
+            y=df33_2[df33_2["segment"] == "A"]["total_payment"],
+            mode="lines+markers",
+            name="A segment Total Payment",
+            line=dict(color="black"),
+            marker=dict(color="black"),
+        )
+    )
+
+    fig.add_trace(
+        go.Scatter(
+            x=df33_2[df33_2["segment"] == "B"]["event_date"],
+            y=df33_2[df33_2["segment"] == "B"]["total_payment"],
+            mode="lines+markers",
+            name="B segment Total Payment",
+            line=dict(color="orange"),
+            marker=dict(color="orange"),
+        )
+    )
+
+    fig.add_trace(
+        go.Scatter(
+            x=df33_2[df33_2["segment"] == "C"]["event_date"],
+            y=df33_2[df33_2["segment"] == "C"]["total_payment"],
+            mode="lines+markers",
+            name="C segment Total Payment",
+            line=dict(color="purple"),
+            marker=dict(color="purple"),
+        )
+    )
+
+    fig.add_trace(
+        go.Scatter(
+            x=df33_2[df33_2["segment"] == "D"]["event_date"],
+            y=df33_2[df33_2["segment"] == "D"]["total_payment"],
+            mode="lines+markers",
+            name="D segment Total Payment",
+            line=dict(color="darkblue"),
+            marker=dict(color="darkblue"),
+        )
+    )
+
+    fig.update_layout(
+        title="Total Payment by Segments",
+        xaxis_title="Date",
+        yaxis_title="Total Payment",
+        plot_bgcolor="white",
+        paper_bgcolor="white",
+        xaxis=dict(showgrid=False, showline=True),
+        yaxis=dict(showgrid=False, showline=True),
+    )
+    return fig
+
+
+def rfm_segments(df34):
+    """Graph 34: RFM segment sizes."""
+    fig = px.treemap(
+        df34,
+        path=["segments"],
+        values="count",
+        color="count",
+        color_continuous_scale="Viridis",
+        title="RFM Segments",
+    )
+
+    fig.update_layout(
+        title_font=dict(size=15, family="Arial, sans-serif"),
+        paper_bgcolor="white",
+        plot_bgcolor="white",
+        margin=dict(l=40, r=40, t=40, b=40),
+    )
+    return fig
+
+
+def roas_by_network(df, country):
+    """Graph 22_2: daily ROAS of each network in one country."""
+    df = df[df["country"] == country]
+    fig = go.Figure()
+    annot_loc = 1
+    for network in df.network.unique():
+        temp_df = df[df["network"] == network]
+        fig.add_trace(
+            go.Scatter(
+                x=temp_df["date"],
+                y=temp_df["daily_roas"],
+                mode="lines+markers",
+                name=network,
+            )
+        )
+
+        avg_roas = temp_df["daily_roas"].mean()
+        fig.add_annotation(
+            text=f"Average {network} ROAS: {avg_roas:.2f}",
+            xref="paper",
+            yref="paper",
+            x=0.05,
+            y=annot_loc,
+            showarrow=False,
+            font=dict(size=12, color="darkblue"),
+            align="right",
+        )
+        annot_loc -= 0.1
+
+    fig.update_layout(
+        title=f"ROAS for {country}",
+        xaxis_title="Date",
+        yaxis_title="ROAS",
+        plot_bgcolor="white",
+        paper_bgcolor="white",
+        xaxis=dict(showgrid=False, showline=True),
+        yaxis=dict(showgrid=False, showline=True),
+    )
+    return fig
+
+
+def arpdau_by_country(df, country):
+    """Graph 28_2: daily ARPDAU of one country."""
+    a = df[df["country"] == country]
+    avg_arpdau_country = a["ARPDAU"].mean()
+    fig = go.Figure()
+
+    fig.add_trace(
+        go.Scatter(
+            x=a["date"],
+            y=a["ARPDAU"],
+            mode="lines+markers",
+            name="ARPDAU",
+            line=dict(color="black"),
+            marker=dict(color="magenta"),
+        )
+    )
+
+    fig.update_layout(
+        title=f"ARPDAU for {country}",
+        xaxis_title="Date",
+        yaxis_title="ARPDAU",
+        plot_bgcolor="white",
+        paper_bgcolor="white",
+        xaxis=dict(showgrid=False, showline=True),
+        yaxis=dict(showgrid=False, showline=True),
+    )
+
+    fig.add_annotation(
+        text=f"Average ARPDAU: {avg_arpdau_country:.2f}",
+        xref="paper",
+        yref="paper",
+        x=0.95,
+        y=1.1,
+        showarrow=False,
+        font=dict(size=12, color="darkblue"),
+        align="right",
+    )
+    return fig
+
+
+def cpi_by_network(df, country):
+    """Graph 31_2: daily CPI of each network in one country."""
+    a = df[df["country"] == country]
+    fig = go.Figure()
+    annot_loc = 1.05
+    for network in a.network.unique():
+        temp_df = a[a["network"] == network]
+        fig.add_trace(
+            go.Scatter(
+                x=temp_df["date"],
+                y=temp_df["cpi"],
+                mode="lines+markers",
+                name=network,
+            )
+        )
+
+        avg_cpi = temp_df["cpi"].mean()
+        fig.add_annotation(
+            text=f"Average {network} CPI: {avg_cpi:.2f}",
+            xref="paper",
+            yref="paper",
+            x=0.09,
+            y=annot_loc,
+            showarrow=False,
+            font=dict(size=12, color="darkblue"),
+            align="right",
+        )
+        annot_loc -= 0.1
+
+    fig.update_layout(
+        title=f"CPI for {country}",
+        xaxis_title="Date",
+        yaxis_title="CPI",
+        plot_bgcolor="white",
+        paper_bgcolor="white",
+        xaxis=dict(showgrid=False, showline=True),
+        yaxis=dict(showgrid=False, showline=True),
+    )
+    return fig
+
+
+def country_switcher(df, countries, build, default=None):
+    """Combines one figure per country into a single figure with a dropdown.
+
+    ``build(df, country)`` is one of the builders above. All countries'
+    traces are sent to the browser once and the dropdown only toggles their
+    visibility, title and annotations, so switching countries needs no
+    round trip to the server.
+    """
+    default = countries[0] if default is None else default
+    figures = {country: build(df, country) for country in countries}
+
+    fig = go.Figure(layout=figures[default].layout)
+    trace_countries = []
+    for country, country_fig in figures.items():
+        for trace in country_fig.data:
+            trace.visible = country == default
+            fig.add_trace(trace)
+            trace_countries.append(country)
+
+    buttons = []
+    for country, country_fig in figures.items():
+        layout = country_fig.layout
+        buttons.append(
+            dict(
+                label=country,
+                method="update",
+                args=[
+                    {"visible": [c == country for c in trace_countries]},
+                    {
+                        "title": layout.title.to_plotly_json(),
+                        "annotations": [a.to_plotly_json() for a in layout.annotations],
+                    },
+                ],
+            )
+        )
+
+    fig.update_layout(
+        updatemenus=[
+            dict(
+                buttons=buttons,
+                active=list(figures).index(default),
+                direction="down",
+                showactive=True,
+                x=1,
+                xanchor="right",
+                y=1.2,
+                yanchor="top",
+            )
+        ]
+    )
+    return fig
+
+
+def ab_distribution(df_hist, df_moments, number, alpha=ALPHA):
+    """Part II: test ``number``'s distribution per group and the CIs of the means.
+
+    Drawn from the ``ab_histograms`` bins and the ``ab_moments`` of the
+    test, so it always matches the reported result.
+    """
+    test = TESTS[number - 1]
+    a, b, _ = group_moments(df_moments)[number]
+    result = test_result(test.method, a, b, alpha)
+    colors_by_group = {"A": "royalblue", "B": "darkorange"}
+
+    fig = make_subplots(
+        rows=2,
+        cols=1,
+        row_heights=[0.75, 0.25],
+        vertical_spacing=0.12,
+        subplot_titles=(
+            "Distribution (share of the group, %)",
+            f"Mean and {1 - alpha:.0%} confidence interval",
+        ),
+    )
+    bins = df_hist[df_hist["test"] == number]
+    for group, moments in (("A", a), ("B", b)):
+        rows = bins[bins["group_id"] == group]
+        share = 100 * rows["count"] / max(rows["count"].sum(), 1)
+        fig.add_trace(
+            go.Bar(
+                x=(rows["bin_start"] + rows["bin_end"]) / 2,
+                y=share,
+                width=rows["bin_end"] - rows["bin_start"],
+                name=f"Group {group}",
+                marker=dict(color=colors_by_group[group]),
+                opacity=0.55,
+                hovertemplate="%{x:.4g}: %{y:.2f}%<extra>" + group + "</extra>",
+            ),
+            row=1,
+            col=1,
+        )
+        low, high = confidence_interval(*moments, alpha)
+        fig.add_trace(
+            go.Scatter(
+                x=[moments[1]],
+                y=[f"Group {group}"],
+                error_x=dict(
+                    type="data",
+                    symmetric=False,
+                    array=[high - moments[1]],
+                    arrayminus=[moments[1] - low],
+                ),
+                mode="markers",
+                marker=dict(color=colors_by_group[group], size=10),
+                showlegend=False,
+                hovertemplate=(
+                    f"Mean {moments[1]:.4g} ({low:.4g}, {high:.4g})<extra></extra>"
+                ),
+            ),
+            row=2,
+            col=1,
+        )
+
+    verdict = "H0 rejected" if result.rejected else "H0 not rejected"
+    fig.update_layout(
+        title=(
+            f"{test.title}: {test.method}-test statistic {result.statistic:.2f},"
+            f" p = {result.p_value:.3g} ({verdict})"
+        ),
+        barmode="overlay",
+        bargap=0,
+        plot_bgcolor="white",
+        paper_bgcolor="white",
+        height=520,
+        legend=dict(orientation="h", x=1, xanchor="right", y=1.02, yanchor="bottom"),
+    )
+    fig.update_xaxes(showgrid=False, showline=True)
+    fig.update_yaxes(showgrid=False, showline=True)
+    return fig
+
+
+def sequential_p_values(df, alpha=ALPHA):
+    """Part II: always-valid p-value of each daily A/B test after each day."""
+    fig = go.Figure()
+    for test in TESTS:
+        days = df[df["test"] == test.number]
+        if not len(days):
+            continue
+        fig.add_trace(
+            go.Scatter(
+                x=days["date"],
+                y=days["p_value"],
+                mode="lines",
+                name=f"{test.number}) {test.title}",
+                line=dict(shape="hv"),
+                hovertemplate="%{x|%b %d}: p = %{y:.4g}<extra></extra>",
+            )
+        )
+
+    fig.add_hline(
+        y=alpha,
+        line=dict(color="red", dash="dash"),
+        annotation_text=f"alpha = {alpha}",
+        annotation_position="bottom right",
+    )
+    fig.update_layout(
+        title="Always-Valid p-Values of the Daily Tests (mSPRT)",
+        xaxis_title="Date",
+        yaxis_title="p-value",
+        yaxis_type="log",
+        plot_bgcolor="white",
+        paper_bgcolor="white",
+        xaxis=dict(showgrid=False, showline=True),
+        yaxis=dict(showgrid=False, showline=True),
+    )
+    return fig
@@ -0,0 +1,108 @@
+"""Converts the legacy ``data/*.pkl`` artifacts to Arrow IPC files.
+
+With ``--compact``, Arrow artifacts written before the schema policy of
+``analytics.schema`` are rewritten under it, with a report of the bytes
+saved in memory and on disk.
+
+Usage::
+
+    python -m analytics.convert [data_dir] [--remove-pickles] [--compact]
+"""
+
+import argparse
+import glob
+import os
+import time
+
+import pandas as pd
+
+from analytics.artifacts import (
+    ARROW_SUFFIX,
+    DATA_DIR,
+    PICKLE_SUFFIX,
+    read_artifact,
+    write_artifact,
+)
+from analytics.manifest import write_manifest
+from analytics.schema import memory_bytes
+
+
+def convert_pickle(pickle_path):
+    """Writes ``<name>.arrow`` next to ``<name>.pkl`` and returns its path."""
+    arrow_path = pickle_path[: -len(PICKLE_SUFFIX)] + ARROW_SUFFIX
+    write_artifact(pd.read_pickle(pickle_path), arrow_path)
+    return arrow_path
+
+
+def compact_artifact(arrow_path):
+    """Rewrites an Arrow artifact with compact types.
+
+    Returns its (memory, file) bytes before and after.
+    """
+    frame = read_artifact(arrow_path)
+    before = (memory_bytes(frame), os.path.getsize(arrow_path))
+    write_artifact(frame, arrow_path)
+    compacted = read_artifact(arrow_path)
+    if not compacted.astype(frame.dtypes.to_dict()).equals(frame):
+        raise ValueError(f"{arrow_path} changed when compacted")
+    return before, (memory_bytes(compacted), os.path.getsize(arrow_path))
+
+
+def report_compaction(data_dir):
+    totals = [0, 0, 0, 0]
+    for arrow_path in sorted(glob.glob(os.path.join(data_dir, "*" + ARROW_SUFFIX))):
+        (memory, size), (new_memory, new_size) = compact_artifact(arrow_path)
+        for i, value in enumerate((memory, size, new_memory, new_size)):
+            totals[i] += value
+        print(
+            f"{os.path.basename(arrow_path):>22}  memory {memory:>9,} -> {new_memory:>9,} B"
+            f"  file {size:>9,} -> {new_size:>9,} B"
+        )
+    memory, size, new_memory, new_size = totals
+    print(
+        f"{'total':>22}  memory {memory:>9,} -> {new_memory:>9,} B"
+        f"  file {size:>9,} -> {new_size:>9,} B"
+        f"  saved {memory - new_memory:,} B in memory, {size - new_size:,} B on disk"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("data_dir", nargs="?", default=DATA_DIR)
+    parser.add_argument(
+        "--remove-pickles",
+        action="store_true",
+        help="delete each pickle once its Arrow file has been written",
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="rewrite the Arrow artifacts with compact column types",
+    )
+    args = parser.parse_args()
+
+    for pickle_path in sorted(glob.glob(os.path.join(args.data_dir, "*.pkl"))):
+        arrow_path = convert_pickle(pickle_path)
+
+        start = time.perf_counter()
+        read_artifact(pickle_path)
+        pickle_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        read_artifact(arrow_path)
+        arrow_seconds = time.perf_counter() - start
+
+        print(
+            f"{os.path.basename(pickle_path):>16} -> {os.path.basename(arrow_path):<18}"
+            f" {os.path.getsize(pickle_path):>9,} B -> {os.path.getsize(arrow_path):>9,} B"
+            f"  read {pickle_seconds * 1000:6.2f} ms -> {arrow_seconds * 1000:6.2f} ms"
+        )
+        if args.remove_pickles:
+            os.remove(pickle_path)
+
+    if args.compact:
+        report_compaction(args.data_dir)
+    write_manifest(args.data_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,12 @@
+"""Offline pipeline that rebuilds every dashboard artifact from raw tables.
+
+The notebooks' BigQuery SQL runs on an embedded DuckDB database over local
+Parquet copies of the raw event tables, and the results are written to
+``data/`` with :func:`analytics.artifacts.write_artifact`. Run it as one
+job, e.g. nightly from cron::
+
+    python -m analytics.etl --raw-dir raw --data-dir data
+"""
+
+from analytics.etl import abtests, graphs  # noqa: F401  (registers the builders)
+from analytics.etl.engine import RAW_DIR, TABLES, artifacts, build_artifacts, connect
@@ -0,0 +1,55 @@
+"""Rebuilds the dashboard artifacts from the raw Parquet tables.
+
+Usage::
+
+    python -m analytics.etl [--raw-dir raw] [--data-dir data] [--full]
+                            [--workers N] [name ...]
+"""
+
+import argparse
+import time
+
+from analytics.artifacts import DATA_DIR
+from analytics.etl import RAW_DIR, artifacts, build_artifacts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "names",
+        nargs="*",
+        metavar="name",
+        help=f"artifacts to build (default: all of {', '.join(artifacts)})",
+    )
+    parser.add_argument("--raw-dir", default=RAW_DIR)
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="rebuild every artifact, re-aggregating the daily series from scratch",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="number of build processes (default: one per core)",
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = build_artifacts(
+        args.names or None,
+        args.raw_dir,
+        args.data_dir,
+        full=args.full,
+        workers=args.workers,
+    )
+    built = sum(rows is not None for rows in results.values())
+    print(
+        f"Built {built} artifacts ({len(results) - built} unchanged)"
+        f" in {time.perf_counter() - start:.1f} s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,406 @@
+"""Builders of the Part II artifacts, ported from ``notebooks/part2.ipynb``.
+
+The notebook ran one query per group of A/B tests and compared the A and B
+rows of the result; these artifacts hold the same results, which
+``analytics.abtest`` tests:
+
+* ``ab_sessions``: per user time spent, level and sessions (tests 1-4);
+* ``ab_payments``: per paying user payments, transactions, AOV and
+  purchase frequency (tests 5-8);
+* ``ab_daily``: per day and group sessions, active users, revenue,
+  purchases and installs, the numerators and denominators of the daily
+  tests (9-13);
+* ``ab_sequential``: per daily test and day, the cumulative group
+  moments and the always-valid mSPRT p-value (see
+  ``analytics.sequential``);
+* ``ab_histograms``: per test and group, the counts of its values in
+  ``HISTOGRAM_BINS`` bins shared by both groups, which Part II plots;
+* ``ab_moments``: the count, mean and ``m2`` of every test's values per
+  group (see ``analytics.moments``), all the z-tests and t-tests need,
+  for the whole population and per value of each segment dimension
+  (``analytics.abtest.SEGMENTS``);
+* ``ab_resampled``: per test, the bootstrap, permutation and repeated A/A
+  checks of ``analytics.resampling``.
+
+The per-user artifacts carry each user's segments, and ``ab_daily`` is
+aggregated with ``GROUPING SETS``: the rows with a null ``segment`` are the
+whole population's, the others are per ``segment`` and ``value``, from the
+same pass over the raw tables.
+
+The experiment tables are only read for the days since the last refresh.
+``ab_daily`` is extended like the Part I daily series. The per-user
+totals are kept in ``ab_users``, which folds each refresh's new sessions
+and payments into the totals of the users they belong to; ``ab_sessions``
+and ``ab_payments`` are derived from it. User ids are kept there only.
+``ab_moments``, ``ab_histograms`` and ``ab_resampled`` are not extended:
+a refresh changes the totals of users already counted, so they are
+derived in full from those artifacts, without reading the raw tables.
+"""
+
+import numpy as np
+import pandas as pd
+
+from analytics import abtest, resampling, sequential
+from analytics.etl.engine import artifact, query, since
+from analytics.moments import Moments
+
+_ENTER = "q2_table_ab_test_enter"
+_SESSION = "q2_table_ab_test_session"
+_REVENUE = "q2_table_ab_test_revenue"
+
+
+def _add(left, right):
+    # NaN is "no rows", not an unknown value.
+    return np.where(
+        np.isnan(left), right, np.where(np.isnan(right), left, left + right)
+    )
+
+
+# The per-user totals of ab_users and how two parts of one combine.
+TOTALS = {
+    "total_timespent": _add,
+    "session_count": _add,
+    "level": np.fmax,
+    "total_payment": _add,
+    "transaction_count": _add,
+    "payment_level": np.fmax,
+}
+
+
+def _fold(partial, keys):
+    grouped = partial.groupby(keys, sort=False)
+    return pd.concat(
+        [
+            (
+                grouped[column].sum(min_count=1)
+                if combine is _add
+                else grouped[column].max()
+            )
+            for column, combine in TOTALS.items()
+        ],
+        axis=1,
+    )
+
+
+def _combine(left, right):
+    index = left.index.union(right.index)
+    left, right = left.reindex(index), right.reindex(index)
+    return pd.DataFrame(
+        {
+            column: combine(
+                left[column].to_numpy(dtype=float), right[column].to_numpy(dtype=float)
+            )
+            for column, combine in TOTALS.items()
+        },
+        index=index,
+    )
+
+
+@artifact(
+    "ab_users",
+    tables=[_SESSION, _REVENUE, _ENTER],
+    incremental="last_day",
+    accumulate=True,
+)
+def ab_users(con, day, previous):
+    # Each user's totals are kept as the totals before the last day seen
+    # (base_*) plus that day's, so that the next refresh can re-read the
+    # last day, which may have been loaded only in part, without counting
+    # it twice. Totals are NaN for users without sessions or payments.
+    partial = query(
+        con,
+        f"""
+        WITH sessions AS (
+            SELECT
+                user_id,
+                DATE(event_timestamp) AS date,
+                SUM(time_spent) AS total_timespent,
+                COUNT(event_timestamp) AS session_count,
+                MAX(level) AS level
+            FROM {_SESSION}
+            {since("event_timestamp", day)}
+            GROUP BY user_id, DATE(event_timestamp)
+        ),
+
+        payments AS (
+            SELECT
+                user_id,
+                DATE(event_timestamp) AS date,
+                SUM(dollar_amount) AS total_payment,
+                COUNT(event_timestamp) AS transaction_count,
+                MAX(level) AS payment_level
+            FROM {_REVENUE}
+            {since("event_timestamp", day)}
+            GROUP BY user_id, DATE(event_timestamp)
+        )
+
+        SELECT *
+        FROM sessions
+        FULL JOIN payments USING (user_id, date)
+        """,
+    )
+    last = partial["date"].max() if len(partial) else pd.Timestamp(day)
+    base = _fold(partial[partial["date"] < last], "user_id")
+    latest = _fold(partial[partial["date"] >= last], "user_id")
+    last_day = partial.groupby("user_id")["date"].max()
+
+    if previous is not None:
+        previous = previous.set_index("user_id")
+        stored = previous[[f"base_{column}" for column in TOTALS]]
+        base = _combine(stored.set_axis(list(TOTALS), axis=1), base)
+        last_day = pd.concat([previous["last_day"], last_day], axis=1).max(axis=1)
+    else:
+        base = base.reindex(base.index.union(latest.index))
+    totals = _combine(base, latest)
+
+    users = query(
+        con,
+        f"""
+        SELECT
+            user_id,
+            ANY_VALUE(group_id) AS group_id,
+            {", ".join(f"ANY_VALUE({s}) AS {s}" for s in abtest.SEGMENTS)}
+        FROM {_ENTER}
+        GROUP BY user_id
+        """,
+    ).set_index("user_id")
+    frame = totals.join(users).join(base.add_prefix("base_"))
+    frame["last_day"] = last_day.reindex(frame.index).astype("datetime64[ns]")
+    frame.index.name = "user_id"
+    frame = frame.sort_index().reset_index()
+    columns = ["user_id", "group_id", *abtest.SEGMENTS, "last_day", *TOTALS]
+    return frame[columns + [f"base_{column}" for column in TOTALS]]
+
+
+@artifact("ab_sessions", tables=[], after=["ab_users"])
+def ab_sessions(con, ab_users):
+    # The totals are float32 when stored values allow; divide in float64.
+    df = ab_users[ab_users["session_count"] > 0].astype({c: float for c in TOTALS})
+    return pd.DataFrame(
+        {
+            "total_timespent": df["total_timespent"],
+            "level": df["level"].astype("Int64"),
+            "session_count": df["session_count"].astype("Int64"),
+            "timespent_per_session": df["total_timespent"] / df["session_count"],
+            "group_id": df["group_id"].astype(object),
+            **{segment: df[segment].astype(object) for segment in abtest.SEGMENTS},
+        }
+    ).reset_index(drop=True)
+
+
+@artifact("ab_payments", tables=[], after=["ab_users"])
+def ab_payments(con, ab_users):
+    df = ab_users[ab_users["transaction_count"] > 0].astype({c: float for c in TOTALS})
+    df = pd.DataFrame(
+        {
+            "level": df["payment_level"].astype("Int64"),
+            "total_payment": df["total_payment"],
+            "transaction_count": df["transaction_count"].astype("Int64"),
+            "average_order_value": df["total_payment"] / df["transaction_count"],
+            "group_id": df["group_id"].astype(object),
+            **{segment: df[segment].astype(object) for segment in abtest.SEGMENTS},
+        }
+    ).reset_index(drop=True)
+    df["purchase_freq"] = df["transaction_count"] / df.shape[0]
+    return df
+
+
+def _grouping_sets(*keys):
+    # The whole population's grouping plus one per segment dimension.
+    keys = ", ".join(keys)
+    sets = [f"({keys})"] + [f"({keys}, e.{s})" for s in abtest.SEGMENTS]
+    return f"GROUPING SETS ({', '.join(sets)})"
+
+
+def _segment_columns():
+    # '' rather than NULL for the whole population, so that the rows of the
+    # three aggregations still match in the joins on these columns.
+    segment = " ".join(f"WHEN GROUPING(e.{s}) = 0 THEN '{s}'" for s in abtest.SEGMENTS)
+    value = " ".join(
+        f"WHEN GROUPING(e.{s}) = 0 THEN COALESCE(CAST(e.{s} AS VARCHAR), '')"
+        for s in abtest.SEGMENTS
+    )
+    return f"CASE {segment} ELSE '' END AS segment, CASE {value} ELSE '' END AS value"
+
+
+@artifact(
+    "ab_daily",
+    tables=[_SESSION, _REVENUE, _ENTER],
+    incremental="date",
+)
+def ab_daily(con, day):
+    # The notebook's five daily queries share their (date, group) grouping,
+    # so their counts and sums are joined into one frame; each test reads
+    # the days that its own query returned (see analytics.abtest).
+    return query(
+        con,
+        f"""
+        WITH daily_sessions AS (
+            SELECT
+                DATE(s.event_timestamp) AS date,
+                e.group_id,
+                {_segment_columns()},
+                COUNT(s.user_id) AS session_count,
+                COUNT(DISTINCT s.user_id) AS dau
+            FROM
+                {_SESSION} s
+            JOIN
+                {_ENTER} e
+            ON
+                s.user_id = e.user_id
+            {since("s.event_timestamp", day)}
+            GROUP BY
+                {_grouping_sets("DATE(s.event_timestamp)", "e.group_id")}
+        ),
+
+        daily_revenue AS (
+            SELECT
+                DATE(r.event_timestamp) AS date,
+                e.group_id,
+                {_segment_columns()},
+                SUM(r.dollar_amount) AS total_revenue,
+                COUNT(DISTINCT r.event_timestamp) AS daily_purchases
+            FROM
+                {_REVENUE} r
+            JOIN
+                {_ENTER} e
+            ON
+                r.user_id = e.user_id
+            {since("r.event_timestamp", day)}
+            GROUP BY
+                {_grouping_sets("DATE(r.event_timestamp)", "e.group_id")}
+        ),
+
+        daily_installs AS (
+            SELECT
+                DATE(e.install_timestamp) AS date,
+                e.group_id,
+                {_segment_columns()},
+                COUNT(DISTINCT e.user_id) AS total_installs
+            FROM
+                {_ENTER} e
+            {since("e.install_timestamp", day)}
+            GROUP BY
+                {_grouping_sets("DATE(e.install_timestamp)", "e.group_id")}
+        )
+
+        SELECT
+            date,
+            group_id,
+            NULLIF(segment, '') AS segment,
+            NULLIF(value, '') AS value,
+            session_count,
+            dau,
+            total_revenue,
+            daily_purchases,
+            total_installs
+        FROM
+            daily_sessions
+        FULL JOIN
+            daily_revenue USING (date, group_id, segment, value)
+        FULL JOIN
+            daily_installs USING (date, group_id, segment, value)
+        WHERE
+            date IS NOT NULL
+        ORDER BY
+            date,
+            group_id,
+            segment NULLS FIRST,
+            value
+        """,
+    )
+
+
+@artifact(
+    "ab_sequential",
+    tables=[],
+    after=["ab_daily"],
+    incremental="date",
+    accumulate=True,
+)
+def ab_sequential(con, day, previous, ab_daily):
+    # The state after the days before the watermark is kept; only the days
+    # from the watermark on are folded in again.
+    return sequential.monitor(ab_daily, day, previous)
+
+
+# Bins per test; the ends hold the values below the 0.5th and above the
+# 99.5th percentile, so that a few outliers do not squash the rest.
+HISTOGRAM_BINS = 40
+HISTOGRAM_RANGE = (0.5, 99.5)
+
+
+@artifact("ab_histograms", tables=[], after=list(abtest.SOURCES))
+def ab_histograms(con, *frames):
+    frames = dict(zip(abtest.SOURCES, frames))
+    parts = []
+    for test in abtest.TESTS:
+        a, b, _ = abtest.samples(test, frames[test.source])
+        a, b = a[~np.isnan(a)], b[~np.isnan(b)]
+        values = np.concatenate([a, b])
+        if not len(values):
+            continue
+        low, high = np.percentile(values, HISTOGRAM_RANGE)
+        if low == high:
+            low, high = low - 0.5, high + 0.5
+        edges = np.linspace(low, high, HISTOGRAM_BINS + 1)
+        for group, group_values in (("A", a), ("B", b)):
+            counts, _ = np.histogram(np.clip(group_values, low, high), edges)
+            parts.append(
+                pd.DataFrame(
+                    {
+                        "test": test.number,
+                        "group_id": group,
+                        "bin_start": edges[:-1],
+                        "bin_end": edges[1:],
+                        "count": counts,
+                    }
+                )
+            )
+    return pd.concat(parts, ignore_index=True)
+
+
+@artifact("ab_moments", tables=[], after=list(abtest.SOURCES))
+def ab_moments(con, *frames):
+    # A row per test and group, plus one (group_id None) for the values the
+    # notebook computed the confidence interval of; then a row per test,
+    # segment value and group (see abtest.segment_moments). Rebuilt whole:
+    # new days change the totals of users already counted, and merging
+    # moments can add values but not replace them.
+    frames = dict(zip(abtest.SOURCES, frames))
+    rows = []
+
+    def add(test, segment, value, group, moments):
+        rows.append(
+            {
+                "test": test.number,
+                "segment": segment,
+                "value": value,
+                "group_id": group,
+                "count": int(moments.count),
+                "mean": float(moments.mean),
+                "m2": float(moments.m2),
+            }
+        )
+
+    for test in abtest.TESTS:
+        frame = frames[test.source]
+        a, b, pooled = abtest.samples(test, frame)
+        for group, values in (("A", a), ("B", b), (None, pooled)):
+            if values is not None:
+                add(test, None, None, group, Moments.of(values))
+        for segment in abtest.SEGMENTS:
+            values, a, b = abtest.segment_moments(test, frame, segment)
+            for i, value in enumerate(values):
+                add(test, segment, value, "A", a[i])
+                add(test, segment, value, "B", b[i])
+    return pd.DataFrame(rows)
+
+
+@artifact(resampling.RESAMPLED, tables=[], after=list(abtest.SOURCES))
+def ab_resampled(con, *frames):
+    # The batches run on as many processes as DuckDB got threads for this
+    # build, the engine's share of the cores.
+    (workers,) = con.execute("SELECT current_setting('threads')").fetchone()
+    frames = dict(zip(abtest.SOURCES, frames))
+    return resampling.resample_tests(frames, workers=workers).reset_index()
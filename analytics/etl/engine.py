@@ -0,0 +1,391 @@
+"""DuckDB connection over the raw Parquet tables and the artifact registry.
+
+The raw tables keep the names they have in BigQuery (``q1_table_session``,
+``q1_table_level_end``, ``q1_table_install``, ``q1_table_revenue``,
+``q1_table_cost``, ``q3_table_user_metrics`` and the Part II A/B test
+tables ``q2_table_ab_test_*``). Each one is either a
+single ``<raw_dir>/<table>.parquet`` file or a ``<raw_dir>/<table>/``
+directory of Parquet files, and is exposed to the queries as a view of the
+same name.
+
+Artifacts registered with ``incremental=<date column>`` are daily series
+that are only extended: a watermark per artifact (the last day it holds)
+is kept in ``<data_dir>/watermarks.json`` and each refresh re-aggregates
+the raw rows from that day on, replacing the stored days from the
+watermark onwards. Re-reading the watermark day picks up the rest of a day
+that was still being loaded at the previous refresh.
+
+Artifacts declare their inputs (raw tables and other artifacts), which
+makes the registry a DAG: ``build_artifacts`` runs independent builds
+concurrently on a process pool and skips every artifact whose inputs
+fingerprint (builder code, raw file sizes and mtimes, dependency
+contents) matches the one in ``<data_dir>/fingerprints.json``. Once every
+artifact is written, the manifest (``analytics.manifest``) is updated and
+the running dashboard swaps the new versions in.
+"""
+
+import glob
+import hashlib
+import inspect
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import duckdb
+import pandas as pd
+
+from analytics.artifacts import (
+    ARROW_SUFFIX,
+    DATA_DIR,
+    file_digest,
+    read_artifact,
+    write_artifact,
+)
+from analytics.manifest import write_manifest
+
+RAW_DIR = "raw"
+WATERMARKS_FILE = "watermarks.json"
+FINGERPRINTS_FILE = "fingerprints.json"
+
+TABLES = (
+    "q1_table_session",
+    "q1_table_level_end",
+    "q1_table_install",
+    "q1_table_revenue",
+    "q1_table_cost",
+    "q3_table_user_metrics",
+    "q2_table_ab_test_enter",
+    "q2_table_ab_test_session",
+    "q2_table_ab_test_revenue",
+)
+
+
+def table_path(raw_dir, table):
+    """Returns the Parquet file or glob of ``table``, or None if it is missing."""
+    directory = os.path.join(raw_dir, table)
+    if os.path.isdir(directory):
+        return os.path.join(directory, "**", "*.parquet")
+    path = directory + ".parquet"
+    if os.path.exists(path):
+        return path
+    return None
+
+
+def connect(raw_dir=RAW_DIR, tables=TABLES, threads=None):
+    """Opens an in-memory DuckDB database with a view for every raw table."""
+    missing = [table for table in tables if table_path(raw_dir, table) is None]
+    if missing:
+        raise FileNotFoundError(
+            f"Raw tables not found in {raw_dir!r}: {', '.join(missing)}"
+        )
+    con = duckdb.connect()
+    if threads is not None:
+        con.execute(f"SET threads TO {int(threads)}")
+    for table in tables:
+        path = table_path(raw_dir, table).replace("'", "''")
+        con.execute(f"CREATE VIEW {table} AS SELECT * FROM read_parquet('{path}')")
+    return con
+
+
+def query(con, sql):
+    """Runs ``sql`` and returns the result with BigQuery client dtypes.
+
+    ``bigquery.Client.to_dataframe`` returned nullable ``Int64`` integers and
+    nanosecond dates; matching it keeps the artifacts identical to the ones
+    the notebooks wrote, so the chart code does not have to care where they
+    came from.
+    """
+    frame = con.sql(sql).df()
+    for column, dtype in frame.dtypes.items():
+        if pd.api.types.is_integer_dtype(dtype):
+            frame[column] = frame[column].astype("Int64")
+        elif pd.api.types.is_datetime64_dtype(dtype):
+            frame[column] = frame[column].astype("datetime64[ns]")
+        elif isinstance(dtype, pd.CategoricalDtype):
+            # ENUMs, from querying a registered frame's categorical column.
+            frame[column] = frame[column].astype(object)
+    return frame
+
+
+def since(column, day):
+    """Returns the ``WHERE`` clause of an incremental query, if any."""
+    if day is None:
+        return ""
+    return f"WHERE {column} >= DATE '{day}'"
+
+
+class Artifact:
+    def __init__(
+        self, name, build, tables, after=(), incremental=None, accumulate=False
+    ):
+        self.name = name
+        self.build = build
+        self.tables = tuple(tables)
+        self.after = tuple(after)
+        self.incremental = incremental
+        self.accumulate = accumulate
+
+    def __repr__(self):
+        return f"Artifact({self.name!r})"
+
+
+artifacts = {}
+
+
+def artifact(name, tables, after=(), incremental=None, accumulate=False):
+    """Registers the decorated function as the builder of artifact ``name``.
+
+    The function is called with the DuckDB connection followed by the frames
+    of the artifacts listed in ``after``, and returns the artifact's frame.
+    Builders of ``incremental`` artifacts also get the first day to
+    aggregate (an ISO date string, or None for the whole history) right
+    after the connection, and return the rows of that day and later ones.
+
+    With ``accumulate``, the rows of an incremental artifact are not per
+    day: the builder also gets the stored frame (or None) after the day,
+    folds the raw rows of that day and later into it and returns the whole
+    frame. Its ``incremental`` column holds the last day each row saw.
+    """
+
+    def register(build):
+        artifacts[name] = Artifact(name, build, tables, after, incremental, accumulate)
+        return build
+
+    return register
+
+
+def read_watermarks(data_dir=DATA_DIR):
+    try:
+        with open(os.path.join(data_dir, WATERMARKS_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def _write_json(value, path):
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(value, f, indent=2, sort_keys=True)
+    os.replace(f"{path}.tmp", path)
+
+
+def write_watermarks(watermarks, data_dir=DATA_DIR):
+    _write_json(watermarks, os.path.join(data_dir, WATERMARKS_FILE))
+
+
+def _extend(spec, con, path, watermark, dependencies):
+    """Builds the incremental ``spec`` from ``watermark`` and merges it in."""
+    column = spec.incremental
+    previous = None
+    if watermark is not None and os.path.exists(path):
+        previous = read_artifact(path)
+    if previous is None:
+        watermark = None
+
+    def build(watermark, previous):
+        if spec.accumulate:
+            return spec.build(con, watermark, previous, *dependencies)
+        return spec.build(con, watermark, *dependencies)
+
+    frame = build(watermark, previous)
+    if previous is not None and list(previous.columns) != list(frame.columns):
+        # The builder changed since the stored series was written.
+        previous = None
+        frame = build(None, None)
+    if previous is not None and not spec.accumulate:
+        kept = previous[previous[column] < pd.Timestamp(watermark)]
+        frame = pd.concat([kept, frame], ignore_index=True)
+    frame = frame.sort_values(column, kind="stable", ignore_index=True)
+    if len(frame):
+        watermark = frame[column].max().date().isoformat()
+    return frame, watermark
+
+
+def table_fingerprint(raw_dir, table):
+    """Returns a hash of the names, sizes and mtimes of ``table``'s files."""
+    path = table_path(raw_dir, table)
+    files = sorted(glob.glob(path, recursive=True)) if path else []
+    digest = hashlib.sha1()
+    for file in files:
+        stat = os.stat(file)
+        digest.update(
+            f"{os.path.relpath(file, raw_dir)}:{stat.st_size}:{stat.st_mtime_ns};".encode()
+        )
+    return digest.hexdigest()
+
+
+def code_version(build):
+    """Returns a hash of the source file that defines ``build``."""
+    with open(inspect.getfile(build), "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def fingerprint(spec, raw_dir, data_dir):
+    """Hashes everything ``spec``'s artifact is built from.
+
+    That is its builder's code, the files of its raw tables and the content
+    of the artifacts it depends on, so an artifact is only rebuilt when one
+    of them changed.
+    """
+    payload = json.dumps(
+        [
+            spec.name,
+            code_version(spec.build),
+            {table: table_fingerprint(raw_dir, table) for table in spec.tables},
+            {
+                name: file_digest(os.path.join(data_dir, name + ARROW_SUFFIX))
+                for name in spec.after
+            },
+        ]
+    )
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def read_fingerprints(data_dir=DATA_DIR):
+    try:
+        with open(os.path.join(data_dir, FINGERPRINTS_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def write_fingerprints(fingerprints, data_dir=DATA_DIR):
+    _write_json(fingerprints, os.path.join(data_dir, FINGERPRINTS_FILE))
+
+
+def build_artifact(name, raw_dir, data_dir, watermark=None, threads=None):
+    """Builds artifact ``name`` into ``data_dir``; runs in a worker process.
+
+    Its dependencies are read back from ``data_dir``. Returns the number of
+    rows, the seconds taken and, for incremental artifacts, the new
+    watermark.
+    """
+    spec = artifacts[name]
+    start = time.perf_counter()
+    con = connect(raw_dir, spec.tables, threads)
+    path = os.path.join(data_dir, name + ARROW_SUFFIX)
+    dependencies = [
+        read_artifact(os.path.join(data_dir, dependency + ARROW_SUFFIX))
+        for dependency in spec.after
+    ]
+    if spec.incremental:
+        frame, watermark = _extend(spec, con, path, watermark, dependencies)
+    else:
+        frame = spec.build(con, *dependencies)
+    con.close()
+    write_artifact(frame, path)
+    return len(frame), time.perf_counter() - start, watermark
+
+
+def _inputs(name):
+    """Returns the raw tables that ``name`` and its dependencies read."""
+    spec = artifacts[name]
+    tables = list(spec.tables)
+    for dependency in spec.after:
+        tables += [t for t in _inputs(dependency) if t not in tables]
+    return tables
+
+
+def build_artifacts(
+    names=None,
+    raw_dir=RAW_DIR,
+    data_dir=DATA_DIR,
+    full=False,
+    workers=None,
+    log=print,
+):
+    """Builds ``names`` (every registered artifact by default) into ``data_dir``.
+
+    Artifacts that ``names`` depend on are built too. Without ``names``,
+    artifacts whose raw tables are missing are skipped. The builds run on a
+    pool of ``workers`` processes (one per core by default), each as soon as
+    the artifacts it depends on are written, and DuckDB's threads are split
+    between the workers. An artifact whose inputs have the same fingerprint
+    as when it was last built is skipped. Incremental artifacts only
+    aggregate the days since their watermark. ``full`` rebuilds everything
+    from scratch.
+
+    Returns a dict of the built artifacts' row counts, with None for the
+    skipped ones.
+    """
+    selected = []
+
+    def select(name):
+        if name in selected:
+            return
+        if name not in artifacts:
+            raise KeyError(f"Unknown artifact: {name}")
+        for dependency in artifacts[name].after:
+            select(dependency)
+        selected.append(name)
+
+    if names is None:
+        # A full build skips the artifacts of tables that are not there,
+        # e.g. the A/B test artifacts when only the Part I tables are.
+        names = []
+        for name in artifacts:
+            missing = [t for t in _inputs(name) if table_path(raw_dir, t) is None]
+            if missing:
+                log(f"{name:>14}  skipped, no {', '.join(missing)}")
+            else:
+                names.append(name)
+    for name in names:
+        select(name)
+
+    tables = sorted({table for name in selected for table in artifacts[name].tables})
+    missing = [table for table in tables if table_path(raw_dir, table) is None]
+    if missing:
+        raise FileNotFoundError(
+            f"Raw tables not found in {raw_dir!r}: {', '.join(missing)}"
+        )
+    os.makedirs(data_dir, exist_ok=True)
+
+    workers = workers or os.cpu_count() or 1
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    watermarks = read_watermarks(data_dir)
+    fingerprints = read_fingerprints(data_dir)
+    results = {}
+    waiting = list(selected)
+    running = {}
+
+    def schedule(pool):
+        for name in list(waiting):
+            spec = artifacts[name]
+            if any(dependency not in results for dependency in spec.after):
+                continue
+            waiting.remove(name)
+            key = fingerprint(spec, raw_dir, data_dir)
+            path = os.path.join(data_dir, name + ARROW_SUFFIX)
+            if not full and fingerprints.get(name) == key and os.path.exists(path):
+                results[name] = None
+                log(f"{name:>14}  unchanged")
+                return True
+            watermark = None if full else watermarks.get(name)
+            future = pool.submit(
+                build_artifact, name, raw_dir, data_dir, watermark, threads
+            )
+            running[future] = (name, key)
+        return False
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while waiting or running:
+            # Skipping an artifact can make its dependents ready at once.
+            while schedule(pool):
+                pass
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name, key = running.pop(future)
+                rows, seconds, watermark = future.result()
+                results[name] = rows
+                fingerprints[name] = key
+                write_fingerprints(fingerprints, data_dir)
+                if artifacts[name].incremental:
+                    watermarks[name] = watermark
+                    write_watermarks(watermarks, data_dir)
+                path = os.path.join(data_dir, name + ARROW_SUFFIX)
+                log(
+                    f"{name:>14}  {rows:>7,} rows  {os.path.getsize(path):>10,} B"
+                    f"  {seconds:7.2f} s"
+                )
+    write_manifest(data_dir)
+    return results
@@ -0,0 +1,160 @@
+"""Process-wide cache of serialized Plotly figures.
+
+Building a figure (layout dicts, annotation loops, subplots) and turning
+it into JSON is the most expensive part of a rerun once the artifacts are
+in memory. ``FigureCache`` keeps the JSON of every figure it has built,
+keyed by
+
+* the builder function and a hash of the module that defines it, and
+  of the modules of the builder functions passed as arguments to it, so
+  editing chart code invalidates the affected entries,
+* the content hash of every artifact the figure is built from, and
+* the widget selection (extra builder arguments).
+
+Entries are evicted least-recently-used once ``max_bytes`` of JSON is held.
+With ``persist_dir`` set, every built figure is also written to disk and
+read back on a cache miss, so a restarted server does not rebuild charts
+whose data and code did not change. The directory can be deleted at any
+time.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import plotly
+
+from analytics import artifacts
+
+
+def code_version(function):
+    """Returns a hash of the source file that defines ``function``."""
+    module = inspect.getmodule(function)
+    version = getattr(module, "__figure_code_version__", None)
+    if version is None:
+        with open(inspect.getfile(function), "rb") as f:
+            version = hashlib.sha1(f.read()).hexdigest()
+        version = f"{version}-plotly{plotly.__version__}"
+        module.__figure_code_version__ = version
+    return version
+
+
+def _describe(value):
+    return getattr(value, "__qualname__", repr(value))
+
+
+class FigureCache:
+    def __init__(self, store=None, max_bytes=64 << 20, persist_dir=None):
+        self.store = artifacts.store if store is None else store
+        self.max_bytes = max_bytes
+        self.persist_dir = persist_dir
+        self._specs = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key(self, build, sources, args):
+        digests = [self.store.digest(name) for name, _ in sources]
+        payload = json.dumps(
+            [
+                build.__module__,
+                build.__qualname__,
+                code_version(build),
+                # Wrappers like timeseries.from_cube get the chart builder
+                # as an argument; its code has to be part of the key too.
+                [code_version(arg) for arg in args if inspect.isfunction(arg)],
+                [[name, columns] for name, columns in sources],
+                digests,
+                list(args),
+            ],
+            default=_describe,
+        )
+        return hashlib.sha1(payload.encode()).hexdigest()
+
+    def figure_json(self, build, sources, *args):
+        """Returns the JSON of ``build(*frames, *args)``, building it if needed.
+
+        ``sources`` lists the artifacts passed to ``build``, in order; each
+        item is an artifact name or a ``(name, columns)`` pair.
+        """
+        sources = [
+            (source, None) if isinstance(source, str) else tuple(source)
+            for source in sources
+        ]
+        key = self.key(build, sources, args)
+        with self._lock:
+            spec = self._specs.get(key)
+            if spec is not None:
+                self._specs.move_to_end(key)
+                self.hits += 1
+                return spec
+
+        spec = self._read_disk(key)
+        if spec is not None:
+            self.disk_hits += 1
+        else:
+            self.misses += 1
+            frames = [self.store.load(name, columns) for name, columns in sources]
+            spec = build(*frames, *args).to_json()
+            self._write_disk(key, spec)
+
+        with self._lock:
+            self._insert(key, spec)
+        return spec
+
+    def _insert(self, key, spec):
+        if key in self._specs:
+            return
+        self._specs[key] = spec
+        self._bytes += len(spec)
+        while self._bytes > self.max_bytes and len(self._specs) > 1:
+            _, evicted = self._specs.popitem(last=False)
+            self._bytes -= len(evicted)
+            self.evictions += 1
+
+    def _disk_path(self, key):
+        return os.path.join(self.persist_dir, f"{key}.json")
+
+    def _read_disk(self, key):
+        if self.persist_dir is None:
+            return None
+        try:
+            with open(self._disk_path(key), encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _write_disk(self, key, spec):
+        if self.persist_dir is None:
+            return
+        os.makedirs(self.persist_dir, exist_ok=True)
+        path = self._disk_path(key)
+        with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+            f.write(spec)
+        os.replace(f"{path}.tmp", path)
+
+    def clear(self):
+        with self._lock:
+            self._specs.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "figures": len(self._specs),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+figure_cache = FigureCache(persist_dir=os.environ.get("FIGURE_CACHE_DIR"))
@@ -0,0 +1,116 @@
+"""The artifact manifest, ``data/manifest.json``.
+
+The manifest lists every artifact in the data directory with its file,
+content hash (sha1), schema version (``analytics.schema.SCHEMA_VERSION``),
+build time, row count and columns. ``ArtifactStore`` serves the artifacts
+it lists as one consistent generation and swaps in the next generation
+when the manifest changes, so rebuilding ``data/`` never needs a server
+restart.
+
+The manifest is rewritten, atomically, after the artifacts themselves:
+``python -m analytics.etl`` and ``python -m analytics.convert`` do so when
+they finish. Artifacts copied in by hand are published with::
+
+    python -m analytics.manifest [data_dir]
+"""
+
+import argparse
+import datetime
+import glob
+import json
+import os
+import time
+
+import pandas as pd
+
+from analytics.artifacts import (
+    ARROW_SUFFIX,
+    DATA_DIR,
+    MANIFEST_FILE,
+    PICKLE_SUFFIX,
+    file_digest,
+    read_manifest,
+    read_table,
+)
+from analytics.schema import SCHEMA_VERSION
+
+
+def _timestamp(seconds):
+    return (
+        datetime.datetime.fromtimestamp(seconds, datetime.timezone.utc)
+        .replace(microsecond=0)
+        .isoformat()
+    )
+
+
+def _describe(path):
+    if path.endswith(ARROW_SUFFIX):
+        table = read_table(path)
+        return table.num_rows, [
+            name for name in table.schema.names if not name.startswith("__")
+        ]
+    frame = pd.read_pickle(path)
+    return len(frame), [str(column) for column in frame.columns]
+
+
+def build_manifest(data_dir=DATA_DIR):
+    """Describes the artifacts currently in ``data_dir``.
+
+    Entries whose content hash is unchanged are carried over from the
+    existing manifest, so touching a file does not publish a new version.
+    """
+    previous = (read_manifest(data_dir) or {}).get("artifacts", {})
+    entries = {}
+    paths = sorted(glob.glob(os.path.join(data_dir, "*" + PICKLE_SUFFIX)))
+    # Arrow files win over legacy pickles of the same name.
+    paths += sorted(glob.glob(os.path.join(data_dir, "*" + ARROW_SUFFIX)))
+    for path in paths:
+        file_name = os.path.basename(path)
+        name = os.path.splitext(file_name)[0]
+        digest = file_digest(path)
+        old = previous.get(name)
+        if old is not None and old["file"] == file_name and old["sha1"] == digest:
+            entries[name] = old
+            continue
+        rows, columns = _describe(path)
+        entries[name] = {
+            "file": file_name,
+            "sha1": digest,
+            "schema_version": SCHEMA_VERSION,
+            "built_at": _timestamp(os.path.getmtime(path)),
+            "rows": rows,
+            "columns": columns,
+        }
+    return dict(sorted(entries.items()))
+
+
+def write_manifest(data_dir=DATA_DIR):
+    """Rewrites the manifest if an artifact changed; returns True if it did."""
+    entries = build_manifest(data_dir)
+    manifest = read_manifest(data_dir)
+    if manifest is not None and manifest.get("artifacts") == entries:
+        return False
+    manifest = {
+        "generated_at": _timestamp(time.time()),
+        "artifacts": entries,
+    }
+    path = os.path.join(data_dir, MANIFEST_FILE)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+        f.write("\n")
+    os.replace(f"{path}.tmp", path)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("data_dir", nargs="?", default=DATA_DIR)
+    args = parser.parse_args()
+    if write_manifest(args.data_dir):
+        print(f"Wrote {os.path.join(args.data_dir, MANIFEST_FILE)}")
+    else:
+        print("Manifest is up to date")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Mergeable count, mean and variance accumulators.
+
+``Moments`` holds the count, mean and sum of squared deviations from the
+mean (``m2``) of one or many groups, as NumPy arrays. A batch of values is
+summarized in two passes (mean first, then squared deviations, which
+keeps ``m2`` accurate where ``sum(x**2) - n * mean**2`` would cancel) and
+two summaries are combined with Chan et al.'s parallel update:
+
+    n = n_a + n_b
+    delta = mean_b - mean_a
+    mean = mean_a + delta * n_b / n
+    m2 = m2_a + m2_b + delta**2 * n_a * n_b / n
+
+so moments of disjoint parts (days, segments, A/B groups) add up to the
+moments of the whole without the values: ``analytics.sequential`` folds
+each new day into the running moments of a test.
+
+These are all the z-test and t-test of ``analytics.abtest`` need; see
+``Moments.summary``.
+"""
+
+import numpy as np
+
+
+class Moments:
+    """Count, mean and ``m2`` arrays, one element per group."""
+
+    def __init__(self, count, mean, m2):
+        self.count = np.asarray(count, dtype=float)
+        self.mean = np.asarray(mean, dtype=float)
+        self.m2 = np.asarray(m2, dtype=float)
+
+    @classmethod
+    def of(cls, values, axis=-1):
+        """Summarizes ``values`` along ``axis``, ignoring NaNs."""
+        values = np.asarray(values, dtype=float)
+        count = np.count_nonzero(~np.isnan(values), axis=axis)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.nansum(values, axis=axis) / count
+        deviations = values - np.expand_dims(mean, axis)
+        return cls(count, np.nan_to_num(mean), np.nansum(deviations**2, axis=axis))
+
+    @classmethod
+    def grouped(cls, values, codes, groups):
+        """Summarizes ``values`` per group code in ``range(groups)``."""
+        values = np.asarray(values, dtype=float)
+        codes = np.asarray(codes)
+        rows = ~np.isnan(values) & (codes >= 0)
+        values, codes = values[rows], codes[rows]
+        count = np.bincount(codes, minlength=groups).astype(float)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.nan_to_num(np.bincount(codes, values, groups) / count)
+        m2 = np.bincount(codes, (values - mean[codes]) ** 2, groups)
+        return cls(count, mean, m2)
+
+    @classmethod
+    def stack(cls, parts):
+        """Joins the moments in ``parts`` into one array per column."""
+        return cls(
+            [part.count for part in parts],
+            [part.mean for part in parts],
+            [part.m2 for part in parts],
+        )
+
+    def __getitem__(self, key):
+        return Moments(self.count[key], self.mean[key], self.m2[key])
+
+    def __len__(self):
+        return len(self.count)
+
+    def merge(self, other):
+        """Returns the moments of the union of both samples (Chan et al.)."""
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        with np.errstate(invalid="ignore", divide="ignore"):
+            weight = np.where(count > 0, other.count / count, 0.0)
+        mean = self.mean + delta * weight
+        m2 = self.m2 + other.m2 + delta**2 * self.count * weight
+        return Moments(count, mean, m2)
+
+    __add__ = merge
+
+    @property
+    def variance(self):
+        """The sample variance (``ddof=1``)."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self.m2 / (self.count - 1)
+
+    def summary(self):
+        """The (count, mean, sample variance) tuple of a single group."""
+        return int(self.count), float(self.mean), float(self.variance)
+
+    def __repr__(self):
+        return f"Moments(count={self.count}, mean={self.mean}, m2={self.m2})"
@@ -0,0 +1,276 @@
+"""Bootstrap and repeated A/A checks of the Part II A/B tests.
+
+The notebook checked each test with a single A/A split (``random_state=17``
+and ``19``). Here a test is resampled many times at once: every batch
+draws one index matrix, a row per resample, and computes the statistic of
+all rows with one NumPy reduction (or one axis-wise Mann-Whitney U test),
+so the cost is a few passes over ``resamples * n`` values instead of a
+Python loop of pandas samples.
+
+* ``bootstrap_test`` resamples both groups with replacement and returns
+  the difference of means (B - A), its percentile confidence interval and
+  an empirical two-sided p-value (the bootstrap distribution shifted to
+  the null of equal means).
+* ``permutation_test`` shuffles the A/B labels and returns the share of
+  shuffles whose difference of means is at least as extreme as the
+  observed one. It assumes nothing about the metric's distribution, which
+  suits the heavy-tailed revenue metrics (tests 5, 7, 11 and 12) better
+  than the z-test. Every ``check_every`` shuffles it stops if the
+  Clopper-Pearson interval of the p-value lies entirely on one side of
+  alpha, so clearly significant or clearly insignificant tests take one
+  or two checks.
+* ``aa_false_positive_rate`` splits a group into two random disjoint
+  halves, as the notebook did, ``splits`` times and returns the share of
+  splits the Mann-Whitney U test calls significant. It should be close to
+  alpha; a much higher rate means the test is too sensitive for the data.
+
+Batches hold at most ``MAX_CELLS`` drawn values, which bounds memory,
+and can be spread over a process pool with ``workers``. Each batch has
+its own seed spawned from ``seed``. A permutation test checks whether it
+can stop every ``check_every`` shuffles, however many batches that takes,
+and checks them in order, so no result depends on the number of workers.
+
+``resample_tests`` runs all three on every test, which takes seconds,
+not milliseconds, so it is not run by the dashboard: the ETL stores its
+table as the ``ab_resampled`` artifact (``RESAMPLED``), rebuilt when the
+A/B artifacts change, and ``load_resampled`` reads it.
+"""
+
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from analytics import abtest, artifacts
+
+RESAMPLES = 2000
+SPLITS = 200
+PERMUTATIONS = 10000
+# The shuffles between two checks of whether a permutation test can stop.
+PERMUTATION_CHECK = 500
+# The confidence of the p-value interval that stops a permutation test.
+STOP_CONFIDENCE = 0.99
+SEED = 17
+MAX_CELLS = 1 << 22
+RESAMPLED = "ab_resampled"
+
+Resampled = namedtuple("Resampled", ["difference", "ci", "p_value", "resamples"])
+Permuted = namedtuple("Permuted", ["difference", "p_value", "p_ci", "permutations"])
+
+
+def batches(count, width, max_cells=MAX_CELLS):
+    """Splits ``count`` resamples of ``width`` values into batch sizes."""
+    size = max(1, max_cells // max(1, width))
+    return [min(size, count - start) for start in range(0, count, size)]
+
+
+def _run(function, tasks, workers):
+    if workers is None or workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(function, *zip(*tasks)))
+    return [function(*task) for task in tasks]
+
+
+def _imap(function, tasks, workers):
+    # Yields function(*task) for each task in order, from a process pool
+    # unless workers is 1; closing the generator early cancels the tasks
+    # that have not started.
+    if workers is not None and workers <= 1:
+        for task in tasks:
+            yield function(*task)
+        return
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        futures = [pool.submit(function, *task) for task in tasks]
+        for future in futures:
+            yield future.result()
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+
+def _seeds(seed, count):
+    return np.random.SeedSequence(seed).spawn(count)
+
+
+def _bootstrap_batch(a, b, count, seed):
+    rng = np.random.default_rng(seed)
+    means_a = a[rng.integers(0, len(a), (count, len(a)))].mean(axis=1)
+    means_b = b[rng.integers(0, len(b), (count, len(b)))].mean(axis=1)
+    return means_b - means_a
+
+
+def bootstrap(a, b, resamples=RESAMPLES, seed=SEED, workers=1):
+    """Returns ``resamples`` bootstrap differences of means (B - A)."""
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
+    sizes = batches(resamples, len(a) + len(b))
+    tasks = [(a, b, size, seed) for size, seed in zip(sizes, _seeds(seed, len(sizes)))]
+    return np.concatenate(_run(_bootstrap_batch, tasks, workers))
+
+
+def bootstrap_test(a, b, alpha=abtest.ALPHA, resamples=RESAMPLES, seed=SEED, workers=1):
+    """Bootstraps the difference of means of ``b`` and ``a``.
+
+    Shifting both groups to a common mean shifts every resampled
+    difference by the observed one, so the null distribution comes from
+    the same draws.
+    """
+    observed = np.mean(b) - np.mean(a)
+    differences = bootstrap(a, b, resamples, seed, workers)
+    low, high = np.quantile(differences, [alpha / 2, 1 - alpha / 2])
+    extreme = np.count_nonzero(np.abs(differences - observed) >= abs(observed))
+    p_value = (extreme + 1) / (resamples + 1)
+    return Resampled(observed, (low, high), p_value, resamples)
+
+
+def _permutation_batch(values, size, count, seed):
+    rng = np.random.default_rng(seed)
+    # The sum of the first ``size`` values of each shuffled row is the
+    # total of a random group of A's size; B's is the rest.
+    return rng.permuted(np.tile(values, (count, 1)), axis=1)[:, :size].sum(axis=1)
+
+
+def p_value_interval(extreme, permutations, confidence=STOP_CONFIDENCE):
+    """Clopper-Pearson interval of a p-value estimated from ``permutations``."""
+    tail = (1 - confidence) / 2
+    low = stats.beta.ppf(tail, extreme, permutations - extreme + 1) if extreme else 0.0
+    high = (
+        stats.beta.ppf(1 - tail, extreme + 1, permutations - extreme)
+        if extreme < permutations
+        else 1.0
+    )
+    return float(low), float(high)
+
+
+def permutation_test(
+    a,
+    b,
+    alpha=abtest.ALPHA,
+    permutations=PERMUTATIONS,
+    seed=SEED,
+    check_every=PERMUTATION_CHECK,
+    confidence=STOP_CONFIDENCE,
+    workers=1,
+):
+    """Two-sided permutation test of the difference of means of ``b`` and ``a``.
+
+    Runs at most ``permutations`` label shuffles and, after every
+    ``check_every`` of them, stops if the ``confidence`` interval of the
+    p-value excludes ``alpha``. With ``workers`` other than 1 the batches
+    run on a process pool (``None``: one process per core).
+    """
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
+    values = np.concatenate([a, b])
+    total = values.sum()
+    observed = b.mean() - a.mean()
+    # Shuffles that tie with the observed difference count as extreme;
+    # allow for the rounding of the sums.
+    threshold = abs(observed) * (1 - 1e-9)
+    # Each check's shuffles, in batches of at most MAX_CELLS values, each
+    # with its own seed; ``ends`` holds the task count at every check.
+    checks = batches(permutations, 1, check_every)
+    tasks, ends = [], set()
+    for count, check_seed in zip(checks, _seeds(seed, len(checks))):
+        sizes = batches(count, len(values))
+        for size, batch_seed in zip(sizes, check_seed.spawn(len(sizes))):
+            tasks.append((values, len(a), size, batch_seed))
+        ends.add(len(tasks))
+    extreme = done = 0
+    results = _imap(_permutation_batch, tasks, workers)
+    try:
+        for finished, sums in enumerate(results, 1):
+            differences = (total - sums) / len(b) - sums / len(a)
+            extreme += np.count_nonzero(np.abs(differences) >= threshold)
+            done += len(sums)
+            if finished in ends:
+                low, high = p_value_interval(extreme, done, confidence)
+                if high < alpha or low > alpha:
+                    break
+    finally:
+        results.close()
+    p_value = (extreme + 1) / (done + 1)
+    return Permuted(observed, p_value, (low, high), done)
+
+
+def _aa_batch(values, count, seed, fraction):
+    rng = np.random.default_rng(seed)
+    size = round(len(values) * fraction)
+    # The first 2 * size positions of a random permutation per row are two
+    # disjoint random samples.
+    order = rng.permuted(np.tile(np.arange(len(values)), (count, 1)), axis=1)
+    first = values[order[:, :size]]
+    second = values[order[:, size : 2 * size]]
+    return stats.mannwhitneyu(first, second, axis=1).pvalue
+
+
+def aa_p_values(
+    values, splits=SPLITS, fraction=abtest.AA_FRACTION, seed=SEED, workers=1
+):
+    """Mann-Whitney p-values of ``splits`` random A/A splits of ``values``."""
+    values = np.asarray(values, dtype=float)
+    sizes = batches(splits, len(values))
+    tasks = [
+        (values, size, seed, fraction)
+        for size, seed in zip(sizes, _seeds(seed, len(sizes)))
+    ]
+    return np.concatenate(_run(_aa_batch, tasks, workers))
+
+
+def aa_false_positive_rate(
+    values, alpha=abtest.ALPHA, splits=SPLITS, seed=SEED, workers=1
+):
+    """The share of random A/A splits of ``values`` found significant."""
+    p_values = aa_p_values(values, splits, seed=seed, workers=workers)
+    return np.count_nonzero(p_values <= alpha) / len(p_values)
+
+
+def resample_tests(
+    frames,
+    alpha=abtest.ALPHA,
+    resamples=RESAMPLES,
+    splits=SPLITS,
+    seed=SEED,
+    workers=1,
+    tests=abtest.TESTS,
+    permutations=PERMUTATIONS,
+):
+    """Bootstraps, permutes and A/A-checks ``tests`` on ``frames``; a row per test.
+
+    ``seconds`` is the time each test's checks took.
+    """
+    rows = []
+    for test in tests:
+        start = time.perf_counter()
+        a, b, _ = abtest.samples(test, frames[test.source])
+        result = bootstrap_test(a, b, alpha, resamples, seed, workers)
+        permuted = permutation_test(a, b, alpha, permutations, seed, workers=workers)
+        rate_a = aa_false_positive_rate(a, alpha, splits, seed, workers)
+        rate_b = aa_false_positive_rate(b, alpha, splits, seed, workers)
+        rows.append(
+            {
+                "test": test.number,
+                "metric": test.title,
+                "difference": result.difference,
+                "ci_low": result.ci[0],
+                "ci_high": result.ci[1],
+                "p_value": result.p_value,
+                "permutation_p_value": permuted.p_value,
+                "permutations": permuted.permutations,
+                "aa_rate_a": rate_a,
+                "aa_rate_b": rate_b,
+                "seconds": time.perf_counter() - start,
+            }
+        )
+    return pd.DataFrame(rows).set_index("test")
+
+
+def load_resampled(store=None):
+    """Returns the stored ``resample_tests`` table, or None if it is not built."""
+    store = artifacts.store if store is None else store
+    if not store.exists(RESAMPLED):
+        return None
+    return store.load(RESAMPLED).set_index("test")
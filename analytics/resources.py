@@ -0,0 +1,82 @@
+"""Lazily loaded, process-wide model resources.
+
+The prediction tab needs the CatBoost model and the fitted StandardScaler.
+Both are deserialized the first time they are requested and then shared by
+every session of the server process. Each resource records how long it
+took to load and roughly how much memory it occupies.
+"""
+
+import os
+import pickle
+import threading
+import time
+
+import joblib
+
+
+class ModelResource:
+    """A joblib file that is loaded once, on first use."""
+
+    def __init__(self, path, loader=joblib.load):
+        self.path = path
+        self.loader = loader
+        self._value = None
+        self._loaded = False
+        self._lock = threading.Lock()
+        self.load_seconds = None
+        self.file_bytes = None
+        self.memory_bytes = None
+
+    @property
+    def loaded(self):
+        return self._loaded
+
+    def get(self):
+        if self._loaded:
+            return self._value
+        with self._lock:
+            if not self._loaded:
+                start = time.perf_counter()
+                value = self.loader(self.path)
+                self.load_seconds = time.perf_counter() - start
+                self.file_bytes = os.path.getsize(self.path)
+                self.memory_bytes = _estimate_size(value)
+                self._value = value
+                self._loaded = True
+        return self._value
+
+    def unload(self):
+        with self._lock:
+            self._value = None
+            self._loaded = False
+
+    def stats(self):
+        return {
+            "path": self.path,
+            "loaded": self._loaded,
+            "load_seconds": self.load_seconds,
+            "file_bytes": self.file_bytes,
+            "memory_bytes": self.memory_bytes,
+        }
+
+
+def _estimate_size(value):
+    """Approximates an object's in-memory footprint by its pickled size."""
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return None
+
+
+resources = {
+    "model": ModelResource("model/catboost_model.pkl"),
+    "scaler": ModelResource("model/scaler.pkl"),
+}
+
+
+def get_resource(name):
+    return resources[name].get()
+
+
+def resource_stats():
+    return {name: resource.stats() for name, resource in resources.items()}
@@ -0,0 +1,80 @@
+"""Cohort retention counts computed with array operations.
+
+``CohortCounter`` consumes session events in chunks (any iterable of
+user ids and timestamps) and keeps only a boolean activity matrix with
+one row per user and one column per day of the window, so memory is
+bounded by users x days however many events are streamed through it.
+User ids are mapped to integer codes once per chunk with
+``Index.get_indexer`` and days to integer offsets from the window start;
+the cohort x day-offset counts are then a single ``np.bincount`` over
+``cohort * days + offset``.
+
+This reproduces the notebook's retention query: a user's cohort is the
+first day they were active within the window, and ``CohortIndex`` 1 is the
+cohort day itself.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class CohortCounter:
+    def __init__(self, start, days):
+        self.start = np.datetime64(start, "D")
+        self.days = days
+        self.users = pd.Index([], dtype=object)
+        self._active = np.zeros((1024, days), dtype=bool)
+
+    def add(self, user_ids, event_times):
+        """Marks each user active on the day of each event in the window."""
+        days = (np.asarray(event_times, dtype="datetime64[D]") - self.start).astype(
+            np.int64
+        )
+        inside = (days >= 0) & (days < self.days)
+        user_ids = np.asarray(user_ids, dtype=object)[inside]
+        days = days[inside]
+
+        codes, uniques = pd.factorize(user_ids)
+        user_codes = self.users.get_indexer(uniques)
+        new = user_codes < 0
+        if new.any():
+            user_codes[new] = np.arange(len(self.users), len(self.users) + new.sum())
+            self.users = self.users.append(pd.Index(uniques[new], dtype=object))
+            self._reserve(len(self.users))
+        self._active[user_codes[codes], days] = True
+
+    def _reserve(self, rows):
+        if rows <= len(self._active):
+            return
+        active = np.zeros((max(rows, 2 * len(self._active)), self.days), dtype=bool)
+        active[: len(self._active)] = self._active
+        self._active = active
+
+    def counts(self):
+        """Returns the cohort x CohortIndex matrix of distinct active users."""
+        active = self._active[: len(self.users)]
+        users, days = np.nonzero(active)
+        cohort = active.argmax(axis=1)[users]
+        counts = np.bincount(
+            cohort * self.days + (days - cohort), minlength=self.days * self.days
+        )
+        return counts.reshape(self.days, self.days)
+
+    def frame(self):
+        """Returns ``counts()`` as (cohort_day, cohort_index, users) rows."""
+        counts = self.counts()
+        cohorts, offsets = np.nonzero(counts)
+        return pd.DataFrame(
+            {
+                "cohort_day": (self.start + cohorts).astype("datetime64[ns]"),
+                "cohort_index": offsets + 1,
+                "users": counts[cohorts, offsets],
+            }
+        )
+
+
+def retention_matrix(frame):
+    """Pivots cohort counts into the notebook's retention table (percent)."""
+    counts = frame.pivot(index="cohort_day", columns="cohort_index", values="users")
+    cohort_sizes = counts[1]
+    return counts.divide(cohort_sizes, axis=0).round(3) * 100
@@ -0,0 +1,77 @@
+"""Compact column types for the chart artifacts.
+
+``write_artifact`` passes every frame through ``compact`` before writing
+it, so artifacts share one schema policy whatever produced them:
+
+* dimension columns (``DIMENSIONS``) are dictionary-encoded: a pandas
+  categorical in memory and an Arrow dictionary on disk, so each distinct
+  country, network, platform, segment or A/B group string is held once and
+  ``df[df["country"] == ...]`` compares integer codes;
+* integer columns, plain or nullable, are downcast to the narrowest type
+  that holds their range;
+* float64 columns become float32 only when every value survives the round
+  trip exactly, so no chart or hover text changes.
+
+``python -m analytics.convert --compact`` rewrites existing artifacts
+under this policy and reports the bytes saved.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Recorded in the artifact manifest; bump it when the policy changes.
+SCHEMA_VERSION = 2
+
+DIMENSIONS = ("country", "network", "platform", "segment", "group_id")
+
+_NULLABLE_INTEGERS = ("Int8", "Int16", "Int32", "Int64")
+
+
+def _narrow_nullable(series):
+    values = series.dropna()
+    if values.empty:
+        return series
+    low, high = values.min(), values.max()
+    for dtype in _NULLABLE_INTEGERS:
+        info = np.iinfo(dtype.lower())
+        if info.min <= low and high <= info.max:
+            return series.astype(dtype)
+    return series
+
+
+def compact_column(series):
+    """Returns ``series`` with the compact dtype of its column."""
+    dtype = series.dtype
+    if series.name in DIMENSIONS and (
+        pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype)
+    ):
+        return series.astype("category")
+    if pd.api.types.is_bool_dtype(dtype) or isinstance(dtype, pd.CategoricalDtype):
+        return series
+    if pd.api.types.is_extension_array_dtype(dtype):
+        if pd.api.types.is_integer_dtype(dtype) and dtype.name.startswith("Int"):
+            return _narrow_nullable(series)
+        return series
+    if pd.api.types.is_integer_dtype(dtype):
+        return pd.to_numeric(
+            series, downcast="signed" if dtype.kind == "i" else "unsigned"
+        )
+    if dtype == np.float64:
+        narrow = series.astype(np.float32)
+        if np.array_equal(
+            narrow.to_numpy(np.float64), series.to_numpy(), equal_nan=True
+        ):
+            return narrow
+    return series
+
+
+def compact(frame):
+    """Returns a copy of ``frame`` with every column compacted."""
+    frame = frame.copy()
+    for position in range(len(frame.columns)):
+        frame.isetitem(position, compact_column(frame.iloc[:, position]))
+    return frame
+
+
+def memory_bytes(frame):
+    return int(frame.memory_usage(index=True, deep=True).sum())
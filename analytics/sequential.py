@@ -0,0 +1,155 @@
+"""Sequential (always-valid) monitoring of the daily Part II A/B tests.
+
+The notebook ran each daily test once, on every day of the experiment,
+and test 12's conclusion depends on whether it is a z-test or a t-test at
+that fixed horizon. The mixture sequential probability ratio test (mSPRT,
+Johari et al., "Always Valid Inference") can instead be checked after
+every day without inflating the false positive rate. With the difference
+of the group means ``d``, its estimated variance ``se2`` (``var_a / n_a
++ var_b / n_b``, as in the z-test) and a normal mixture N(0, ``tau2``)
+over the true difference, the likelihood ratio against "no difference" is
+
+    L = sqrt(se2 / (se2 + tau2)) * exp(d**2 * tau2 / (2 * se2 * (se2 + tau2)))
+
+and ``min(1, 1 / L)``, kept as a running minimum over the days, is a
+p-value that is valid whenever the experiment is stopped. ``tau2`` is
+``MIXTURE**2`` times a day's variance (``var_a + var_b``), i.e. the
+test is most sensitive to differences of about ``MIXTURE`` daily standard
+deviations. Nothing is decided in the first ``BURN_IN`` days, while the
+variances are estimated from too few days.
+
+The state of a test after a day is the cumulative moments of both groups
+(``analytics.moments``) and the running p-value; ``advance`` folds the
+next days into it, which is all a refresh has to do (see the
+``ab_sequential`` artifact in ``analytics.etl.abtests``).
+"""
+
+import numpy as np
+import pandas as pd
+
+from analytics import abtest
+from analytics.moments import Moments
+
+MIXTURE = 0.5
+BURN_IN = 7
+
+# The daily tests, the ones with one new observation per group and day.
+DAILY_TESTS = tuple(test for test in abtest.TESTS if test.source == "ab_daily")
+
+COLUMNS = (
+    "test",
+    "date",
+    "n_a",
+    "mean_a",
+    "m2_a",
+    "n_b",
+    "mean_b",
+    "m2_b",
+    "likelihood_ratio",
+    "p_value",
+    "rejected",
+)
+
+
+def likelihood_ratio(a, b, mixture=MIXTURE):
+    """The mSPRT likelihood ratio of the cumulative ``Moments`` ``a`` and ``b``."""
+    var_a, var_b = a.variance, b.variance
+    with np.errstate(invalid="ignore", divide="ignore"):
+        se2 = var_a / a.count + var_b / b.count
+        tau2 = mixture**2 * (var_a + var_b)
+        d = b.mean - a.mean
+        ratio = np.sqrt(se2 / (se2 + tau2)) * np.exp(
+            d**2 * tau2 / (2 * se2 * (se2 + tau2))
+        )
+    return np.where(np.isfinite(ratio), ratio, 1.0)
+
+
+def _state(previous, number):
+    # The cumulative moments and p-value of test ``number`` after the last
+    # day in ``previous``, or those of no days.
+    rows = None if previous is None else previous[previous["test"] == number]
+    if rows is None or not len(rows):
+        return Moments(0, 0, 0), Moments(0, 0, 0), 1.0
+    last = rows.iloc[-1]
+    return (
+        Moments(last["n_a"], last["mean_a"], last["m2_a"]),
+        Moments(last["n_b"], last["mean_b"], last["m2_b"]),
+        float(last["p_value"]),
+    )
+
+
+def advance(test, days, previous=None, alpha=abtest.ALPHA):
+    """Folds ``days`` (from ``abtest.daily_metric``) into ``test``'s state.
+
+    ``previous`` holds the rows of the days before ``days``; returns a
+    row per day with the cumulative moments and the always-valid p-value.
+    """
+    a, b, p_value = _state(previous, test.number)
+    rows = []
+    for date, day_a, day_b in zip(days.index, days["A"], days["B"]):
+        a = a + Moments.of([day_a])
+        b = b + Moments.of([day_b])
+        ratio = float(likelihood_ratio(a, b))
+        if min(a.count, b.count) > BURN_IN:
+            p_value = min(p_value, 1 / ratio)
+        rows.append(
+            {
+                "test": test.number,
+                "date": date,
+                "n_a": int(a.count),
+                "mean_a": float(a.mean),
+                "m2_a": float(a.m2),
+                "n_b": int(b.count),
+                "mean_b": float(b.mean),
+                "m2_b": float(b.m2),
+                "likelihood_ratio": ratio,
+                "p_value": p_value,
+                "rejected": p_value <= alpha,
+            }
+        )
+    return pd.DataFrame(rows, columns=COLUMNS)
+
+
+def monitor(daily, day=None, previous=None, alpha=abtest.ALPHA, tests=DAILY_TESTS):
+    """Runs the sequential tests over ``ab_daily``, from ``day`` on.
+
+    The rows of ``previous`` before ``day`` are kept and their last state
+    is carried forward, so a refresh only processes the new days.
+    """
+    if previous is not None and day is not None:
+        previous = previous[previous["date"] < pd.Timestamp(day)]
+    else:
+        previous = None
+    frames = [] if previous is None else [previous]
+    for test in tests:
+        days = abtest.daily_metric(daily, test.metric)
+        if previous is not None:
+            days = days[days.index >= pd.Timestamp(day)]
+        frames.append(advance(test, days, previous, alpha))
+    frames = [frame for frame in frames if len(frame)]
+    if not frames:
+        return pd.DataFrame(columns=COLUMNS)
+    frame = pd.concat(frames, ignore_index=True)
+    return frame.sort_values(["date", "test"], ignore_index=True)
+
+
+def decisions(frame, tests=DAILY_TESTS):
+    """The latest state of each test and the first day it was rejected."""
+    rows = []
+    for test in tests:
+        days = frame[frame["test"] == test.number]
+        if not len(days):
+            continue
+        last = days.iloc[-1]
+        rejected = days.loc[days["rejected"].astype(bool), "date"]
+        rows.append(
+            {
+                "test": test.number,
+                "metric": test.title,
+                "days": int(last["n_a"]),
+                "difference": last["mean_b"] - last["mean_a"],
+                "p_value": last["p_value"],
+                "rejected_on": rejected.iloc[0] if len(rejected) else pd.NaT,
+            }
+        )
+    return pd.DataFrame(rows).set_index("test")
@@ -0,0 +1,184 @@
+"""Time-series chart data re-sliced by the dashboard's global filter.
+
+A ``View`` is the sidebar selection: an inclusive date range and
+optionally one platform and one country. The daily Part I charts are
+rebuilt for a view from pre-aggregated data only, so a filter change
+never touches the raw tables:
+
+* ``from_cube`` slices the ``marketing_cube`` artifact (see
+  ``analytics.cube``), rolls it up per day and derives the frame the
+  chart's notebook artifact held. It serves any date range the cube
+  covers and the platform and country filters.
+* ``dated`` restricts a stored chart artifact to the view's dates. It is
+  used for charts the cube has no dimensions or measures for (the PLTV
+  segments, graph 31's install events and the per-country charts, which
+  have their own country selector) and for every chart when the cube has
+  not been built; those artifacts only hold the window the notebook
+  queried.
+
+Graph 32's MAU is the distinct users of the whole window shown, which
+neither the cube nor the daily artifacts can give; ``sticky`` counts them
+from the ``user_sketches`` artifact (see ``analytics.hll``) for the view's
+dates, platform and country, and ``sticky_from_cube`` does the same for
+the cube's DAU.
+
+The frames have the columns of the notebook artifacts, so the chart
+builders in ``analytics.charts`` are used unchanged.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from analytics import hll
+from analytics.cube import load_cube
+
+CUBE = "marketing_cube"
+SKETCHES = "user_sketches"
+# The charts whose frame needs the distinct users of the view's window.
+DISTINCT = ("graph32",)
+
+
+class View(namedtuple("View", ["start", "end", "platform", "country"])):
+    """A date range (ISO strings, inclusive) and optional platform/country."""
+
+    __slots__ = ()
+
+    def __new__(cls, start=None, end=None, platform=None, country=None):
+        return super().__new__(cls, start, end, platform, country)
+
+
+def _stickiness(frame, mau):
+    frame["mau"] = mau
+    frame["stickiness"] = frame["dau"] / frame["mau"]
+    return frame
+
+
+def distinct_users(sketches, view, start, end):
+    """The estimated distinct users from ``start`` to ``end`` in ``view``."""
+    filters = {
+        column: value
+        for column, value in (("platform", view.platform), ("country", view.country))
+        if value is not None
+    }
+    return hll.SketchStore(sketches).count(start=start, end=end, **filters)
+
+
+def restrict(frame, view):
+    """Returns the rows of ``frame`` whose date falls inside ``view``."""
+    column = next(
+        c for c in frame.columns if pd.api.types.is_datetime64_any_dtype(frame[c])
+    )
+    rows = frame[column].between(
+        pd.Timestamp(view.start or frame[column].min()),
+        pd.Timestamp(view.end or frame[column].max()),
+    )
+    frame = frame[rows].reset_index(drop=True)
+    if "stickiness" in frame.columns:
+        # Without the sketches: the notebook's MAU, the window's summed DAU.
+        frame = _stickiness(frame, frame["dau"].sum())
+    return frame
+
+
+def dated(frame, build, view, *args):
+    """Draws ``build`` from an artifact restricted to the view's dates."""
+    return build(restrict(frame, view), *args)
+
+
+# The date column and the (notebook column, cube measure) pairs of each
+# chart artifact that can be derived from the cube. Graph 31 is not: it
+# counts distinct install timestamps per day, which do not add up over
+# the cube's cells.
+COLUMNS = {
+    "graph3": ("event_date", {"avg_hours_spent_per_user": "playtime_dau"}),
+    "graph22": (
+        "date",
+        {"total_revenue": "revenue", "total_cost": "spend", "ROAS": "roas"},
+    ),
+    "graph23": ("install_date", {"daily_installs": "installs"}),
+    "graph24": (
+        "event_date",
+        {
+            "DAU": "active_users",
+            "daily_sessions": "sessions",
+            "sessions_per_DAU": "sessions_per_dau",
+        },
+    ),
+    "graph28": (
+        "date",
+        {"total_rev": "revenue", "dau": "active_users", "ARPDAU": "arpdau"},
+    ),
+    "graph29": (
+        "date",
+        {
+            "total_time_spent": "time_spent",
+            "dau": "active_users",
+            "playtime_dau": "playtime_dau",
+        },
+    ),
+    "graph30": (
+        "date",
+        {
+            "total_revenue": "revenue",
+            "total_installs": "installs",
+            "arp_install": "arp_install",
+        },
+    ),
+    "graph32": ("date", {"dau": "active_users"}),
+}
+
+
+def cube_frame(cube, graph, view):
+    """Derives ``graph``'s artifact frame for ``view`` from the cube."""
+    selection = {"date": slice(view.start, view.end)}
+    if view.platform is not None:
+        selection["platform"] = view.platform
+    if view.country is not None:
+        selection["country"] = view.country
+    date_column, columns = COLUMNS[graph]
+    days = cube.slice(**selection).rollup("date", list(columns.values()))
+
+    frame = pd.DataFrame({date_column: days.index})
+    for column, measure in columns.items():
+        frame[column] = days[measure].to_numpy()
+    if graph == "graph3":
+        frame["avg_hours_spent_per_user"] /= 3600
+        frame["is_weekend"] = frame["event_date"].dt.dayofweek >= 5
+        frame["group_id"] = (
+            frame["is_weekend"] != frame["is_weekend"].shift()
+        ).cumsum()
+        frame["group_type"] = np.where(frame["is_weekend"], "Weekend", "Weekday")
+    return frame
+
+
+def from_cube(dates, graph, build, view):
+    """Draws ``build`` from ``graph``'s frame derived from the cube artifact.
+
+    ``dates`` is the cube artifact's date column, which keys the figure
+    cache on the artifact's version; the dense cube itself comes from
+    ``load_cube``, which builds it once per version.
+    """
+    return build(cube_frame(load_cube(CUBE), graph, view))
+
+
+def sticky(frame, sketches, build, view):
+    """Draws ``build`` from graph 32's artifact restricted to the view's dates.
+
+    MAU is the distinct users of the days shown, from ``sketches``; the
+    artifact has no platform or country, so neither does MAU.
+    """
+    frame = restrict(frame, view)
+    everyone = view._replace(platform=None, country=None)
+    mau = distinct_users(sketches, everyone, frame["date"].min(), frame["date"].max())
+    return build(_stickiness(frame, mau))
+
+
+def sticky_from_cube(dates, sketches, build, view):
+    """Draws ``build`` from graph 32's frame derived from the cube for ``view``.
+
+    Like ``from_cube``, with MAU counted from ``sketches``.
+    """
+    frame = cube_frame(load_cube(CUBE), "graph32", view)
+    mau = distinct_users(sketches, view, frame["date"].min(), frame["date"].max())
+    return build(_stickiness(frame, mau))
@@ -1,11 +1,14 @@
+import functools
+import json
+
+import plotly.graph_objects as go
 import streamlit as st
-import plotly.express as px
 import pandas as pd
-import plotly.graph_objects as go
-import plotly.colors as colors
-from plotly.subplots import make_subplots
-import joblib
 
+from analytics import abtest, bayes, charts, resampling, sequential, timeseries
+from analytics.artifacts import load_artifact, store
+from analytics.figures import figure_cache
+from analytics.resources import get_resource, resource_stats
 
 ###############################
 # CONFIGURATION
@@ -14,31 +17,446 @@ import joblib
 
 # Functions
 def get_model():
-    return joblib.load("model/catboost_model.pkl")
+    return get_resource("model")
 
 
 def get_scaler():
-    return joblib.load("model/scaler.pkl")
+    return get_resource("scaler")
+
+
+def show_chart(build, *sources, args=(), container=None, use_container_width=False):
+    """Draws ``build(*frames, *args)`` through the process-wide figure cache.
+
+    ``sources`` are the artifacts the builder takes, as names or
+    ``(name, columns)`` pairs. A cache hit skips building the figure. The
+    cached spec was validated when it was built, so it is wrapped in an
+    unvalidated figure: ``st.plotly_chart`` sends it as it is, without
+    coercing numeric text or dates back through Plotly's validators.
+    """
+    spec = figure_cache.figure_json(build, sources, *args)
+    container = st if container is None else container
+    container.plotly_chart(
+        go.Figure(json.loads(spec), _validate=False),
+        use_container_width=use_container_width,
+        theme="streamlit",
+    )
+
+
+# Time-series charts follow the sidebar's date range and platform/country
+# filter. The unfiltered view shows the notebook artifacts as they are;
+# filtered views are derived from the marketing cube when it has been built
+# (python -m analytics.etl), otherwise the artifacts are cut to the dates.
+SERIES_ARTIFACTS = [
+    ("graph3", "event_date"),
+    ("graph22", "date"),
+    ("graph23", "install_date"),
+    ("graph24", "event_date"),
+    ("graph28", "date"),
+    ("graph29", "date"),
+    ("graph30", "date"),
+    ("graph31", "date"),
+    ("graph32", "date"),
+    ("graph33_2", "event_date"),
+]
+
+
+def series_bounds():
+    """Returns the first and last day, platforms and countries to filter by."""
+    if store.exists(timeseries.CUBE):
+        cube = load_artifact(timeseries.CUBE, columns=["date", "platform", "country"])
+        return (
+            cube["date"].min().date(),
+            cube["date"].max().date(),
+            sorted(cube["platform"].dropna().unique()),
+            sorted(cube["country"].dropna().unique()),
+        )
+    dates = [
+        load_artifact(name, columns=[column])[column]
+        for name, column in SERIES_ARTIFACTS
+    ]
+    return (
+        min(d.min() for d in dates).date(),
+        max(d.max() for d in dates).date(),
+        [],
+        [],
+    )
+
+
+def current_view():
+    first, last, _, _ = series_bounds()
+    dates = st.session_state.get("series_dates", (first, last))
+    start, end = (dates[0], dates[-1]) if dates else (first, last)
+    platform = st.session_state.get("series_platform", "All platforms")
+    country = st.session_state.get("series_country", "All countries")
+    return timeseries.View(
+        None if start <= first else start.isoformat(),
+        None if end >= last else end.isoformat(),
+        None if platform == "All platforms" else platform,
+        None if country == "All countries" else country,
+    )
+
+
+def series_filter():
+    """Draws the sidebar filter and returns the selected ``View``."""
+    first, last, platforms, countries = series_bounds()
+    sidebar = st.sidebar
+    sidebar.subheader("Time-series filter")
+    sidebar.date_input(
+        "Date range",
+        value=(first, last),
+        min_value=first,
+        max_value=last,
+        key="series_dates",
+    )
+    hint = None if platforms else "Needs the marketing cube artifact."
+    sidebar.selectbox(
+        "Platform",
+        ["All platforms", *platforms],
+        key="series_platform",
+        disabled=not platforms,
+        help=hint,
+    )
+    sidebar.selectbox(
+        "Country",
+        ["All countries", *countries],
+        key="series_country",
+        disabled=not countries,
+        help=hint,
+    )
+    return current_view()
+
+
+def show_series(build, source, view, *args):
+    """Draws a time-series chart of ``source`` for the filter's ``view``."""
+    name = source if isinstance(source, str) else source[0]
+    cube = name in timeseries.COLUMNS and store.exists(timeseries.CUBE)
+    if view == timeseries.View():
+        show_chart(build, source, args=args)
+    elif name in timeseries.DISTINCT and store.exists(timeseries.SKETCHES):
+        if cube:
+            show_chart(
+                timeseries.sticky_from_cube,
+                (timeseries.CUBE, ["date"]),
+                timeseries.SKETCHES,
+                args=(build, view),
+            )
+        else:
+            show_chart(
+                timeseries.sticky, source, timeseries.SKETCHES, args=(build, view)
+            )
+    elif cube:
+        show_chart(
+            timeseries.from_cube,
+            (timeseries.CUBE, ["date"]),
+            args=(name, build, view),
+        )
+    else:
+        show_chart(timeseries.dated, source, args=(build, view, *args))
+
+
+def fragment(func):
+    """``st.fragment`` whose reruns read the artifacts of the last full run."""
+
+    @st.fragment
+    @functools.wraps(func)
+    def run(*args, **kwargs):
+        store.pin(st.session_state.get("artifact_snapshot"))
+        return func(*args, **kwargs)
+
+    return run
+
+
+# Country-level charts. Each one is a fragment, so changing its selectbox
+# reruns and resends only that chart instead of the whole page. With
+# CLIENT_SIDE_COUNTRY_SWITCH the traces of every country are sent once and
+# a dropdown inside the figure switches between them in the browser.
+CLIENT_SIDE_COUNTRY_SWITCH = False
+
+PLAYER_COUNTRIES = [
+    "Zephyra",
+    "Thalassia",
+    "Sunridge",
+    "Amaryllis",
+    "Brighthaven",
+    "Luminara",
+    "Gleamwood",
+    "Azurelia",
+    "Eldoria",
+    "Windemere",
+    "Rosewyn",
+    "Floravia",
+    "Glimmerdell",
+    "Emberlyn",
+    "Frostford",
+    "Crystalbrook",
+    "Seraphina",
+    "Silvermist",
+    "Moonvale",
+    "Starcliff",
+]
+
+MARKETING_COUNTRIES = ["Mercury", "Venus", "Pluton", "Saturn", "Uranus"]
+
+
+def country_chart(build, source, countries, label, key, series=False):
+    # Time series also follow the sidebar's date range; the country comes
+    # from the chart's own selector.
+    view = timeseries.View()
+    if series:
+        view = current_view()._replace(platform=None, country=None)
+    if CLIENT_SIDE_COUNTRY_SWITCH:
+        show_series(charts.country_switcher, source, view, countries, build)
+    else:
+        country = st.selectbox(label, countries, key=key)
+        show_series(build, source, view, country)
+
+
+@fragment
+def retention_chart():
+    platforms = load_artifact("retention", columns=["platform"])["platform"]
+    platform = st.selectbox(
+        "Please select a platform:",
+        ["All platforms", *sorted(platforms.dropna().unique())],
+        key="retention_platform",
+    )
+    show_chart(
+        charts.retention_heatmap,
+        "retention",
+        args=(None if platform == "All platforms" else platform,),
+        use_container_width=True,
+    )
+
+
+@fragment
+def age_distribution_chart():
+    country_chart(
+        charts.age_distribution,
+        ("graph2", ["country", "age"]),
+        PLAYER_COUNTRIES,
+        "Please select the country variable:",
+        "selectbox1",
+    )
+
+
+@fragment
+def roas_by_network_chart():
+    country_chart(
+        charts.roas_by_network,
+        ("graph22_2", ["date", "country", "network", "daily_roas"]),
+        MARKETING_COUNTRIES,
+        "Please select a country:",
+        "selectbox2",
+        series=True,
+    )
+
+
+@fragment
+def arpdau_by_country_chart():
+    country_chart(
+        charts.arpdau_by_country,
+        ("graph28_2", ["country", "date", "ARPDAU"]),
+        MARKETING_COUNTRIES,
+        "Please select a country:",
+        "selectbox3",
+        series=True,
+    )
+
+
+@fragment
+def cpi_by_network_chart():
+    country_chart(
+        charts.cpi_by_network,
+        ("graph31_2", ["date", "country", "network", "cpi"]),
+        MARKETING_COUNTRIES,
+        "Please select a country:",
+        "selectbox4",
+        series=True,
+    )
+
+
+# Each run reads one generation of the artifacts, even if a rebuild
+# publishes a new manifest meanwhile; the next run picks the new one up.
+store.start_watcher()
+st.session_state["artifact_snapshot"] = store.pin()
+
+
+def show_ab_result(container, number, results):
+    """Writes A/B test ``number``'s outcome, as the notebook printed it.
+
+    ``results`` come from the ``ab_*`` artifacts; without them the
+    notebook's own results are shown.
+    """
+    result = results.get(number) or abtest.notebook_result(number)
+    for line in abtest.report(result):
+        container.markdown(f"- {line}")
+    if number in results:
+        caption = (
+            f"Mean A: {result.mean_a:,.4g} (n = {result.n_a:,}), "
+            f"mean B: {result.mean_b:,.4g} (n = {result.n_b:,})"
+        )
+        if result.ci is not None:
+            low, high = result.ci
+            caption += (
+                f"; {1 - result.alpha:.0%} confidence interval of both groups'"
+                f" mean: ({low:,.4g}, {high:,.4g})"
+            )
+        container.caption(caption)
+
+
+# What each Part II test compares: the phrase its group means are
+# introduced with, and the one its conclusion names.
+AB_NARRATIVE = {
+    1: ("the average total time spent by a user", "total time spent"),
+    2: ("the average number of sessions for a user", "number of sessions"),
+    3: (
+        "the average time spent per session for a user",
+        "average time spent per session",
+    ),
+    4: ("the average in-game level for a user", "in-game level"),
+    5: ("the average total revenue generated by a user", "revenue per user"),
+    6: (
+        "the average total number of transactions for a user",
+        "number of transactions",
+    ),
+    7: ("the average AOV for a user", "AOV"),
+    8: ("the average purchase frequency for a user", "purchase frequency"),
+    9: ("the average DAU", "DAU"),
+    10: ("the average ARPDAU", "ARPDAU"),
+    11: ("the daily average revenue", "daily revenue"),
+    12: ("the daily ARPInstall", "ARPInstall"),
+    13: ("the transaction rate per DAU", "transaction rate per DAU"),
+}
+AB_FOCUS = (
+    (
+        "If the game is monetization-focused, meaning the main goal is to"
+        " increase revenue and maximize revenue per user",
+        (5, 6, 7, 8, 10, 11, 12, 13),
+    ),
+    (
+        "If the game is engagement-focused, meaning the priority is to increase"
+        " user interaction and retention",
+        (1, 2, 3, 4, 9),
+    ),
+)
+
 
+def _ab_number(value):
+    return f"{value:,.0f}" if abs(value) >= 1000 else f"{value:.5g}"
 
-@st.cache_data
-def get_graph22_2():
-    return pd.read_pickle("data/graph22_2.pkl")
 
+def _ab_justified(container, text):
+    container.markdown(
+        f"""
+        <style>
+            .justified-text {{
+                text-align: justify;
+            }}
+        </style>
+        <div class="justified-text">
+            {text}
+        </div>
+        """,
+        unsafe_allow_html=True,
+    )
 
-@st.cache_data
-def get_graph28_2():
-    return pd.read_pickle("data/graph28_2.pkl")
 
+def show_ab_intro(container, number, results):
+    """Introduces A/B test ``number`` with its group means, as of ``results``."""
+    result = results.get(number) or abtest.notebook_result(number)
+    noun, _ = AB_NARRATIVE[number]
+    method = "Z-test" if result.method == "z" else "t-test"
+    means = (
+        f"{noun} in group A is {_ab_number(result.mean_a)}, while {noun} in"
+        f" group B is {_ab_number(result.mean_b)}"
+    )
+    if result.ci is None:
+        text = (
+            f"We observe that {means}. To determine if the difference is"
+            " statistically significant, we conduct an A/B test using the"
+            f" {method} method with an alpha of {result.alpha}:"
+        )
+    else:
+        low, high = result.ci
+        text = (
+            "When we combine the A and B groups and calculate the confidence"
+            f" interval with an alpha of {result.alpha}, we find it to be"
+            f" ({_ab_number(low)}, {_ab_number(high)}). When examined"
+            f" separately, {means}. To determine if the difference is"
+            " statistically significant, we conduct an A/B test using the"
+            f" {method} method:"
+        )
+    _ab_justified(container, text)
 
-@st.cache_data
-def get_graph31_2():
-    return pd.read_pickle("data/graph31_2.pkl")
 
+def ab_conclusion(number, results):
+    """The conclusion of A/B test ``number``, from its result in ``results``."""
+    result = results.get(number) or abtest.notebook_result(number)
+    _, label = AB_NARRATIVE[number]
+    if not result.tested:
+        return (
+            f"the A/A test failed for group {result.aa_failed_group}, so the"
+            f" groups' {label} is not compared"
+        )
+    if result.rejected:
+        direction = "higher" if result.mean_b > result.mean_a else "lower"
+        return f"we observe that the experiment (B) group has a {direction} {label}"
+    return (
+        f"we find that there is no statistically significant difference in {label}"
+        " between the experiment (B) and control (A) groups"
+    )
 
-@st.cache_data
-def get_graph2():
-    return pd.read_pickle("data/graph2.pkl")
+
+def show_ab_conclusion(container, number, results):
+    container.markdown(
+        f"**As a result of the test, {ab_conclusion(number, results)}.**"
+    )
+
+
+def _ab_join(labels):
+    return (
+        labels[0] if len(labels) == 1 else f"{', '.join(labels[:-1])} and {labels[-1]}"
+    )
+
+
+def ab_summary(numbers, results):
+    """Sums up how group B differs from A over the tests ``numbers``."""
+    differences = {"higher": [], "lower": [], "not significantly different": []}
+    for number in numbers:
+        result = results.get(number) or abtest.notebook_result(number)
+        if not result.tested:
+            continue
+        if not result.rejected:
+            direction = "not significantly different"
+        else:
+            direction = "higher" if result.mean_b > result.mean_a else "lower"
+        differences[direction].append(AB_NARRATIVE[number][1])
+    parts = [
+        f"{direction} in {_ab_join(labels)}"
+        for direction, labels in differences.items()
+        if labels
+    ]
+    if not parts:
+        return "no test could be run"
+    return f"the experiment (B) group is {'; '.join(parts)}"
+
+
+def show_ab_plot(container, number):
+    """Draws A/B test ``number``'s distributions and confidence intervals.
+
+    The figure is built from the ``ab_histograms`` and ``ab_moments``
+    artifacts; without them the notebook's plot is shown.
+    """
+    if store.exists("ab_histograms") and store.exists(abtest.MOMENTS):
+        show_chart(
+            charts.ab_distribution,
+            "ab_histograms",
+            abtest.MOMENTS,
+            args=(number,),
+            container=container,
+            use_container_width=True,
+        )
+    else:
+        container.image(f"images/part_ii/{number}.png", width=750)
 
 
 # Layout
@@ -78,14 +496,34 @@ st.audio("audio/gangsta_paradise.mp3", format="audio/mpeg", loop=True, autoplay=
 
 
 # Tabs
-part1, part2, part3, part4 = st.tabs(
-    [
-        "Part I: Analysis",
-        "Part II: A/B Testing",
-        "Part III: Modelling",
-        "Part IV: Prediction",
-    ]
-)
+SECTIONS = {
+    "analysis": "Part I: Analysis",
+    "ab-testing": "Part II: A/B Testing",
+    "modelling": "Part III: Modelling",
+    "prediction": "Part IV: Prediction",
+}
+
+# With lazy sections only the selected part is executed on each rerun. The
+# selector is styled like the tab bar and mirrored in the ?section= query
+# parameter so that every part keeps a shareable link. Set to False to fall
+# back to st.tabs, which renders (and runs) all four parts every time.
+LAZY_SECTIONS = True
+
+if LAZY_SECTIONS:
+    if "section" not in st.session_state:
+        requested = st.query_params.get("section")
+        st.session_state.section = requested if requested in SECTIONS else "analysis"
+    section = st.radio(
+        "Section",
+        list(SECTIONS),
+        format_func=SECTIONS.get,
+        horizontal=True,
+        label_visibility="collapsed",
+        key="section",
+    )
+    st.query_params["section"] = section
+else:
+    tabs = st.tabs(list(SECTIONS.values()))
 
 # Tab configuration
 st.markdown(
@@ -121,6 +559,39 @@ st.markdown(
         color: #FFFFFF; 
 	}
 
+    div[data-testid="stRadio"] div[role="radiogroup"] {
+        gap: 2px;
+    }
+
+    div[data-testid="stRadio"] label[data-baseweb="radio"] {
+        height: 50px;
+        background-color: #FFFFFF;
+        border-radius: 4px 4px 0px 0px;
+        padding: 10px;
+        transition: background-color 0.3s ease;
+        margin-right: 10px;
+    }
+
+    div[data-testid="stRadio"] label[data-baseweb="radio"] > div:first-child {
+        display: none;
+    }
+
+    div[data-testid="stRadio"] label[data-baseweb="radio"]:hover {
+        background-color: #8585ad;
+    }
+
+    div[data-testid="stRadio"] label[data-baseweb="radio"]:hover p {
+        color: #FFFFFF;
+    }
+
+    div[data-testid="stRadio"] label[data-baseweb="radio"]:has(input:checked) {
+        background-color: #4d4dff;
+    }
+
+    div[data-testid="stRadio"] label[data-baseweb="radio"]:has(input:checked) p {
+        color: #FFFFFF;
+    }
+
 </style>""",
     unsafe_allow_html=True,
 )
@@ -149,7 +620,9 @@ st.markdown(
 # PART I: ANALIZ
 ###############################
 
-with part1:
+
+def render_analysis():
+    view = series_filter()
     st.markdown(
         """
         <style>
@@ -166,7 +639,10 @@ with part1:
 
     # Graph 1
     st.subheader(":blue[1) Retention Rate]")
-    st.image("images/part_i/retention_rate.png")
+    if store.exists("retention"):
+        retention_chart()
+    else:
+        st.image("images/part_i/retention_rate.png")
     st.markdown(
         """
         <style>
@@ -184,58 +660,7 @@ with part1:
     # Graph 2
     st.subheader(":blue[2) Age distribution of players by country]")
 
-    df2 = get_graph2()
-    country_age = st.selectbox(
-        "Please select the country variable:",
-        [
-            "Zephyra",
-            "Thalassia",
-            "Sunridge",
-            "Amaryllis",
-            "Brighthaven",
-            "Luminara",
-            "Gleamwood",
-            "Azurelia",
-            "Eldoria",
-            "Windemere",
-            "Rosewyn",
-            "Floravia",
-            "Glimmerdell",
-            "Emberlyn",
-            "Frostford",
-            "Crystalbrook",
-            "Seraphina",
-            "Silvermist",
-            "Moonvale",
-            "Starcliff",
-        ],
-        key="selectbox1",
-    )
-
-    df_age = df2[df2["country"] == country_age]
-
-    fig = go.Figure()
-
-    fig.add_trace(
-        go.Histogram(
-            x=df_age["age"].astype(float),
-            nbinsx=10,
-            histfunc="count",
-            marker_color="skyblue",
-            opacity=0.75,
-            name="Age Distribution",
-        )
-    )
-
-    fig.update_layout(
-        title=f"Age Distribution Histogram for {country_age}",
-        xaxis_title="Age",
-        yaxis_title="Frequency",
-        template="plotly_white",
-    )
-
-    fig.update_traces(marker=dict(line=dict(width=1, color="black")))
-    st.plotly_chart(fig)
+    age_distribution_chart()
     st.markdown(
         """
         <style>
@@ -253,76 +678,7 @@ with part1:
     # Graph 3
     st.subheader(":blue[3) Average daily hours spent in the game by users]")
 
-    df3 = pd.read_pickle("data/graph3.pkl")
-    grouped = (
-        df3.groupby(["group_type", "group_id"])
-        .agg({"avg_hours_spent_per_user": "mean"})
-        .reset_index()
-    )
-    grouped["group_label"] = grouped.groupby("group_type").cumcount() + 1
-    grouped["group_label"] = (
-        grouped["group_type"] + " " + grouped["group_label"].astype(str)
-    )
-
-    fig = go.Figure()
-    weekday_data = df3[df3["is_weekend"] == 0]
-    fig.add_trace(
-        go.Scatter(
-            x=weekday_data["event_date"],
-            y=weekday_data["avg_hours_spent_per_user"],
-            mode="markers+lines",
-            marker=dict(
-                size=10, symbol="x", color="blue", line=dict(width=2, color="black")
-            ),
-            text=weekday_data["avg_hours_spent_per_user"],
-            textposition="top center",
-            name="Weekday",
-        )
-    )
-
-    weekend_data = df3[df3["is_weekend"] == 1]
-    fig.add_trace(
-        go.Scatter(
-            x=weekend_data["event_date"],
-            y=weekend_data["avg_hours_spent_per_user"],
-            mode="markers+lines",
-            marker=dict(
-                size=10, symbol="x", color="red", line=dict(width=2, color="black")
-            ),
-            text=weekend_data["avg_hours_spent_per_user"],
-            textposition="top center",
-            name="Weekend",
-        )
-    )
-
-    fig.update_xaxes(tickformat="%b %d", dtick="D1", tickangle=45)
-
-    fig.update_layout(
-        title="Average hours spent per user in weekends and weekdays (May 2021)",
-        title_font=dict(size=15, family="Arial, sans-serif"),
-        xaxis_title="Date",
-        yaxis_title="Average Hours Spent Per User",
-        xaxis_title_font=dict(size=20, family="Arial, sans-serif"),
-        yaxis_title_font=dict(size=20, family="Arial, sans-serif"),
-        xaxis=dict(showgrid=False, gridcolor="white"),
-        yaxis=dict(showgrid=False, gridcolor="white"),
-        paper_bgcolor="white",
-        plot_bgcolor="white",
-        title_x=0.05,
-        margin=dict(l=40, r=40, t=40, b=40),
-    )
-
-    for _, row in grouped.iterrows():
-        fig.add_annotation(
-            x=df3[df3["group_id"] == row["group_id"]]["event_date"].mean(),
-            y=row["avg_hours_spent_per_user"],
-            text=row["group_label"],
-            showarrow=True,
-            arrowhead=2,
-            ax=0,
-            ay=-40,
-        )
-    st.plotly_chart(fig)
+    show_series(charts.daily_hours, "graph3", view)
     st.markdown(
         """
         <style>
@@ -339,35 +695,7 @@ with part1:
 
     # Graph 4
     st.subheader(":blue[4) Total time spent in the game by age groups]")
-    df_age_stat = pd.read_pickle("data/graph4.pkl")
-    fig = go.Figure()
-    fig.add_trace(
-        go.Bar(
-            x=df_age_stat["age_bins"],
-            y=df_age_stat["time_spend"],
-            marker=dict(color="orange"),
-            text=df_age_stat["time_spend"].round(),
-            textposition="inside",
-            textfont=dict(size=20, color="white"),
-            name="Time Spent",
-            width=0.3,
-        )
-    )
-
-    fig.update_layout(
-        title="Time Spent by Age Group",
-        title_font=dict(size=15, family="Arial, sans-serif"),
-        xaxis_title="Age Group",
-        yaxis_title="Time Spent",
-        xaxis_title_font=dict(size=20, family="Arial, sans-serif"),
-        yaxis_title_font=dict(size=20, family="Arial, sans-serif"),
-        xaxis=dict(showgrid=False),
-        yaxis=dict(showgrid=False, range=[0, 7650]),
-        paper_bgcolor="white",
-        plot_bgcolor="white",
-        margin=dict(l=40, r=40, t=40, b=40),
-    )
-    st.plotly_chart(fig)
+    show_chart(charts.time_spent_by_age, "graph4")
     st.markdown(
         """
         <style>
@@ -384,36 +712,7 @@ with part1:
 
     # Graph 5
     st.subheader(":blue[5) Average time spent by levels]")
-    df_level_time = pd.read_pickle("data/graph5.pkl")
-    fig = go.Figure(
-        data=[
-            go.Bar(
-                x=df_level_time["level_group"],
-                y=df_level_time["avg_time_per_user"],
-                marker=dict(color="royalblue"),
-                text=df_level_time["avg_time_per_user"].round(1),
-                textposition="auto",
-            )
-        ]
-    )
-
-    fig.update_layout(
-        title="Average Time Spent per User by Level Group",
-        title_font=dict(size=15, family="Arial, sans-serif"),
-        xaxis_title="Level Group",
-        yaxis_title="Average Time Spent per User (seconds)",
-        xaxis_title_font=dict(size=20, family="Arial, sans-serif"),
-        yaxis_title_font=dict(size=20, family="Arial, sans-serif"),
-        xaxis=dict(showgrid=False, gridcolor="white"),
-        yaxis=dict(showgrid=True, gridcolor="lightgrey"),
-        paper_bgcolor="white",
-        plot_bgcolor="white",
-        title_x=0.01,
-        margin=dict(l=40, r=40, t=40, b=40),
-        bargap=0.15,
-        bargroupgap=0.1,
-    )
-    st.plotly_chart(fig)
+    show_chart(charts.time_spent_by_level, "graph5")
     st.markdown(
         """
         <style>
@@ -432,59 +731,7 @@ with part1:
 
     # Graph 6
     st.subheader(":blue[6) Win, fail, and quit rates by level]")
-    df_level_status = pd.read_pickle("data/graph6.pkl")
-    trace1 = go.Bar(
-        x=df_level_status["level_group"],
-        y=df_level_status["avg_wins_per_user"],
-        name="Wins",
-        marker=dict(color="limegreen", opacity=0.7),
-    )
-
-    trace2 = go.Bar(
-        x=df_level_status["level_group"],
-        y=df_level_status["avg_quits_per_user"],
-        name="Quits",
-        marker=dict(color="orange", opacity=0.7),
-        yaxis="y2",
-    )
-
-    trace3 = go.Bar(
-        x=df_level_status["level_group"],
-        y=df_level_status["avg_fails_per_user"],
-        name="Fails",
-        marker=dict(color="darkblue", opacity=0.7),
-    )
-
-    layout = go.Layout(
-        title="Average Wins, Quits, and Fails per User by Level Group",
-        title_font=dict(size=15, family="Arial, sans-serif"),
-        xaxis=dict(
-            title="Level Group",
-            title_font=dict(size=18, family="Arial, sans-serif"),
-            showgrid=False,
-        ),
-        yaxis=dict(
-            title="Avg Wins/Fails per User",
-            title_font=dict(size=18, family="Arial, sans-serif"),
-            showgrid=False,
-        ),
-        yaxis2=dict(
-            title="Avg Quits per User",
-            title_font=dict(size=18, family="Arial, sans-serif"),
-            overlaying="y",
-            side="right",
-            showgrid=False,
-            rangemode="tozero",
-        ),
-        paper_bgcolor="white",
-        plot_bgcolor="white",
-        barmode="group",
-        showlegend=True,
-        legend=dict(x=0.8, y=1.1, orientation="h"),
-        margin=dict(l=50, r=50, t=50, b=50),
-    )
-    fig = go.Figure(data=[trace1, trace2, trace3], layout=layout)
-    st.plotly_chart(fig)
+    show_chart(charts.level_outcomes, "graph6")
     st.markdown(
         """
         <style>
@@ -503,53 +750,7 @@ with part1:
 
     # Graph 7
     st.subheader(":blue[7) Average moves made and moves left by level]")
-    trace1 = go.Scatter(
-        x=df_level_status["level_group"],
-        y=df_level_status["avg_movesmade_per_user"],
-        mode="lines+markers",
-        name="Moves Made",
-        line=dict(color="blue", width=3),
-        marker=dict(size=8, symbol="circle", color="blue"),
-        yaxis="y1",
-    )
-
-    trace2 = go.Bar(
-        x=df_level_status["level_group"],
-        y=df_level_status["avg_movesleft_per_user"],
-        name="Moves Left",
-        marker=dict(color="orange"),
-        yaxis="y2",
-        opacity=0.7,
-    )
-
-    layout = go.Layout(
-        title="Average Moves Made vs. Moves Left per User by Level Group",
-        title_font=dict(size=15, family="Arial, sans-serif"),
-        xaxis=dict(
-            title="Level Group",
-            title_font=dict(size=18, family="Arial, sans-serif"),
-            showgrid=False,
-        ),
-        yaxis=dict(
-            title="Avg Moves Made per User",
-            title_font=dict(size=18, family="Arial, sans-serif"),
-            showgrid=False,
-        ),
-        yaxis2=dict(
-            title="Avg Moves Left per User",
-            title_font=dict(size=18, family="Arial, sans-serif"),
-            overlaying="y",
-            side="right",
-            showgrid=False,
-        ),
-        paper_bgcolor="white",
-        plot_bgcolor="white",
-        showlegend=True,
-        legend=dict(x=0.7, y=1.1, orientation="h"),
-        margin=dict(l=50, r=50, t=50, b=50),
-    )
-    fig = go.Figure(data=[trace1, trace2], layout=layout)
-    st.plotly_chart(fig)
+    show_chart(charts.moves_by_level, "graph6")
     st.markdown(
         """
         <style>
@@ -566,34 +767,7 @@ with part1:
 
     # Graph 8
     st.subheader(":blue[8) Average coin expenditure by age group]")
-    fig = go.Figure()
-    fig.add_trace(
-        go.Scatter(
-            x=df_age_stat["age_bins"],
-            y=df_age_stat["coin_spend"],
-            mode="markers+lines",
-            marker=dict(size=12, color="royalblue", line=dict(width=2, color="black")),
-            line=dict(width=2, color="royalblue"),
-            text=df_age_stat["coin_spend"],
-            textposition="top center",
-            name="Coin Spend",
-        )
-    )
-
-    fig.update_layout(
-        title="Coin Spend by Age Group",
-        title_font=dict(size=15, family="Arial, sans-serif"),
-        xaxis_title="Age Group",
-        yaxis_title="Coin Spend",
-        xaxis_title_font=dict(size=20, family="Arial, sans-serif"),
-        yaxis_title_font=dict(size=20, family="Arial, sans-serif"),
-        xaxis=dict(showgrid=False),
-        yaxis=dict(showgrid=False, range=[15000, 21500]),
-        paper_bgcolor="white",
-        plot_bgcolor="white",
-        margin=dict(l=40, r=40, t=40, b=40),
-    )
-    st.plotly_chart(fig)
+    show_chart(charts.coin_spend_by_age, "graph4")
     st.markdown(
         """
         <style>
@@ -610,35 +784,7 @@ with part1:
 
     # Graph 9
     st.subheader(":blue[9) Average booster expenditure by age group]")
-    fig = go.Figure()
-    fig.add_trace(
-        go.Scatter(
-            x=df_age_stat["age_bins"],
-            y=df_age_stat["booster_spend"],
-            mode="markers+lines",
-            marker=dict(size=12, color="royalblue", line=dict(width=2, color="black")),
-            line=dict(width=2, color="royalblue"),
-            text=df_age_stat["booster_spend"],
-            textposition="top center",
-            name="Booster Spend",
-        )
-    )
-
-    fig.update_layout(
-        title="Booster Spend by Age Group",
-        title_font=dict(size=15, family="Arial, sans-serif"),
-        xaxis_title="Age Group",
-        yaxis_title="Booster Spend",
-        xaxis_title_font=dict(size=20, family="Arial, sans-serif"),
-        yaxis_title_font=dict(size=20, family="Arial, sans-serif"),
-        xaxis=dict(showgrid=False),
-        yaxis=dict(showgrid=False, range=[10, 22]),
-        paper_bgcolor="white",
-        plot_bgcolor="white",
-        margin=dict(l=40, r=40, t=40, b=40),
-    )
-
-    st.plotly_chart(fig)
+    show_chart(charts.booster_spend_by_age, "graph4")
     st.markdown(
         """
         <style>
@@ -655,30 +801,7 @@ with part1:
 
     # Graph 10
     st.subheader(":blue[10) Number of users by country]")
-    df2_2 = pd.read_pickle("data/graph2_2.pkl")
-    fig = go.Figure(
-        data=[
-            go.Pie(
-                labels=df2_2["country"],
-                values=df2_2["num_users"],
-                textinfo="label+percent",
-                hoverinfo="label+value+percent",
-                marker=dict(
-                    colors=colors.qualitative.Pastel, line=dict(color="white", width=2)
-                ),
-            )
-        ]
-    )
-
-    fig.update_layout(
-        title="User Distribution by Country",
-        title_font=dict(size=15, family="Arial, sans-serif"),
-        paper_bgcolor="white",
-        plot_bgcolor="white",
-        width=1000,
-        height=800,
-    )
-    st.plotly_chart(fig)
+    show_chart(charts.users_by_country, "graph2_2")
     st.markdown(
         """
         <style>
@@ -695,29 +818,7 @@ with part1:
 
     # Graph 11
     st.subheader(":blue[11)	Revenue distribution by country]")
-    fig = go.Figure(
-        data=[
-            go.Pie(
-                labels=df2_2["country"],
-                values=df2_2["sum_revenue"],
-                textinfo="label+percent",
-                hoverinfo="label+value+percent",
-                marker=dict(
-                    colors=colors.qualitative.Pastel, line=dict(color="white", width=2)
-                ),
-            )
-        ]
-    )
-
-    fig.update_layout(
-        title="Revenue Distribution by Country",
-        title_font=dict(size=15, family="Arial, sans-serif"),
-        paper_bgcolor="white",
-        plot_bgcolor="white",
-        width=1000,
-        height=800,
-    )
-    st.plotly_chart(fig)
+    show_chart(charts.revenue_by_country, "graph2_2")
     st.markdown(
         """
         <style>
@@ -736,57 +837,13 @@ with part1:
     st.subheader(
         ":blue[12)	Revenue distribution and average time spent based on event participation]"
     )
-    df12 = pd.read_pickle("data/graph12.pkl")
-
-    fig1 = go.Figure(
-        data=[
-            go.Pie(
-                labels=df12["event_participate"],
-                values=df12["avg_rev"],
-                textinfo="label+percent",
-                insidetextorientation="radial",
-                hole=0.3,
-                marker=dict(colors=["darkblue", "orange"]),
-            )
-        ]
-    )
-
-    fig1.update_layout(
-        title="Average Revenue by Event Participation",
-        title_font=dict(size=15, family="Arial, sans-serif"),
-        paper_bgcolor="white",
-        plot_bgcolor="white",
-        margin=dict(l=40, r=40, t=40, b=40),
-    )
-
-    fig2 = go.Figure(
-        data=[
-            go.Pie(
-                labels=df12["event_participate"],
-                values=df12["avg_time_spend"],
-                textinfo="label+percent",
-                insidetextorientation="radial",
-                hole=0.3,
-                marker=dict(colors=["darkblue"]),
-            )
-        ]
-    )
-
-    fig2.update_layout(
-        title="Average Time Spent by Event Participation",
-        title_font=dict(size=15, family="Arial, sans-serif"),
-        paper_bgcolor="white",
-        plot_bgcolor="white",
-        margin=dict(l=40, r=40, t=40, b=40),
-    )
-
     # buraya dikkat with part1: vardi...
     col1, col2 = st.columns(2)
     with col1:
-        st.plotly_chart(fig1, use_container_width=True)
+        show_chart(charts.event_revenue, "graph12", use_container_width=True)
 
     with col2:
-        st.plotly_chart(fig2, use_container_width=True)
+        show_chart(charts.event_time_spent, "graph12", use_container_width=True)
 
     st.markdown(
         """
@@ -805,28 +862,7 @@ with part1:
 
     # Graph 13
     st.subheader(":blue[13)	Network and Installation]")
-    df13 = pd.read_pickle("data/graph13.pkl")
-    fig = px.bar(
-        df13.sort_values(by="total_installments", ascending=False),
-        x="total_installments",
-        y="network",
-        orientation="h",  # Horizontal
-        color="network",
-        color_discrete_sequence=px.colors.qualitative.Pastel,
-        title="Number of Installs by Network",
-    )
-
-    fig.update_layout(
-        title_font=dict(size=15, family="Arial, sans-serif"),
-        paper_bgcolor="white",
-        plot_bgcolor="white",
-        xaxis_title="Number of Installs",
-        yaxis_title="Network",
-        margin=dict(l=100, r=40, t=40, b=40),
-    )
-
-    fig.update_traces(texttemplate="%{x}", textposition="outside")
-    st.plotly_chart(fig)
+    show_chart(charts.installs_by_network, "graph13")
     st.markdown(
         """
         <style>
@@ -843,27 +879,7 @@ with part1:
 
     # Graph 14
     st.subheader(":blue[14)	Network and Cost]")
-    fig = px.bar(
-        df13.sort_values(by="total_cost", ascending=False),
-        x="total_cost",
-        y="network",
-        orientation="h",
-        color="network",
-        color_discrete_sequence=px.colors.qualitative.Pastel,
-        title="Total cost by network",
-    )
-
-    fig.update_layout(
-        title_font=dict(size=15, family="Arial, sans-serif"),
-        paper_bgcolor="white",
-        plot_bgcolor="white",
-        xaxis_title="Total Cost",
-        yaxis_title="Network",
-        margin=dict(l=100, r=40, t=40, b=40),
-    )
-
-    fig.update_traces(texttemplate="%{x}", textposition="outside")
-    st.plotly_chart(fig)
+    show_chart(charts.cost_by_network, "graph13")
     st.markdown(
         """
         <style>
@@ -880,27 +896,7 @@ with part1:
 
     # Graph 15
     st.subheader(":blue[15) Network and Number of Installations per $]")
-    fig = px.bar(
-        df13,
-        x="installs_per_cost_unit",
-        y="network",
-        orientation="h",
-        color="network",
-        color_discrete_sequence=px.colors.qualitative.Pastel,
-        title="Number of Installation per $ by Network",
-    )
-
-    fig.update_layout(
-        title_font=dict(size=15, family="Arial, sans-serif"),
-        paper_bgcolor="white",
-        plot_bgcolor="white",
-        xaxis_title="Number of Installation per $",
-        yaxis_title="Network",
-        margin=dict(l=100, r=40, t=40, b=40),
-    )
-
-    fig.update_traces(texttemplate="%{x}", textposition="outside")
-    st.plotly_chart(fig)
+    show_chart(charts.installs_per_dollar_by_network, "graph13")
     st.markdown(
         """
         <style>
@@ -917,28 +913,7 @@ with part1:
 
     # Graph 16
     st.subheader(":blue[16)	Number of Installations by Country]")
-    df16 = pd.read_pickle("data/graph16.pkl")
-    fig = px.bar(
-        df16.sort_values(by="total_installments", ascending=False),
-        x="total_installments",
-        y="country",
-        orientation="h",
-        color="country",
-        color_discrete_sequence=px.colors.qualitative.Pastel,
-        title="Number of Installs by Country",
-    )
-
-    fig.update_layout(
-        title_font=dict(size=15, family="Arial, sans-serif"),
-        paper_bgcolor="white",
-        plot_bgcolor="white",
-        xaxis_title="Number of Installs",
-        yaxis_title="Country",
-        margin=dict(l=100, r=40, t=40, b=40),
-    )
-
-    fig.update_traces(texttemplate="%{x}", textposition="outside")
-    st.plotly_chart(fig)
+    show_chart(charts.installs_by_country, "graph16")
     st.markdown(
         """
         <style>
@@ -955,27 +930,7 @@ with part1:
 
     # Graph 17
     st.subheader(":blue[17)	Marketing Costs by Country]")
-    fig = px.bar(
-        df16.sort_values(by="total_cost", ascending=False),
-        x="total_cost",
-        y="country",
-        orientation="h",
-        color="country",
-        color_discrete_sequence=px.colors.qualitative.Pastel,
-        title="Total cost by country",
-    )
-
-    fig.update_layout(
-        title_font=dict(size=15, family="Arial, sans-serif"),
-        paper_bgcolor="white",
-        plot_bgcolor="white",
-        xaxis_title="Total Cost",
-        yaxis_title="Country",
-        margin=dict(l=100, r=40, t=40, b=40),
-    )
-
-    fig.update_traces(texttemplate="%{x}", textposition="outside")
-    st.plotly_chart(fig)
+    show_chart(charts.cost_by_country, "graph16")
     st.markdown(
         """
         <style>
@@ -992,27 +947,7 @@ with part1:
 
     # Graph 18
     st.subheader(":blue[18) Number of Installations per $ by Country]")
-    fig = px.bar(
-        df16,
-        x="installs_per_cost_unit",
-        y="country",
-        orientation="h",
-        color="country",
-        color_discrete_sequence=px.colors.qualitative.Pastel,
-        title="Number of Installation per $ by Country",
-    )
-
-    fig.update_layout(
-        title_font=dict(size=15, family="Arial, sans-serif"),
-        paper_bgcolor="white",
-        plot_bgcolor="white",
-        xaxis_title="Number of Installation per $",
-        yaxis_title="Country",
-        margin=dict(l=100, r=40, t=40, b=40),
-    )
-
-    fig.update_traces(texttemplate="%{x}", textposition="outside")
-    st.plotly_chart(fig)
+    show_chart(charts.installs_per_dollar_by_country, "graph16")
     st.markdown(
         """
         <style>
@@ -1029,28 +964,7 @@ with part1:
 
     # Graph 19
     st.subheader(":blue[19) Revenue per User by Country]")
-    df19 = pd.read_pickle("data/graph19.pkl")
-    fig = px.bar(
-        df19,
-        x="total_rev_per_user",
-        y="country",
-        orientation="h",
-        color="country",
-        color_discrete_sequence=px.colors.qualitative.Pastel,
-        title="Revenue per user by Country",
-    )
-
-    fig.update_layout(
-        title_font=dict(size=15, family="Arial, sans-serif"),
-        paper_bgcolor="white",
-        plot_bgcolor="white",
-        xaxis_title="Revenue per user",
-        yaxis_title="country",
-        margin=dict(l=100, r=40, t=40, b=40),
-    )
-
-    fig.update_traces(texttemplate="%{x}", textposition="outside")
-    st.plotly_chart(fig)
+    show_chart(charts.revenue_per_user_by_country, "graph19")
     st.markdown(
         """
         <style>
@@ -1067,66 +981,7 @@ with part1:
 
     # Graph 20
     st.subheader(":blue[20)	Revenue, Costs, and Cost Per Revenue by Platform]")
-    df20 = pd.read_pickle("data/graph20.pkl")
-    trace1 = go.Bar(
-        x=df20["platform"],
-        y=df20["revenue"],
-        name="Revenue",
-        marker=dict(color="limegreen", opacity=0.7),
-        width=0.1,
-        offsetgroup=0,
-    )
-
-    trace2 = go.Bar(
-        x=df20["platform"],
-        y=df20["cost"],
-        name="Cost",
-        marker=dict(color="darkblue", opacity=0.7),
-        width=0.1,
-        offsetgroup=1,
-    )
-
-    trace3 = go.Bar(
-        x=df20["platform"],
-        y=df20["rev_to_cost"],
-        name="Rev to Cost",
-        marker=dict(color="orange", opacity=0.7),
-        yaxis="y2",
-        width=0.1,
-        offsetgroup=2,
-    )
-
-    layout = go.Layout(
-        title="Revenue, Cost and Revenue/Cost by Platform (Android & iOS)",
-        title_font=dict(size=15, family="Arial, sans-serif"),
-        xaxis=dict(
-            title="Platform",
-            title_font=dict(size=18, family="Arial, sans-serif"),
-            showgrid=False,
-        ),
-        yaxis=dict(
-            title="$",
-            title_font=dict(size=22, family="Arial, sans-serif"),
-            showgrid=False,
-        ),
-        yaxis2=dict(
-            title="Revenue to Cost",
-            title_font=dict(size=18, family="Arial, sans-serif"),
-            overlaying="y",
-            side="right",
-            showgrid=False,
-            rangemode="tozero",
-        ),
-        paper_bgcolor="white",
-        plot_bgcolor="white",
-        barmode="group",
-        showlegend=True,
-        legend=dict(x=0.8, y=1.1, orientation="h"),
-        margin=dict(l=50, r=50, t=50, b=50),
-    )
-
-    fig = go.Figure(data=[trace1, trace2, trace3], layout=layout)
-    st.plotly_chart(fig)
+    show_chart(charts.platform_revenue_cost, "graph20")
     st.markdown(
         """
         <style>
@@ -1143,53 +998,7 @@ with part1:
 
     # Graph 21
     st.subheader(":blue[21) Android vs IOS]")
-    df21_1 = pd.read_pickle("data/graph21_1.pkl")
-    df21_2 = pd.read_pickle("data/graph21_2.pkl")
-
-    fig = make_subplots(
-        rows=1,
-        cols=2,
-        subplot_titles=(
-            "Time Spent",
-            "User Distribution",
-        ),
-        specs=[[{"type": "domain"}, {"type": "domain"}]],
-    )
-
-    # (Average Time Spent per User by Platform)
-    fig.add_trace(
-        go.Pie(
-            labels=df21_1["platform"],
-            values=df21_1["avg_time_spent_per_user"],
-            textinfo="label+percent",
-            insidetextorientation="radial",
-            hole=0.3,
-            marker=dict(colors=["limegreen", "lightgrey"]),
-        ),
-        row=1,
-        col=1,
-    )
-
-    # (Number of Users by Platform)
-    fig.add_trace(
-        go.Pie(
-            labels=df21_2["platform"],
-            values=df21_2["user_count"],
-            textinfo="label+percent",
-            insidetextorientation="radial",
-            hole=0.3,
-            marker=dict(colors=["limegreen", "lightgrey"]),
-        ),
-        row=1,
-        col=2,
-    )
-
-    fig.update_layout(
-        paper_bgcolor="white",
-        plot_bgcolor="white",
-        margin=dict(l=40, r=40, t=40, b=40),
-    )
-    st.plotly_chart(fig)
+    show_chart(charts.platform_split, "graph21_1", "graph21_2")
 
     st.markdown(
         """
@@ -1227,42 +1036,7 @@ with part1:
 
     # Graph 22
     st.subheader(":blue[22) ROAS]")
-    df22 = pd.read_pickle("data/graph22.pkl")
-    avg_roas = df22["ROAS"].mean()
-    fig = go.Figure()
-
-    fig.add_trace(
-        go.Scatter(
-            x=df22["date"],
-            y=df22["ROAS"],
-            mode="lines+markers",
-            name="ROAS",
-            line=dict(color="black"),
-            marker=dict(color="red"),
-        )
-    )
-
-    fig.update_layout(
-        title="Daily ROAS",
-        xaxis_title="Date",
-        yaxis_title="ROAS",
-        plot_bgcolor="white",
-        paper_bgcolor="white",
-        xaxis=dict(showgrid=False, showline=True),
-        yaxis=dict(showgrid=False, showline=True),
-    )
-
-    fig.add_annotation(
-        text=f"ROAS: {avg_roas:.2f}",
-        xref="paper",
-        yref="paper",
-        x=0.90,
-        y=1.1,
-        showarrow=False,
-        font=dict(size=12, color="darkblue"),
-        align="right",
-    )
-    st.plotly_chart(fig)
+    show_series(charts.daily_roas, "graph22", view)
     st.markdown(
         """
         <style>
@@ -1279,52 +1053,7 @@ with part1:
         unsafe_allow_html=True,
     )
 
-    country_roas = st.selectbox(
-        "Please select a country:",
-        ["Mercury", "Venus", "Pluton", "Saturn", "Uranus"],
-        key="selectbox2",
-    )
-
-    df22_2 = get_graph22_2()
-    df22_2 = df22_2[df22_2["country"] == country_roas]
-    networks = df22_2.network.unique()
-    fig = go.Figure()
-    network_roas = dict()
-    annot_loc = 1
-    for network in networks:
-        temp_df = df22_2[df22_2["network"] == network]
-        fig.add_trace(
-            go.Scatter(
-                x=temp_df["date"],
-                y=temp_df["daily_roas"],
-                mode="lines+markers",
-                name=network,
-            )
-        )
-
-        avg_roas = temp_df["daily_roas"].mean()
-        fig.add_annotation(
-            text=f"Average {network} ROAS: {avg_roas:.2f}",
-            xref="paper",
-            yref="paper",
-            x=0.05,
-            y=annot_loc,
-            showarrow=False,
-            font=dict(size=12, color="darkblue"),
-            align="right",
-        )
-        annot_loc -= 0.1
-
-    fig.update_layout(
-        title=f"ROAS for {country_roas}",
-        xaxis_title="Date",
-        yaxis_title="ROAS",
-        plot_bgcolor="white",
-        paper_bgcolor="white",
-        xaxis=dict(showgrid=False, showline=True),
-        yaxis=dict(showgrid=False, showline=True),
-    )
-    st.plotly_chart(fig)
+    roas_by_network_chart()
 
     st.markdown(
         """
@@ -1342,42 +1071,7 @@ with part1:
 
     # Graph 23
     st.subheader(":blue[23) Daily Installations]")
-    df23 = pd.read_pickle("data/graph23.pkl")
-    avg_installs = df23["daily_installs"].mean()
-
-    fig = go.Figure()
-    fig.add_trace(
-        go.Scatter(
-            x=df23["install_date"],
-            y=df23["daily_installs"],
-            mode="lines+markers",
-            name="Daily Install",
-            line=dict(color="black"),
-            marker=dict(color="darkblue"),
-        )
-    )
-
-    fig.update_layout(
-        title="Daily Install",
-        xaxis_title="Install Date",
-        yaxis_title="Daily Install",
-        plot_bgcolor="white",
-        paper_bgcolor="white",
-        xaxis=dict(showgrid=False, showline=True),
-        yaxis=dict(showgrid=False, showline=True),
-    )
-
-    fig.add_annotation(
-        text=f"Average Daily Install: {avg_installs:.2f}",
-        xref="paper",
-        yref="paper",
-        x=0.95,
-        y=0.99,
-        showarrow=False,
-        font=dict(size=12, color="darkblue"),
-        align="right",
-    )
-    st.plotly_chart(fig)
+    show_series(charts.daily_installs, "graph23", view)
     st.markdown(
         """
         <style>
@@ -1394,71 +1088,7 @@ with part1:
 
     # Graph 24
     st.subheader(":blue[24) DAU and Daily Session Count]")
-    df24 = pd.read_pickle("data/graph24.pkl")
-    avg_dau = df24["DAU"].mean()
-    avg_daily_sessions = df24["daily_sessions"].mean()
-    avg_sessions_per_dau = df24["sessions_per_DAU"].mean()
-
-    fig = go.Figure()
-
-    fig.add_trace(
-        go.Scatter(
-            x=df24["event_date"],
-            y=df24["daily_sessions"],
-            mode="lines+markers",
-            name="Daily Sessions",
-            line=dict(color="black"),
-            marker=dict(color="black"),
-        )
-    )
-
-    fig.add_trace(
-        go.Scatter(
-            x=df24["event_date"],
-            y=df24["DAU"],
-            mode="lines+markers",
-            name="DAU",
-            line=dict(color="orange"),
-            marker=dict(color="orange"),
-            yaxis="y2",
-        )
-    )
-
-    fig.update_layout(
-        title="Daily Sessions and DAU",
-        xaxis_title="Event Date",
-        yaxis_title="Daily Sessions",
-        yaxis2=dict(
-            title="DAU", overlaying="y", side="right", showgrid=False, showline=True
-        ),
-        plot_bgcolor="white",
-        paper_bgcolor="white",
-        xaxis=dict(showgrid=False, showline=True),
-        yaxis=dict(showgrid=False, showline=True),
-    )
-
-    fig.add_annotation(
-        text=f"Average DAU: {avg_dau:.2f}",
-        xref="paper",
-        yref="paper",
-        x=0.95,
-        y=0.95,
-        showarrow=False,
-        font=dict(size=12, color="orange"),
-        align="right",
-    )
-
-    fig.add_annotation(
-        text=f"Average Daily Sessions: {avg_daily_sessions:.2f}",
-        xref="paper",
-        yref="paper",
-        x=0.95,
-        y=0.90,
-        showarrow=False,
-        font=dict(size=12, color="black"),
-        align="right",
-    )
-    st.plotly_chart(fig)
+    show_series(charts.sessions_and_dau, "graph24", view)
 
     st.markdown(
         """
@@ -1477,41 +1107,7 @@ with part1:
 
     # Graph 25
     st.subheader(":blue[25) SessionDAU]")
-    fig = go.Figure()
-
-    fig.add_trace(
-        go.Scatter(
-            x=df24["event_date"],
-            y=df24["sessions_per_DAU"],
-            mode="lines+markers",
-            name="Sessions per DAU",
-            line=dict(color="black"),
-            marker=dict(color="darkorange"),
-        )
-    )
-
-    fig.update_layout(
-        title="Sessions per DAU",
-        xaxis_title="Event Date",
-        yaxis_title="Sessions per DAU",
-        plot_bgcolor="white",
-        paper_bgcolor="white",
-        xaxis=dict(showgrid=False, showline=True),
-        yaxis=dict(showgrid=False, showline=True),
-    )
-
-    fig.add_annotation(
-        text=f"Average Sessions per DAU: {avg_sessions_per_dau:.2f}",
-        xref="paper",
-        yref="paper",
-        x=0.95,
-        y=0.95,
-        showarrow=False,
-        font=dict(size=12, color="darkblue"),
-        align="right",
-    )
-
-    st.plotly_chart(fig)
+    show_series(charts.sessions_per_dau, "graph24", view)
 
     st.markdown(
         """
@@ -1565,43 +1161,7 @@ with part1:
 
     # Graph 28
     st.subheader(":blue[28) ARPDAU]")
-    df28 = pd.read_pickle("data/graph28.pkl")
-    avg_arpdau = df28["ARPDAU"].mean()
-    fig = go.Figure()
-
-    fig.add_trace(
-        go.Scatter(
-            x=df28["date"],
-            y=df28["ARPDAU"],
-            mode="lines+markers",
-            name="ARPDAU",
-            line=dict(color="black"),
-            marker=dict(color="magenta"),
-        )
-    )
-
-    fig.update_layout(
-        title="ARPDAU",
-        xaxis_title="Date",
-        yaxis_title="ARPDAU",
-        plot_bgcolor="white",
-        paper_bgcolor="white",
-        xaxis=dict(showgrid=False, showline=True),
-        yaxis=dict(showgrid=False, showline=True),
-    )
-
-    fig.add_annotation(
-        text=f"Average ARPDAU: {avg_arpdau:.2f}",
-        xref="paper",
-        yref="paper",
-        x=0.95,
-        y=1.1,
-        showarrow=False,
-        font=dict(size=12, color="darkblue"),
-        align="right",
-    )
-
-    st.plotly_chart(fig)
+    show_series(charts.daily_arpdau, "graph28", view)
 
     st.markdown(
         """
@@ -1621,49 +1181,7 @@ with part1:
         unsafe_allow_html=True,
     )
 
-    country_arpdau = st.selectbox(
-        "Please select a country:",
-        ["Mercury", "Venus", "Pluton", "Saturn", "Uranus"],
-        key="selectbox3",
-    )
-    df28_2 = get_graph28_2()
-    a = df28_2[df28_2["country"] == country_arpdau]
-    avg_arpdau_country = a["ARPDAU"].mean()
-    fig = go.Figure()
-
-    fig.add_trace(
-        go.Scatter(
-            x=a["date"],
-            y=a["ARPDAU"],
-            mode="lines+markers",
-            name="ARPDAU",
-            line=dict(color="black"),
-            marker=dict(color="magenta"),
-        )
-    )
-
-    fig.update_layout(
-        title=f"ARPDAU for {country_arpdau}",
-        xaxis_title="Date",
-        yaxis_title="ARPDAU",
-        plot_bgcolor="white",
-        paper_bgcolor="white",
-        xaxis=dict(showgrid=False, showline=True),
-        yaxis=dict(showgrid=False, showline=True),
-    )
-
-    fig.add_annotation(
-        text=f"Average ARPDAU: {avg_arpdau_country:.2f}",
-        xref="paper",
-        yref="paper",
-        x=0.95,
-        y=1.1,
-        showarrow=False,
-        font=dict(size=12, color="darkblue"),
-        align="right",
-    )
-
-    st.plotly_chart(fig)
+    arpdau_by_country_chart()
 
     st.markdown(
         """
@@ -1681,75 +1199,7 @@ with part1:
 
     # Graph 29
     st.subheader(":blue[29) PlaytimeDAU]")
-    df29 = pd.read_pickle("data/graph29.pkl")
-    avg_playtime_dau = df29["playtime_dau"].mean()
-    avg_total_timespent = df29["total_time_spent"].mean()
-
-    fig = go.Figure()
-
-    fig.add_trace(
-        go.Scatter(
-            x=df29["date"],
-            y=df29["total_time_spent"],
-            mode="lines+markers",
-            name="Playtime",
-            line=dict(color="black"),
-            marker=dict(color="black"),
-        )
-    )
-
-    fig.add_trace(
-        go.Scatter(
-            x=df29["date"],
-            y=df29["playtime_dau"],
-            mode="lines+markers",
-            name="PlaytimeDAU",
-            line=dict(color="orange"),
-            marker=dict(color="orange"),
-            yaxis="y2",
-        )
-    )
-
-    fig.update_layout(
-        title="Playtime & PlaytimeDAU",
-        xaxis_title="Date",
-        yaxis_title="Playtime",
-        yaxis2=dict(
-            title="PlaytimeDAU",
-            overlaying="y",
-            side="right",
-            showgrid=False,
-            showline=True,
-        ),
-        plot_bgcolor="white",
-        paper_bgcolor="white",
-        xaxis=dict(showgrid=False, showline=True),
-        yaxis=dict(showgrid=False, showline=True),
-    )
-
-    fig.add_annotation(
-        text=f"PlaytimeDAU: {avg_playtime_dau:.2f}",
-        xref="paper",
-        yref="paper",
-        x=0.95,
-        y=1.1,
-        showarrow=False,
-        font=dict(size=12, color="black"),
-        align="right",
-    )
-
-    fig.add_annotation(
-        text=f"Playtime: {avg_total_timespent:.2f}",
-        xref="paper",
-        yref="paper",
-        x=0.96,
-        y=1.2,
-        showarrow=False,
-        font=dict(size=12, color="black"),
-        align="right",
-    )
-
-    st.plotly_chart(fig)
+    show_series(charts.playtime, "graph29", view)
     st.markdown(
         """
         <style>
@@ -1766,43 +1216,7 @@ with part1:
 
     # Graph 30
     st.subheader(":blue[30) ARPInstall]")
-    df30 = pd.read_pickle("data/graph30.pkl")
-    avg_arpinstall = df30["arp_install"].mean()
-    fig = go.Figure()
-
-    fig.add_trace(
-        go.Scatter(
-            x=df30["date"],
-            y=df30["arp_install"],
-            mode="lines+markers",
-            name="ARPInstall",
-            line=dict(color="black"),
-            marker=dict(color="limegreen"),
-        )
-    )
-
-    fig.update_layout(
-        title="Daily ARPInstall",
-        xaxis_title="Date",
-        yaxis_title="ARPInstall",
-        plot_bgcolor="white",
-        paper_bgcolor="white",
-        xaxis=dict(showgrid=False, showline=True),
-        yaxis=dict(showgrid=False, showline=True),
-    )
-
-    fig.add_annotation(
-        text=f"ARPInstall: {avg_arpinstall:.2f}",
-        xref="paper",
-        yref="paper",
-        x=0.90,
-        y=0.99,
-        showarrow=False,
-        font=dict(size=12, color="darkblue"),
-        align="right",
-    )
-
-    st.plotly_chart(fig)
+    show_series(charts.daily_arpinstall, "graph30", view)
 
     st.markdown(
         """
@@ -1820,43 +1234,7 @@ with part1:
 
     # Graph 31
     st.subheader(":blue[31) CPI]")
-    df31 = pd.read_pickle("data/graph31.pkl")
-    avg_cpi = df31.cpi.mean()
-
-    fig = go.Figure()
-
-    fig.add_trace(
-        go.Scatter(
-            x=df31["date"],
-            y=df31["cpi"],
-            mode="lines+markers",
-            name="CPI",
-            line=dict(color="black"),
-            marker=dict(color="orange"),
-        )
-    )
-
-    fig.update_layout(
-        title="Daily CPI",
-        xaxis_title="Date",
-        yaxis_title="CPI",
-        plot_bgcolor="white",
-        paper_bgcolor="white",
-        xaxis=dict(showgrid=False, showline=True),
-        yaxis=dict(showgrid=False, showline=True),
-    )
-
-    fig.add_annotation(
-        text=f"CPI: {avg_cpi:.2f}",
-        xref="paper",
-        yref="paper",
-        x=0.90,
-        y=1.1,
-        showarrow=False,
-        font=dict(size=15, color="darkblue"),
-        align="right",
-    )
-    st.plotly_chart(fig)
+    show_series(charts.daily_cpi, "graph31", view)
 
     st.markdown(
         """
@@ -1874,52 +1252,7 @@ with part1:
         unsafe_allow_html=True,
     )
 
-    df31_2 = get_graph31_2()
-    country_cpi = st.selectbox(
-        "Please select a country:",
-        ["Mercury", "Venus", "Pluton", "Saturn", "Uranus"],
-        key="selectbox4",
-    )
-    a = df31_2[df31_2["country"] == country_cpi]
-    networks = a.network.unique()
-    fig = go.Figure()
-    network_roas = dict()
-    annot_loc = 1.05
-    for network in networks:
-        temp_df = a[a["network"] == network]
-        fig.add_trace(
-            go.Scatter(
-                x=temp_df["date"],
-                y=temp_df["cpi"],
-                mode="lines+markers",
-                name=network,
-            )
-        )
-
-        avg_roas = temp_df["cpi"].mean()
-        fig.add_annotation(
-            text=f"Average {network} CPI: {avg_roas:.2f}",
-            xref="paper",
-            yref="paper",
-            x=0.09,
-            y=annot_loc,
-            showarrow=False,
-            font=dict(size=12, color="darkblue"),
-            align="right",
-        )
-        annot_loc -= 0.1
-
-    fig.update_layout(
-        title=f"CPI for {country_cpi}",
-        xaxis_title="Date",
-        yaxis_title="CPI",
-        plot_bgcolor="white",
-        paper_bgcolor="white",
-        xaxis=dict(showgrid=False, showline=True),
-        yaxis=dict(showgrid=False, showline=True),
-    )
-
-    st.plotly_chart(fig)
+    cpi_by_network_chart()
 
     st.markdown(
         """
@@ -1937,56 +1270,22 @@ with part1:
 
     # Graph 32
     st.subheader(":blue[32) Stickiness]")
-    df32 = pd.read_pickle("data/graph32.pkl")
-    avg_stickiness = df32.stickiness.mean()
-
-    fig = go.Figure()
-
-    fig.add_trace(
-        go.Scatter(
-            x=df32["date"],
-            y=df32["stickiness"],
-            mode="lines+markers",
-            name="Stickiness",
-            line=dict(color="black"),
-            marker=dict(color="orange"),
-        )
-    )
-
-    fig.update_layout(
-        title="Daily Stickiness",
-        xaxis_title="Date",
-        yaxis_title="Stickiness",
-        plot_bgcolor="white",
-        paper_bgcolor="white",
-        xaxis=dict(showgrid=False, showline=True),
-        yaxis=dict(showgrid=False, showline=True),
-    )
-
-    fig.add_annotation(
-        text=f"Stickiness: {avg_stickiness:.2f}",
-        xref="paper",
-        yref="paper",
-        x=0.90,
-        y=1.1,
-        showarrow=False,
-        font=dict(size=15, color="darkblue"),
-        align="right",
-    )
-
-    st.plotly_chart(fig)
+    show_series(charts.stickiness, "graph32", view)
 
+    # Benchmarks put good stickiness at about 20%.
+    average = load_artifact("graph32")["stickiness"].mean()
+    verdict = "which is quite low" if round(average, 2) < 0.2 else "which is healthy"
     st.markdown(
-        """
+        f"""
         <style>
-            .justified-text {
+            .justified-text {{
                 text-align: justify;
-            }
+            }}
         </style>
         <div class="justified-text">
             The stickiness metric is an important measure related to retention and engagement. Therefore, it is desirable for stickiness to be as high as possible. Looking at the stickiness graph above, we can observe a positive trend, with stickiness steadily increasing.
         <p></p>
-            However, when we calculate the average daily stickiness, we get a value of 3%, which is quite low. The first option to increase stickiness would be to enhance the personalization within the game. Many years ago, people were deeply engaged in MMORPGs because these games offered maximum levels of personalization. As long as you personalize a game correctly, the player will form a deeper connection with it, leading to greater loyalty. Therefore, the first strategy to boost stickiness would be to increase the level of personalization in the game.
+            However, when we calculate the average daily stickiness, we get a value of {average:.0%}, {verdict}. The first option to increase stickiness would be to enhance the personalization within the game. Many years ago, people were deeply engaged in MMORPGs because these games offered maximum levels of personalization. As long as you personalize a game correctly, the player will form a deeper connection with it, leading to greater loyalty. Therefore, the first strategy to boost stickiness would be to increase the level of personalization in the game.
         <p></p>
             Another approach would be to regularly release updates with reasonable frequency and introduce new features. For example, consistently fixing bugs through updates and addressing feedback from players. This way, the development process will align with players' expectations, and their engagement with the game will increase.
         </div>
@@ -1996,87 +1295,20 @@ with part1:
 
     # Graph 33
     st.subheader(":blue[33) PLTV Segmentation]")
-    df33 = pd.read_pickle("data/graph33.pkl")
-    grouped_df = (
-        df33.groupby("segment", observed=False)
-        .agg({"total_payment": "sum", "total_transaction": "mean"})
-        .reset_index()
-    )
-
-    pie1 = go.Pie(
-        labels=grouped_df["segment"],
-        values=grouped_df["total_payment"],
-        textinfo="label+percent",
-        insidetextorientation="radial",
-        marker=dict(colors=colors.qualitative.Pastel),
-        hole=0.4,
-    )
-
-    pie2 = go.Pie(
-        labels=grouped_df["segment"],
-        values=grouped_df["total_transaction"],
-        textinfo="label+percent",
-        insidetextorientation="radial",
-        marker=dict(colors=colors.qualitative.Pastel),
-        hole=0.4,
-    )
-
-    grouped_df = (
-        df33.groupby("segment", observed=False)
-        .agg({"average_order_value": ["mean", "count"]})
-        .reset_index()
-    )
-
-    pie3 = go.Pie(
-        labels=grouped_df["segment"],
-        values=grouped_df.average_order_value["mean"],
-        textinfo="label+percent",
-        insidetextorientation="radial",
-        marker=dict(colors=colors.qualitative.Pastel),
-        hole=0.4,
-    )
-
-    pie4 = go.Pie(
-        labels=grouped_df["segment"],
-        values=grouped_df.average_order_value["count"],
-        textinfo="label+percent",
-        insidetextorientation="radial",
-        marker=dict(colors=colors.qualitative.Pastel),
-        hole=0.4,
-    )
-
-    fig = make_subplots(
-        rows=2,
-        cols=2,
-        specs=[
-            [{"type": "domain"}, {"type": "domain"}],
-            [{"type": "domain"}, {"type": "domain"}],
-        ],
-        subplot_titles=[
-            "Total Payment Sum by Segment",
-            "Average Transaction Count by Segment",
-            "Average Order Value by Segment",
-            "Distribution of Segments",
-        ],
-        horizontal_spacing=0,  # Yatay boşluk (default: 0.2)
-        vertical_spacing=0.1,
-    )
-
-    fig.add_trace(pie1, row=1, col=1)
-    fig.add_trace(pie2, row=1, col=2)
-    fig.add_trace(pie3, row=2, col=1)
-    fig.add_trace(pie4, row=2, col=2)
-
-    fig.update_layout(
-        paper_bgcolor="white",
-        plot_bgcolor="white",
-        showlegend=True,
-        margin=dict(l=20, r=20, t=50, b=50),
-        width=1000,
-        height=750,
-    )
     left_part1, right_part1 = st.columns([0.15, 0.7])
-    right_part1.plotly_chart(fig)
+    show_chart(
+        charts.pltv_segments,
+        (
+            "graph33",
+            [
+                "segment",
+                "total_payment",
+                "total_transaction",
+                "average_order_value",
+            ],
+        ),
+        container=right_part1,
+    )
 
     st.markdown(
         """
@@ -2101,63 +1333,7 @@ with part1:
         """,
         unsafe_allow_html=True,
     )
-    df33_2 = pd.read_pickle("data/graph33_2.pkl")
-    fig = go.Figure()
-
-    fig.add_trace(
-        go.Scatter(
-            x=df33_2[df33_2["segment"] == "A"]["event_date"],
-            y=df33_2[df33_2["segment"] == "A"]["dau"],
-            mode="lines+markers",
-            name="A segment DAU",
-            line=dict(color="black"),
-            marker=dict(color="black"),
-        )
-    )
-
-    fig.add_trace(
-        go.Scatter(
-            x=df33_2[df33_2["segment"] == "B"]["event_date"],
-            y=df33_2[df33_2["segment"] == "B"]["dau"],
-            mode="lines+markers",
-            name="B segment DAU",
-            line=dict(color="orange"),
-            marker=dict(color="orange"),
-        )
-    )
-
-    fig.add_trace(
-        go.Scatter(
-            x=df33_2[df33_2["segment"] == "C"]["event_date"],
-            y=df33_2[df33_2["segment"] == "C"]["dau"],
-            mode="lines+markers",
-            name="C segment DAU",
-            line=dict(color="purple"),
-            marker=dict(color="purple"),
-        )
-    )
-
-    fig.add_trace(
-        go.Scatter(
-            x=df33_2[df33_2["segment"] == "D"]["event_date"],
-            y=df33_2[df33_2["segment"] == "D"]["dau"],
-            mode="lines+markers",
-            name="D segment DAU",
-            line=dict(color="darkblue"),
-            marker=dict(color="darkblue"),
-        )
-    )
-
-    fig.update_layout(
-        title="DAU by Segments",
-        xaxis_title="Date",
-        yaxis_title="DAU",
-        plot_bgcolor="white",
-        paper_bgcolor="white",
-        xaxis=dict(showgrid=False, showline=True),
-        yaxis=dict(showgrid=False, showline=True),
-    )
-    st.plotly_chart(fig)
+    show_series(charts.segment_dau, "graph33_2", view)
 
     st.markdown(
         """
@@ -2178,62 +1354,7 @@ with part1:
         unsafe_allow_html=True,
     )
 
-    fig = go.Figure()
-
-    fig.add_trace(
-        go.Scatter(
-            x=df33_2[df33_2["segment"] == "A"]["event_date"],
-            y=df33_2[df33_2["segment"] == "A"]["total_payment"],
-            mode="lines+markers",
-            name="A segment Total Payment",
-            line=dict(color="black"),
-            marker=dict(color="black"),
-        )
-    )
-
-    fig.add_trace(
-        go.Scatter(
-            x=df33_2[df33_2["segment"] == "B"]["event_date"],
-            y=df33_2[df33_2["segment"] == "B"]["total_payment"],
-            mode="lines+markers",
-            name="B segment Total Payment",
-            line=dict(color="orange"),
-            marker=dict(color="orange"),
-        )
-    )
-
-    fig.add_trace(
-        go.Scatter(
-            x=df33_2[df33_2["segment"] == "C"]["event_date"],
-            y=df33_2[df33_2["segment"] == "C"]["total_payment"],
-            mode="lines+markers",
-            name="C segment Total Payment",
-            line=dict(color="purple"),
-            marker=dict(color="purple"),
-        )
-    )
-
-    fig.add_trace(
-        go.Scatter(
-            x=df33_2[df33_2["segment"] == "D"]["event_date"],
-            y=df33_2[df33_2["segment"] == "D"]["total_payment"],
-            mode="lines+markers",
-            name="D segment Total Payment",
-            line=dict(color="darkblue"),
-            marker=dict(color="darkblue"),
-        )
-    )
-
-    fig.update_layout(
-        title="Total Payment by Segments",
-        xaxis_title="Date",
-        yaxis_title="Total Payment",
-        plot_bgcolor="white",
-        paper_bgcolor="white",
-        xaxis=dict(showgrid=False, showline=True),
-        yaxis=dict(showgrid=False, showline=True),
-    )
-    st.plotly_chart(fig)
+    show_series(charts.segment_payments, "graph33_2", view)
 
     st.markdown(
         """
@@ -2278,23 +1399,7 @@ with part1:
         unsafe_allow_html=True,
     )
 
-    df34 = pd.read_pickle("data/graph34.pkl")
-    fig = px.treemap(
-        df34,
-        path=["segments"],
-        values="count",
-        color="count",
-        color_continuous_scale="Viridis",
-        title="RFM Segments",
-    )
-
-    fig.update_layout(
-        title_font=dict(size=15, family="Arial, sans-serif"),
-        paper_bgcolor="white",
-        plot_bgcolor="white",
-        margin=dict(l=40, r=40, t=40, b=40),
-    )
-    st.plotly_chart(fig)
+    show_chart(charts.rfm_segments, "graph34")
 
     st.markdown(
         """
@@ -2315,7 +1420,9 @@ with part1:
 # PART II: A/B TEST
 ###############################
 
-with part2:
+
+def render_ab_testing():
+    ab_results = abtest.load_results()
 
     st.markdown(
         """
@@ -2337,43 +1444,132 @@ with part2:
         unsafe_allow_html=True,
     )
 
+    if st.toggle(
+        f"Check every test with {resampling.RESAMPLES:,} bootstrap resamples,"
+        f" up to {resampling.PERMUTATIONS:,} permutations"
+        f" and {resampling.SPLITS} random A/A splits",
+        key="ab_resampling",
+        disabled=not store.exists(resampling.RESAMPLED),
+    ):
+        st.dataframe(
+            resampling.load_resampled(),
+            column_config={
+                "metric": "Metric",
+                "difference": st.column_config.NumberColumn(
+                    "Difference (B - A)", format="%.4g"
+                ),
+                "ci_low": st.column_config.NumberColumn("CI low", format="%.4g"),
+                "ci_high": st.column_config.NumberColumn("CI high", format="%.4g"),
+                "p_value": st.column_config.NumberColumn(
+                    "Bootstrap p-value", format="%.4f"
+                ),
+                "permutation_p_value": st.column_config.NumberColumn(
+                    "Permutation p-value", format="%.4f"
+                ),
+                "permutations": st.column_config.NumberColumn(
+                    "Permutations",
+                    help="Stops once the p-value is clearly below or above alpha.",
+                ),
+                "aa_rate_a": st.column_config.NumberColumn(
+                    "A/A false positives (A)", format="%.3f"
+                ),
+                "aa_rate_b": st.column_config.NumberColumn(
+                    "A/A false positives (B)", format="%.3f"
+                ),
+                "seconds": st.column_config.NumberColumn(
+                    "Seconds",
+                    help="Time the ETL took for the test's checks.",
+                    format="%.2f",
+                ),
+            },
+        )
+
+    segment = st.selectbox(
+        "Break the tests down by",
+        abtest.SEGMENTS,
+        index=None,
+        placeholder="Whole population",
+        key="ab_segment",
+        disabled=not store.exists(abtest.MOMENTS),
+    )
+    if segment is not None:
+        st.dataframe(
+            abtest.load_segment_results(segment),
+            column_config={
+                "metric": "Metric",
+                "method": "Test",
+                "mean_a": st.column_config.NumberColumn("Mean A", format="%.4g"),
+                "mean_b": st.column_config.NumberColumn("Mean B", format="%.4g"),
+                "n_a": "n A",
+                "n_b": "n B",
+                "p_value": st.column_config.NumberColumn("p-value", format="%.4g"),
+                "rejected": "H0 rejected",
+            },
+        )
+
+    if st.toggle(
+        "Show the Bayesian view (conjugate posteriors)",
+        key="ab_bayesian",
+        disabled=not store.exists(abtest.MOMENTS),
+    ):
+        st.dataframe(
+            bayes.load_bayesian(segment),
+            column_config={
+                "test": "Test",
+                "model": "Model",
+                "mean_a": st.column_config.NumberColumn(
+                    "Posterior mean A", format="%.4g"
+                ),
+                "mean_b": st.column_config.NumberColumn(
+                    "Posterior mean B", format="%.4g"
+                ),
+                "prob_b_better": st.column_config.NumberColumn(
+                    "P(B > A)", format="%.4f"
+                ),
+                "loss_a": st.column_config.NumberColumn(
+                    "Expected loss of A", format="%.4g"
+                ),
+                "loss_b": st.column_config.NumberColumn(
+                    "Expected loss of B", format="%.4g"
+                ),
+                "closed_form": None,
+            },
+        )
+
+    if st.toggle(
+        "Monitor the daily tests sequentially (mSPRT)",
+        key="ab_sequential",
+        disabled=not store.exists("ab_sequential"),
+    ):
+        show_chart(
+            charts.sequential_p_values, "ab_sequential", use_container_width=True
+        )
+        st.dataframe(
+            sequential.decisions(load_artifact("ab_sequential")),
+            column_config={
+                "metric": "Metric",
+                "days": "Days",
+                "difference": st.column_config.NumberColumn(
+                    "Difference (B - A)", format="%.4g"
+                ),
+                "p_value": st.column_config.NumberColumn(
+                    "Always-valid p-value", format="%.4g"
+                ),
+                "rejected_on": st.column_config.DateColumn("H0 rejected on"),
+            },
+        )
+
     # Test 1
     st.subheader(":blue[1) Total Time Spent]")
-    st.markdown(
-        """
-        <style>
-            .justified-text {
-                text-align: justify;
-            }
-        </style>
-        <div class="justified-text">
-            When we combine the A and B groups and calculate the confidence interval with an alpha of 0.05, we find it to be (87.286, 89.342). When examined separately, the average total time spent by a user in group A is 99.964, while the average total time spent by a user in group B is 76.356. To determine if the difference is statistically significant, we conduct an A/B test using the Z-test method. 
-        </div>
-        """,
-        unsafe_allow_html=True,
-    )
+    show_ab_intro(st, 1, ab_results)
 
     left_part2, right_part2 = st.columns(2)
-    left_part2.image("images/part_ii/1.png", width=750)
+    show_ab_plot(left_part2, 1)
     right_part2.markdown(" ")
     right_part2.markdown(" ")
     right_part2.markdown(" ")
     right_part2.markdown(" ")
-    right_part2.markdown("- A/A Test passed successfully!")
-    right_part2.markdown("- z test is being used...")
-    right_part2.markdown(
-        "- H0 : M1 = M2  (Control(A) and experimental(B) groups have the same distribution.)"
-    )
-
-    right_part2.markdown(
-        "- H1 : M1 != M2  (Control(A) and experimental(B) groups DON'T have the same distribution.)"
-    )
-
-    right_part2.markdown("- p-value(1.4705639822420505e-113)  <=  alpha(0.05)")
-
-    right_part2.markdown(
-        "- The null hypothesis(H0) is rejected at a significance level of 0.05"
-    )
+    show_ab_result(right_part2, 1, ab_results)
 
     right_part2.markdown(
         """
@@ -2387,47 +1583,19 @@ with part2:
         unsafe_allow_html=True,
     )
 
-    right_part2.markdown(
-        "**As a result of the test, we observe that the experiment (B) group spends less time in the game.**"
-    )
+    show_ab_conclusion(right_part2, 1, ab_results)
 
     # Test 2
     st.subheader(":blue[2) Number of Sessions]")
-    st.markdown(
-        """
-        <style>
-            .justified-text {
-                text-align: justify;
-            }
-        </style>
-        <div class="justified-text">
-            When we combine the A and B groups and calculate the confidence interval with an alpha of 0.05, we find it to be (3.026, 3.097). When examined separately, the average number of sessions for a user in group A is 3.456, while the average number of sessions for a user in group B is 2.656. To determine if the difference is statistically significant, we conduct an A/B test using the Z-test method:
-        </div>
-        """,
-        unsafe_allow_html=True,
-    )
+    show_ab_intro(st, 2, ab_results)
 
     left_part2, right_part2 = st.columns(2)
-    left_part2.image("images/part_ii/2.png", width=750)
+    show_ab_plot(left_part2, 2)
     right_part2.markdown(" ")
     right_part2.markdown(" ")
     right_part2.markdown(" ")
     right_part2.markdown(" ")
-    right_part2.markdown("- A/A Test passed successfully!")
-    right_part2.markdown("- z test is being used...")
-    right_part2.markdown(
-        "- H0 : M1 = M2  (Control(A) and experimental(B) groups have the same distribution.)"
-    )
-
-    right_part2.markdown(
-        "- H1 : M1 != M2  (Control(A) and experimental(B) groups DON'T have the same distribution.)"
-    )
-
-    right_part2.markdown("- p-value(4.4501436892908715e-109)  <=  alpha(0.05)")
-
-    right_part2.markdown(
-        "- The null hypothesis(H0) is rejected at a significance level of 0.05"
-    )
+    show_ab_result(right_part2, 2, ab_results)
 
     right_part2.markdown(
         """
@@ -2441,101 +1609,45 @@ with part2:
         unsafe_allow_html=True,
     )
 
-    right_part2.markdown(
-        "**As a result of the test, we observe that the experiment (B) group has a lower number of sessions.**"
-    )
+    show_ab_conclusion(right_part2, 2, ab_results)
 
     # Test 3
     st.subheader(":blue[3) Average Time Spent Per Session]")
-    st.markdown(
-        """
-        <style>
-            .justified-text {
-                text-align: justify;
-            }
-        </style>
-        <div class="justified-text">
-            When we combine the A and B groups and calculate the confidence interval with an alpha of 0.05, we find it to be (26.91, 26.99). When examined separately, the average time spent per session for a user in group A is 26.98, while the average time spent per session for a user in group B is 26.93. To determine if the difference is statistically significant, we conduct an A/B test using the Z-test method:
-        </div>
-        """,
-        unsafe_allow_html=True,
-    )
-
-    left_part2, right_part2 = st.columns(2)
-    left_part2.image("images/part_ii/3.png", width=750)
-    right_part2.markdown(" ")
-    right_part2.markdown(" ")
-    right_part2.markdown(" ")
-    right_part2.markdown(" ")
-    right_part2.markdown("- A/A Test passed successfully!")
-    right_part2.markdown("- z test is being used...")
-    right_part2.markdown(
-        "- H0 : M1 = M2  (Control(A) and experimental(B) groups have the same distribution.)"
-    )
-
-    right_part2.markdown(
-        "- H1 : M1 != M2  (Control(A) and experimental(B) groups DON'T have the same distribution.)"
-    )
-
-    right_part2.markdown("- p-value(0.15787022164233722)  >  alpha(0.05)")
-
-    right_part2.markdown(
-        "- The null hypothesis(H0) CANNOT be rejected at a significance level of 0.05"
-    )
-
-    right_part2.markdown(
-        """
-    <style>
-    [data-testid="stMarkdownContainer"] ul{
-        padding-left:4px;
-        padding-top:10px;
-    }
-    </style>
-    """,
-        unsafe_allow_html=True,
-    )
-
-    right_part2.markdown(
-        "**As a result of the test, we find that there is no statistically significant difference between the experiment (B) and control (A) groups in terms of average time spent per session.**"
-    )
-
-    # Test 4
-    st.subheader(":blue[4) Level]")
-    st.markdown(
-        """
-        <style>
-            .justified-text {
-                text-align: justify;
-            }
-        </style>
-        <div class="justified-text">
-            When we combine the A and B groups and calculate the confidence interval with an alpha of 0.05, we find it to be (217, 222). When examined separately, the average in-game level for a user in group A is 283, while the average in-game level for a user in group B is 154. To determine if the difference is statistically significant, we conduct an A/B test using the Z-test method: 
-        </div>
-        """,
-        unsafe_allow_html=True,
-    )
+    show_ab_intro(st, 3, ab_results)
 
     left_part2, right_part2 = st.columns(2)
-    left_part2.image("images/part_ii/4.png", width=750)
+    show_ab_plot(left_part2, 3)
     right_part2.markdown(" ")
     right_part2.markdown(" ")
     right_part2.markdown(" ")
     right_part2.markdown(" ")
-    right_part2.markdown("- A/A Test passed successfully!")
-    right_part2.markdown("- z test is being used...")
-    right_part2.markdown(
-        "- H0 : M1 = M2  (Control(A) and experimental(B) groups have the same distribution.)"
-    )
+    show_ab_result(right_part2, 3, ab_results)
 
     right_part2.markdown(
-        "- H1 : M1 != M2  (Control(A) and experimental(B) groups DON'T have the same distribution.)"
+        """
+    <style>
+    [data-testid="stMarkdownContainer"] ul{
+        padding-left:4px;
+        padding-top:10px;
+    }
+    </style>
+    """,
+        unsafe_allow_html=True,
     )
 
-    right_part2.markdown("- p-value(0.0)  <=  alpha(0.05)")
+    show_ab_conclusion(right_part2, 3, ab_results)
 
-    right_part2.markdown(
-        "- The null hypothesis(H0) is rejected at a significance level of 0.05"
-    )
+    # Test 4
+    st.subheader(":blue[4) Level]")
+    show_ab_intro(st, 4, ab_results)
+
+    left_part2, right_part2 = st.columns(2)
+    show_ab_plot(left_part2, 4)
+    right_part2.markdown(" ")
+    right_part2.markdown(" ")
+    right_part2.markdown(" ")
+    right_part2.markdown(" ")
+    show_ab_result(right_part2, 4, ab_results)
 
     right_part2.markdown(
         """
@@ -2549,47 +1661,19 @@ with part2:
         unsafe_allow_html=True,
     )
 
-    right_part2.markdown(
-        "**As a result of the test, we observe that the experiment (B) group has a lower in-game level.**"
-    )
+    show_ab_conclusion(right_part2, 4, ab_results)
 
     # Test 5
     st.subheader(":blue[5) Revenue per User]")
-    st.markdown(
-        """
-        <style>
-            .justified-text {
-                text-align: justify;
-            }
-        </style>
-        <div class="justified-text">
-            When we combine the A and B groups and calculate the confidence interval with an alpha of 0.05, we find it to be (151, 177). When examined separately, the average total revenue generated by a user in group A is 158, while the average total revenue generated by a user in group B is 169. To determine if the difference is statistically significant, we conduct an A/B test using the Z-test method:
-        </div>
-        """,
-        unsafe_allow_html=True,
-    )
+    show_ab_intro(st, 5, ab_results)
 
     left_part2, right_part2 = st.columns(2)
-    left_part2.image("images/part_ii/5.png", width=750)
+    show_ab_plot(left_part2, 5)
     right_part2.markdown(" ")
     right_part2.markdown(" ")
     right_part2.markdown(" ")
     right_part2.markdown(" ")
-    right_part2.markdown("- A/A Test passed successfully!")
-    right_part2.markdown("- z test is being used...")
-    right_part2.markdown(
-        "- H0 : M1 = M2  (Control(A) and experimental(B) groups have the same distribution.)"
-    )
-
-    right_part2.markdown(
-        "- H1 : M1 != M2  (Control(A) and experimental(B) groups DON'T have the same distribution.)"
-    )
-
-    right_part2.markdown("- p-value(0.3739798636573419)  >  alpha(0.05)")
-
-    right_part2.markdown(
-        "- The null hypothesis(H0) CANNOT be rejected at a significance level of 0.05"
-    )
+    show_ab_result(right_part2, 5, ab_results)
 
     right_part2.markdown(
         """
@@ -2603,47 +1687,19 @@ with part2:
         unsafe_allow_html=True,
     )
 
-    right_part2.markdown(
-        "**As a result of the test, we find that there is no statistically significant difference in revenue per user between the experiment (B) and control (A) groups.**"
-    )
+    show_ab_conclusion(right_part2, 5, ab_results)
 
     # Test 6
     st.subheader(":blue[6) Number of Transactions]")
-    st.markdown(
-        """
-        <style>
-            .justified-text {
-                text-align: justify;
-            }
-        </style>
-        <div class="justified-text">
-            When we combine the A and B groups and calculate the confidence interval with an alpha of 0.05, we find it to be (11.78, 13.02). When examined separately, the average total number of transactions for a user in group A is 11.47, while the average total number of transactions for a user in group B is 13.20. To determine if the difference is statistically significant, we conduct an A/B test using the Z-test method:
-        </div>
-        """,
-        unsafe_allow_html=True,
-    )
+    show_ab_intro(st, 6, ab_results)
 
     left_part2, right_part2 = st.columns(2)
-    left_part2.image("images/part_ii/6.png", width=750)
+    show_ab_plot(left_part2, 6)
     right_part2.markdown(" ")
     right_part2.markdown(" ")
     right_part2.markdown(" ")
     right_part2.markdown(" ")
-    right_part2.markdown("- A/A Test passed successfully!")
-    right_part2.markdown("- z test is being used...")
-    right_part2.markdown(
-        "- H0 : M1 = M2  (Control(A) and experimental(B) groups have the same distribution.)"
-    )
-
-    right_part2.markdown(
-        "- H1 : M1 != M2  (Control(A) and experimental(B) groups DON'T have the same distribution.)"
-    )
-
-    right_part2.markdown("- p-value(0.005128313625524875)  <=  alpha(0.05)")
-
-    right_part2.markdown(
-        "- The null hypothesis(H0) is rejected at a significance level of 0.05"
-    )
+    show_ab_result(right_part2, 6, ab_results)
 
     right_part2.markdown(
         """
@@ -2657,47 +1713,19 @@ with part2:
         unsafe_allow_html=True,
     )
 
-    right_part2.markdown(
-        "**As a result of the test, we observe that the experiment (B) group has a higher number of transactions.**"
-    )
+    show_ab_conclusion(right_part2, 6, ab_results)
 
     # Test 7
     st.subheader(":blue[7) AOV]")
-    st.markdown(
-        """
-        <style>
-            .justified-text {
-                text-align: justify;
-            }
-        </style>
-        <div class="justified-text">
-            When we combine the A and B groups and calculate the confidence interval with an alpha of 0.05, we find it to be (9.16, 9.67). When examined separately, the average AOV for a user in group A is 9.73, while the average AOV for a user in group B is 9.15. To determine if the difference is statistically significant, we conduct an A/B test using the Z-test method:
-        </div>
-        """,
-        unsafe_allow_html=True,
-    )
+    show_ab_intro(st, 7, ab_results)
 
     left_part2, right_part2 = st.columns(2)
-    left_part2.image("images/part_ii/7.png", width=750)
+    show_ab_plot(left_part2, 7)
     right_part2.markdown(" ")
     right_part2.markdown(" ")
     right_part2.markdown(" ")
     right_part2.markdown(" ")
-    right_part2.markdown("- A/A Test passed successfully!")
-    right_part2.markdown("- z test is being used...")
-    right_part2.markdown(
-        "- H0 : M1 = M2  (Control(A) and experimental(B) groups have the same distribution.)"
-    )
-
-    right_part2.markdown(
-        "- H1 : M1 != M2  (Control(A) and experimental(B) groups DON'T have the same distribution.)"
-    )
-
-    right_part2.markdown("- p-value(0.026560784774499985)  <=  alpha(0.05)")
-
-    right_part2.markdown(
-        "- The null hypothesis(H0) is rejected at a significance level of 0.05"
-    )
+    show_ab_result(right_part2, 7, ab_results)
 
     right_part2.markdown(
         """
@@ -2711,47 +1739,19 @@ with part2:
         unsafe_allow_html=True,
     )
 
-    right_part2.markdown(
-        "**As a result of the test, we observe that the experiment (B) group has a lower AOV.**"
-    )
+    show_ab_conclusion(right_part2, 7, ab_results)
 
     # Test 8
     st.subheader(":blue[8) Purchase Frequency]")
-    st.markdown(
-        """
-        <style>
-            .justified-text {
-                text-align: justify;
-            }
-        </style>
-        <div class="justified-text">
-            When we combine the A and B groups and calculate the confidence interval with an alpha of 0.05, we find it to be (0.001949, 0.002154). When examined separately, the average purchase frequency for a user in group A is 0.001897, while the average purchase frequency for a user in group B is 0.002184. To determine if the difference is statistically significant, we conduct an A/B test using the Z-test method:
-        </div>
-        """,
-        unsafe_allow_html=True,
-    )
+    show_ab_intro(st, 8, ab_results)
 
     left_part2, right_part2 = st.columns(2)
-    left_part2.image("images/part_ii/8.png", width=750)
+    show_ab_plot(left_part2, 8)
     right_part2.markdown(" ")
     right_part2.markdown(" ")
     right_part2.markdown(" ")
     right_part2.markdown(" ")
-    right_part2.markdown("- A/A Test passed successfully!")
-    right_part2.markdown("- z test is being used...")
-    right_part2.markdown(
-        "- H0 : M1 = M2  (Control(A) and experimental(B) groups have the same distribution.)"
-    )
-
-    right_part2.markdown(
-        "- H1 : M1 != M2  (Control(A) and experimental(B) groups DON'T have the same distribution.)"
-    )
-
-    right_part2.markdown("- p-value(0.00512831362552487)  <=  alpha(0.05)")
-
-    right_part2.markdown(
-        "- The null hypothesis(H0) is rejected at a significance level of 0.05"
-    )
+    show_ab_result(right_part2, 8, ab_results)
 
     right_part2.markdown(
         """
@@ -2765,47 +1765,19 @@ with part2:
         unsafe_allow_html=True,
     )
 
-    right_part2.markdown(
-        "**As a result of the test, we observe that the experiment (B) group has a higher purchase frequency.**"
-    )
+    show_ab_conclusion(right_part2, 8, ab_results)
 
     # Test 9
     st.subheader(":blue[9) DAU]")
-    st.markdown(
-        """
-        <style>
-            .justified-text {
-                text-align: justify;
-            }
-        </style>
-        <div class="justified-text">
-            We observe that the average DAU for group A is 1,780,185, while the average DAU for group B is 1,332,930. To determine if the difference is statistically significant, we conduct an A/B test using the Z-test method with an alpha of 0.05: 
-        </div>
-        """,
-        unsafe_allow_html=True,
-    )
+    show_ab_intro(st, 9, ab_results)
 
     left_part2, right_part2 = st.columns(2)
-    left_part2.image("images/part_ii/9.png", width=750)
+    show_ab_plot(left_part2, 9)
     right_part2.markdown(" ")
     right_part2.markdown(" ")
     right_part2.markdown(" ")
     right_part2.markdown(" ")
-    right_part2.markdown("- A/A Test passed successfully!")
-    right_part2.markdown("- z test is being used...")
-    right_part2.markdown(
-        "- H0 : M1 = M2  (Control(A) and experimental(B) groups have the same distribution.)"
-    )
-
-    right_part2.markdown(
-        "- H1 : M1 != M2  (Control(A) and experimental(B) groups DON'T have the same distribution.)"
-    )
-
-    right_part2.markdown("- p-value(1.563369276418578e-08)  <=  alpha(0.05)")
-
-    right_part2.markdown(
-        "- The null hypothesis(H0) is rejected at a significance level of 0.05"
-    )
+    show_ab_result(right_part2, 9, ab_results)
 
     right_part2.markdown(
         """
@@ -2819,47 +1791,19 @@ with part2:
         unsafe_allow_html=True,
     )
 
-    right_part2.markdown(
-        "**As a result of the test, we observe that the experiment (B) group has a lower DAU value.**"
-    )
+    show_ab_conclusion(right_part2, 9, ab_results)
 
     # Test 10
     st.subheader(":blue[10) ARPDAU]")
-    st.markdown(
-        """
-        <style>
-            .justified-text {
-                text-align: justify;
-            }
-        </style>
-        <div class="justified-text">
-            We observe that the average ARPDAU for group A is 0.5612, while the average ARPDAU for group B is 0.7696. To determine if the difference is statistically significant, we conduct an A/B test using the Z-test method with an alpha of 0.05: 
-        </div>
-        """,
-        unsafe_allow_html=True,
-    )
+    show_ab_intro(st, 10, ab_results)
 
     left_part2, right_part2 = st.columns(2)
-    left_part2.image("images/part_ii/10.png", width=750)
+    show_ab_plot(left_part2, 10)
     right_part2.markdown(" ")
     right_part2.markdown(" ")
     right_part2.markdown(" ")
     right_part2.markdown(" ")
-    right_part2.markdown("- A/A Test passed successfully!")
-    right_part2.markdown("- z test is being used...")
-    right_part2.markdown(
-        "- H0 : M1 = M2  (Control(A) and experimental(B) groups have the same distribution.)"
-    )
-
-    right_part2.markdown(
-        "- H1 : M1 != M2  (Control(A) and experimental(B) groups DON'T have the same distribution.)"
-    )
-
-    right_part2.markdown("- p-value(1.6141170753003553e-13)  <=  alpha(0.05)")
-
-    right_part2.markdown(
-        "- The null hypothesis(H0) is rejected at a significance level of 0.05"
-    )
+    show_ab_result(right_part2, 10, ab_results)
 
     right_part2.markdown(
         """
@@ -2873,47 +1817,19 @@ with part2:
         unsafe_allow_html=True,
     )
 
-    right_part2.markdown(
-        "**As a result of the test, we observe that the experiment (B) group has a higher ARPDAU value.**"
-    )
+    show_ab_conclusion(right_part2, 10, ab_results)
 
     # Test 11
     st.subheader(":blue[11) Daily Revenue]")
-    st.markdown(
-        """
-        <style>
-            .justified-text {
-                text-align: justify;
-            }
-        </style>
-        <div class="justified-text">
-            We observe that the daily average revenue for group A is 6,106, while the daily average revenue for group B is 7,679. To determine if the difference is statistically significant, we conduct an A/B test using the Z-test method with an alpha of 0.05:
-        </div>
-        """,
-        unsafe_allow_html=True,
-    )
+    show_ab_intro(st, 11, ab_results)
 
     left_part2, right_part2 = st.columns(2)
-    left_part2.image("images/part_ii/11.png", width=750)
+    show_ab_plot(left_part2, 11)
     right_part2.markdown(" ")
     right_part2.markdown(" ")
     right_part2.markdown(" ")
     right_part2.markdown(" ")
-    right_part2.markdown("- A/A Test passed successfully!")
-    right_part2.markdown("- z test is being used...")
-    right_part2.markdown(
-        "- H0 : M1 = M2  (Control(A) and experimental(B) groups have the same distribution.)"
-    )
-
-    right_part2.markdown(
-        "- H1 : M1 != M2  (Control(A) and experimental(B) groups DON'T have the same distribution.)"
-    )
-
-    right_part2.markdown("- p-value(0.0005129920795266452)  <=  alpha(0.05)")
-
-    right_part2.markdown(
-        "- The null hypothesis(H0) is rejected at a significance level of 0.05"
-    )
+    show_ab_result(right_part2, 11, ab_results)
 
     right_part2.markdown(
         """
@@ -2927,56 +1843,28 @@ with part2:
         unsafe_allow_html=True,
     )
 
-    right_part2.markdown(
-        "**As a result of the test, we observe that the experiment (B) group has a higher daily revenue.**"
-    )
+    show_ab_conclusion(right_part2, 11, ab_results)
 
     # Test 12
     st.subheader(":blue[12) ARPInstall]")
-    st.markdown(
-        """
-        <style>
-            .justified-text {
-                text-align: justify;
-            }
-        </style>
-        <div class="justified-text">
-            We observe that the daily ARPInstall for group A is 4.55, while the daily ARPInstall for group B is 5.99. To determine if the difference is statistically significant, we will conduct an A/B test using the t-test method with an alpha of 0.05: 
-        </div>
-        """,
-        unsafe_allow_html=True,
-    )
+    show_ab_intro(st, 12, ab_results)
 
     st.markdown(
         """
         <p>
-            <strong><span style="font-size:20px;">NOTE</span></strong>: The reason we are using the t-test instead of the Z-test is that we only have data for 28 days. When the sample size is less than 30, it is recommended to use the t-test rather than the Z-test. In this case, if we were to use the Z-test, we would obtain a "H0 rejected" result. However, by using the t-test, we arrive at a "H0 NOT rejected" result. As the sample size increases, the t-test approaches the Z-test; but in this example, we have a small amount of data.
+            <strong><span style="font-size:20px;">NOTE</span></strong>: The reason we are using the t-test instead of the Z-test is that this test only uses the days with more than 4 installs in each group, and there are few of them. When the sample size is less than 30, it is recommended to use the t-test rather than the Z-test, whose p-value is too small for so few days: it can reject H0 where the t-test does not. As the sample size increases, the t-test approaches the Z-test; but in this example, we have a small amount of data.
         </p>
         """,
         unsafe_allow_html=True,
     )
 
     left_part2, right_part2 = st.columns(2)
-    left_part2.image("images/part_ii/12.png", width=750)
+    show_ab_plot(left_part2, 12)
     right_part2.markdown(" ")
     right_part2.markdown(" ")
     right_part2.markdown(" ")
     right_part2.markdown(" ")
-    right_part2.markdown("- A/A Test passed successfully!")
-    right_part2.markdown("- t test is being used...")
-    right_part2.markdown(
-        "- H0 : M1 = M2  (Control(A) and experimental(B) groups have the same distribution.)"
-    )
-
-    right_part2.markdown(
-        "- H1 : M1 != M2  (Control(A) and experimental(B) groups DON'T have the same distribution.)"
-    )
-
-    right_part2.markdown("- p-value(0.05229060907018408)  >  alpha(0.05)")
-
-    right_part2.markdown(
-        "- The null hypothesis(H0) CANNOT be rejected at a significance level of 0.05"
-    )
+    show_ab_result(right_part2, 12, ab_results)
 
     right_part2.markdown(
         """
@@ -2990,47 +1878,19 @@ with part2:
         unsafe_allow_html=True,
     )
 
-    right_part2.markdown(
-        "**As a result of the test, we observe that there is no statistically significant difference in ARPInstall between the experiment (B) and control (A) groups.**"
-    )
+    show_ab_conclusion(right_part2, 12, ab_results)
 
     # Test 13
     st.subheader(":blue[13) Number of Transactions per DAU]")
-    st.markdown(
-        """
-        <style>
-            .justified-text {
-                text-align: justify;
-            }
-        </style>
-        <div class="justified-text">
-            We observe that the transaction rate per DAU for group A is 0.0412, while the transaction rate per DAU for group B is 0.0602. To determine if the difference is statistically significant, we conduct an A/B test using the Z-test method with an alpha of 0.05:
-        </div>
-        """,
-        unsafe_allow_html=True,
-    )
+    show_ab_intro(st, 13, ab_results)
 
     left_part2, right_part2 = st.columns(2)
-    left_part2.image("images/part_ii/13.png", width=750)
+    show_ab_plot(left_part2, 13)
     right_part2.markdown(" ")
     right_part2.markdown(" ")
     right_part2.markdown(" ")
     right_part2.markdown(" ")
-    right_part2.markdown("- A/A Test passed successfully!")
-    right_part2.markdown("- z test is being used...")
-    right_part2.markdown(
-        "- H0 : M1 = M2  (Control(A) and experimental(B) groups have the same distribution.)"
-    )
-
-    right_part2.markdown(
-        "- H1 : M1 != M2  (Control(A) and experimental(B) groups DON'T have the same distribution.)"
-    )
-
-    right_part2.markdown("- p-value(1.7826052201525774e-33)  <=  alpha(0.05)")
-
-    right_part2.markdown(
-        "- The null hypothesis(H0) is rejected at a significance level of 0.05"
-    )
+    show_ab_result(right_part2, 13, ab_results)
 
     right_part2.markdown(
         """
@@ -3044,9 +1904,7 @@ with part2:
         unsafe_allow_html=True,
     )
 
-    right_part2.markdown(
-        "**As a result of the test, we observe that the experiment (B) group has a higher transaction rate per DAU.**"
-    )
+    show_ab_conclusion(right_part2, 13, ab_results)
 
     # Sonuc
     st.markdown(
@@ -3058,17 +1916,14 @@ with part2:
         unsafe_allow_html=True,
     )
 
-    st.markdown(
-        """
-        <ul style="padding-left:4px; padding-top:1px; list-style-type:none;">
+    items = "".join(f"""
             <li style="margin-bottom: 10px;">
                 <span style="color: green; font-weight: bold;">&#10004;</span>
-                If the game is monetization-focused, meaning the main goal is to increase revenue and maximize revenue per user, then the experiment (B) group is performing better in this regard.
-            </li>
-            <li>
-                <span style="color: green; font-weight: bold;">&#10004;</span>
-                If the game is engagement-focused, meaning the priority is to increase user interaction and retention, then the control (A) group is yielding better results in this regard.
-            </li>
+                {focus}, {ab_summary(numbers, ab_results)}.
+            </li>""" for focus, numbers in AB_FOCUS)
+    st.markdown(
+        f"""
+        <ul style="padding-left:4px; padding-top:1px; list-style-type:none;">{items}
         </ul>
         """,
         unsafe_allow_html=True,
@@ -3087,7 +1942,9 @@ with part2:
 ###############################
 # PART III: MODEL
 ###############################
-with part3:
+
+
+def render_modelling():
 
     st.markdown(
         """
@@ -3402,10 +2259,7 @@ with part3:
 ###############################
 
 
-scaler = get_scaler()
-model = get_model()
-
-with part4:
+def render_prediction():
     st.markdown(
         """
         <div class="justified-text">
@@ -3637,19 +2491,56 @@ with part4:
     for col in user.columns:
         model_input[col] = user[col]
 
-    model_input = pd.DataFrame(
-        scaler.transform(model_input), columns=model_input.columns
-    )
+    if st.button("Predict!"):
+        # The model and scaler are loaded on the first prediction and then
+        # shared by every session of this server process.
+        scaler = get_scaler()
+        model = get_model()
 
-    model_input["time_spend/age"] = model_input["time_spend"] / model_input["age"]
-    model_input["coin_spend/coin_amount"] = (
-        model_input["coin_spend"] / model_input["coin_amount"]
-    )
+        model_input = pd.DataFrame(
+            scaler.transform(model_input), columns=model_input.columns
+        )
+
+        model_input["time_spend/age"] = model_input["time_spend"] / model_input["age"]
+        model_input["coin_spend/coin_amount"] = (
+            model_input["coin_spend"] / model_input["coin_amount"]
+        )
 
-    if st.button("Predict!"):
         prediction = model.predict(model_input)
         if prediction == 1:
             st.success(f"This player will purchase! :)")
         else:
             st.success(f"This player won't purchase! :)")
         st.balloons()
+
+
+###############################
+# NAVIGATION
+###############################
+
+renderers = {
+    "analysis": render_analysis,
+    "ab-testing": render_ab_testing,
+    "modelling": render_modelling,
+    "prediction": render_prediction,
+}
+
+if LAZY_SECTIONS:
+    renderers[section]()
+else:
+    for tab, render in zip(tabs, renderers.values()):
+        with tab:
+            render()
+
+
+###############################
+# DIAGNOSTICS
+###############################
+
+if st.query_params.get("debug"):
+    with st.sidebar.expander("Artifact cache", expanded=True):
+        st.json(store.stats())
+    with st.sidebar.expander("Model resources", expanded=True):
+        st.json(resource_stats())
+    with st.sidebar.expander("Figure cache", expanded=True):
+        st.json(figure_cache.stats())
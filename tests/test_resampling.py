@@ -0,0 +1,25 @@
+import numpy as np
+
+from analytics import resampling
+
+
+def _groups(shift):
+    rng = np.random.default_rng(3)
+    return rng.exponential(1.0, 9000), rng.exponential(1.0, 11000) + shift
+
+
+def test_permutation_test_parallel_matches_serial():
+    # 20,000 values make several MAX_CELLS batches per stopping check, and
+    # a p-value near alpha takes several checks.
+    a, b = _groups(0.025)
+    serial = resampling.permutation_test(a, b, permutations=2000, workers=1)
+    parallel = resampling.permutation_test(a, b, permutations=2000, workers=2)
+    assert serial == parallel
+    assert serial.permutations == 3 * resampling.PERMUTATION_CHECK
+
+
+def test_permutation_test_stops_at_a_check():
+    a, b = _groups(1.0)
+    result = resampling.permutation_test(a, b, check_every=300, workers=2)
+    assert result.permutations == 300
+    assert result.p_ci[1] < 0.05